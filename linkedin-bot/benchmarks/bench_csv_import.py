@@ -0,0 +1,59 @@
+"""
+Benchmark the streaming CSV importer.
+
+Writes CSV files of increasing size, imports each one with
+ContentService.import_csv_stream, and reports rows per second and peak
+Python memory, which should stay flat as the file grows.
+
+Usage (from the linkedin-bot directory):
+    python benchmarks/bench_csv_import.py [num_rows]
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import tracemalloc
+
+# Point the global Database at a throwaway home directory before it is created
+_home = tempfile.mkdtemp(prefix="linkedin_bot_bench_")
+os.environ["HOME"] = _home
+os.environ["USERPROFILE"] = _home
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from linkedin_bot.services.content_service import ContentService
+
+
+def write_csv(path, num_rows):
+    """Write a content CSV with a header row and num_rows data rows."""
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['PostContent', 'Category'])
+        for i in range(num_rows):
+            writer.writerow([f"Post number {i} of {num_rows} " + "lorem ipsum " * 20, f"Category {i % 50}"])
+
+
+def main():
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    sizes = [num_rows // 10, num_rows]
+    
+    print(f"{'rows':>10}{'seconds':>10}{'rows/s':>12}{'peak memory':>14}")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            path = os.path.join(tmp_dir, f"content_{size}.csv")
+            write_csv(path, size)
+            
+            tracemalloc.start()
+            with open(path, 'r', encoding='utf-8', newline='') as file:
+                report = ContentService.import_csv_stream(file)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            
+            print(f"{report['imported']:>10}{report['seconds']:>10.2f}"
+                  f"{report['rows_per_second']:>12.0f}{peak / 1024 / 1024:>11.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark the MinHash LSH near-duplicate index.
+
+Fills content_repository with synthetic posts (1M by default), builds the
+signature index, then times lookups for near-duplicate and unrelated posts
+and compares them with a linear scan over every signature.
+
+Usage (from the linkedin-bot directory):
+    python benchmarks/bench_near_duplicates.py [num_rows] [num_queries]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from array import array
+from itertools import accumulate
+
+# Point the global Database at a throwaway home directory before it is created
+_home = tempfile.mkdtemp(prefix="linkedin_bot_bench_")
+os.environ["HOME"] = _home
+os.environ["USERPROFILE"] = _home
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from linkedin_bot.core.database import db
+from linkedin_bot.core.near_duplicates import minhash_signature, near_duplicate_index, similarity
+
+VOCABULARY = [f"word{i}" for i in range(20000)]
+# Zipf-like word frequencies, so posts share common words the way real text does
+CUM_WEIGHTS = list(accumulate(1 / (rank + 1) for rank in range(len(VOCABULARY))))
+
+
+def make_post(rng):
+    """Build a synthetic post of 40 to 120 words."""
+    return ' '.join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=rng.randint(40, 120)))
+
+
+def mutate(rng, text, fraction):
+    """Replace a fraction of a post's words, like a lightly reworded LLM answer."""
+    words = text.split()
+    for index in rng.sample(range(len(words)), max(1, int(len(words) * fraction))):
+        words[index] = rng.choice(VOCABULARY)
+    return ' '.join(words)
+
+
+def percentile(timings, pct):
+    """Return a percentile of a list of timings."""
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    rng = random.Random(42)
+    
+    print(f"Filling content_repository with {num_rows} posts...")
+    chunk_size = 20000
+    for start in range(0, num_rows, chunk_size):
+        with db.transaction():
+            db.execute_many(
+                "INSERT INTO content_repository (post_text) VALUES (?)",
+                [(make_post(rng),) for _ in range(min(chunk_size, num_rows - start))]
+            )
+    
+    started = time.perf_counter()
+    indexed = near_duplicate_index.sync()
+    build_seconds = time.perf_counter() - started
+    print(f"Built index for {indexed} posts in {build_seconds:.1f}s ({indexed / build_seconds:.0f} posts/s)")
+    
+    started = time.perf_counter()
+    near_duplicate_index.sync()
+    print(f"Incremental sync with nothing new: {(time.perf_counter() - started) * 1000:.2f} ms")
+    
+    # Near duplicates of random existing posts, and unrelated new posts
+    source_ids = [rng.randint(1, num_rows) for _ in range(num_queries)]
+    probes = [
+        (content_id, mutate(rng, db.execute(
+            "SELECT post_text FROM content_repository WHERE id = ?", (content_id,)
+        ).fetchone()['post_text'], 0.02))
+        for content_id in source_ids
+    ]
+    unrelated = [make_post(rng) for _ in range(num_queries)]
+    
+    timings = []
+    found = 0
+    for content_id, text in probes:
+        started = time.perf_counter()
+        matches = near_duplicate_index.find(text)
+        timings.append(time.perf_counter() - started)
+        found += any(match_id == content_id for match_id, _ in matches)
+    
+    false_positives = 0
+    for text in unrelated:
+        started = time.perf_counter()
+        matches = near_duplicate_index.find(text)
+        timings.append(time.perf_counter() - started)
+        false_positives += bool(matches)
+    
+    print(f"Lookups ({len(timings)}): p50 {percentile(timings, 50) * 1000:.2f} ms, "
+          f"p95 {percentile(timings, 95) * 1000:.2f} ms, p99 {percentile(timings, 99) * 1000:.2f} ms")
+    print(f"Recall on 2%-reworded posts at threshold {near_duplicate_index.threshold}: "
+          f"{found / num_queries:.1%}")
+    print(f"Unrelated posts flagged: {false_positives / num_queries:.1%}")
+    
+    # Baseline: compare one post with every stored signature
+    signature = minhash_signature(probes[0][1])
+    started = time.perf_counter()
+    for row in db.execute("SELECT signature FROM content_signatures WHERE signature IS NOT NULL"):
+        stored = array('I')
+        stored.frombytes(row['signature'])
+        similarity(signature, stored)
+    scan_seconds = time.perf_counter() - started
+    print(f"Linear scan for one lookup: {scan_seconds * 1000:.0f} ms "
+          f"({scan_seconds / percentile(timings, 50):.0f}x the LSH p50)")
+
+
+if __name__ == "__main__":
+    main()
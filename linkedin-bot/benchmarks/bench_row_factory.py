@@ -0,0 +1,75 @@
+"""
+Benchmark row construction for full-table fetches.
+
+Compares the previous dict-building lambda row_factory with the native Row
+type used by Database, on a content_repository table of 100k rows.
+
+Usage (from the linkedin-bot directory):
+    python benchmarks/bench_row_factory.py [num_rows]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from linkedin_bot.core.database import Database, Row
+
+
+def dict_row_factory(cursor, row):
+    """The row_factory Database used before switching to Row."""
+    return {col[0]: row[idx] for idx, col in enumerate(cursor.description)}
+
+
+def best_of(runs, func):
+    """Return the fastest of several timed runs, in seconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database = Database(os.path.join(tmp_dir, "bench.db"))
+        
+        with database.transaction():
+            database.execute_many(
+                "INSERT INTO content_repository (post_text, category) VALUES (?, ?)",
+                [(f"Post number {i} " + "lorem ipsum " * 20, f"Category {i % 50}") for i in range(num_rows)]
+            )
+        
+        conn = database._get_connection()
+        
+        def fetch_all():
+            return database.select('content_repository', order_by='id DESC')
+        
+        def fetch_and_read():
+            # Touch every column the way the services do when formatting
+            for row in fetch_all():
+                row['id'], row['post_text'], row['category'], row['is_used'], row['created_at']
+        
+        results = {}
+        for name, factory in (("dict lambda factory", dict_row_factory), ("native Row", Row)):
+            conn.row_factory = factory
+            results[name] = (best_of(7, fetch_all), best_of(7, fetch_and_read))
+        
+        database.close()
+    
+    print(f"Rows: {num_rows}")
+    print(f"{'':22}{'fetch':>10}{'fetch + read':>15}")
+    for name, (fetch, fetch_read) in results.items():
+        print(f"{name:22}{fetch * 1000:8.1f} ms{fetch_read * 1000:12.1f} ms")
+    
+    (before_fetch, before_read), (after_fetch, after_read) = results.values()
+    print(f"{'speedup':22}{before_fetch / after_fetch:9.2f}x{before_read / after_read:14.2f}x")
+
+
+if __name__ == "__main__":
+    main()
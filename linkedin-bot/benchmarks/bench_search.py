@@ -0,0 +1,113 @@
+"""
+Benchmark full-text search over the content repository.
+
+Imports synthetic posts (1M by default) with ContentService.import_csv_stream,
+which indexes them for full-text search once they are all inserted, then times
+ContentService.search_content for several kinds of query.
+
+Usage (from the linkedin-bot directory):
+    python benchmarks/bench_search.py [num_rows] [num_queries]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from itertools import accumulate
+
+# Point the global Database at a throwaway home directory before it is created
+_home = tempfile.mkdtemp(prefix="linkedin_bot_bench_")
+os.environ["HOME"] = _home
+os.environ["USERPROFILE"] = _home
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from linkedin_bot.core.database import db
+from linkedin_bot.services.content_service import ContentService
+
+SYLLABLES = [consonant + vowel for consonant in "bcdfghklmnprstvz" for vowel in "aeiou"]
+CATEGORIES = [f"Category {i}" for i in range(50)]
+
+
+def make_vocabulary(rng, size):
+    """Build distinct pronounceable words, so prefixes spread like real text."""
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    # Sort first: set order varies between runs with string hash randomization
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+
+def percentile(timings, pct):
+    """Return a percentile of a list of timings."""
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = random.Random(42)
+    
+    vocabulary = make_vocabulary(rng, 50000)
+    # Zipf-like word frequencies: vocabulary[0] is the most common word
+    cum_weights = list(accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    
+    def csv_lines():
+        yield "PostContent,Category\n"
+        for _ in range(num_rows):
+            words = ' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(40, 120)))
+            yield f"{words},{rng.choice(CATEGORIES)}\n"
+    
+    print(f"Importing {num_rows} posts...")
+    report = ContentService.import_csv_stream(csv_lines(), chunk_size=20000, require_header=True)
+    print(f"Imported and indexed {report['imported']} posts in {report['seconds']:.1f}s "
+          f"({report['rows_per_second']:.0f} posts/s)")
+    
+    # Mark 30% as used; is_used isn't indexed, so the FTS triggers don't fire
+    with db.transaction():
+        db.execute("UPDATE content_repository SET is_used = 1 WHERE id % 10 < 3")
+    
+    started = time.perf_counter()
+    db.execute("INSERT INTO content_repository_fts (content_repository_fts) VALUES ('optimize')")
+    print(f"Merged index segments in {time.perf_counter() - started:.1f}s")
+    
+    # (label, query, search_content keyword arguments)
+    cases = {
+        "rare word": lambda: (rng.choice(vocabulary[20000:]), {'prefix': False}),
+        "mid-frequency word": lambda: (rng.choice(vocabulary[100:1000]), {'prefix': False}),
+        "common word": lambda: (rng.choice(vocabulary[:10]), {'prefix': False}),
+        "two words": lambda: (f"{rng.choice(vocabulary[:1000])} {rng.choice(vocabulary[:1000])}", {'prefix': False}),
+        "typed prefix (3 chars)": lambda: (rng.choice(vocabulary[:5000])[:3], {}),
+        "word + typed prefix": lambda: (f"{rng.choice(vocabulary[:1000])} {rng.choice(vocabulary[:5000])[:4]}", {}),
+        "common word + category": lambda: (rng.choice(vocabulary[:10]), {'prefix': False, 'category': rng.choice(CATEGORIES)}),
+        "mid word + unused": lambda: (rng.choice(vocabulary[100:1000]), {'prefix': False, 'is_used': False}),
+        "category only": lambda: ("", {'category': rng.choice(CATEGORIES)}),
+    }
+    
+    for label, make_case in cases.items():
+        timings = []
+        results = 0
+        for _ in range(num_queries):
+            query, options = make_case()
+            started = time.perf_counter()
+            results += len(ContentService.search_content(query, **options))
+            timings.append(time.perf_counter() - started)
+        
+        print(f"{label:<24} p50 {percentile(timings, 50) * 1000:6.2f} ms   "
+              f"p95 {percentile(timings, 95) * 1000:6.2f} ms   "
+              f"max {max(timings) * 1000:6.2f} ms   ({results / num_queries:.0f} results)")
+    
+    # Baseline: what the repository page did before, load everything and filter
+    started = time.perf_counter()
+    needle = vocabulary[5000]
+    matches = [item for item in ContentService.get_all_content() if needle in item['text']]
+    print(f"Loading the whole table and filtering in Python: {(time.perf_counter() - started) * 1000:.0f} ms "
+          f"({len(matches)} results)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Persistent cache for AI provider responses.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .database import db
+
+class ResponseCache:
+    """
+    Caches generated content in the ai_response_cache table.
+    
+    Entries are keyed by a hash of everything that determines a response
+    (provider, model, system prompt, prompt, temperature and max_tokens), expire
+    after a TTL, and are evicted least-recently-used once the cache grows past
+    max_entries.
+    """
+    
+    def __init__(self, ttl_seconds: int = 30 * 24 * 3600, max_entries: int = 10000,
+                 evict_every: int = 50):
+        """
+        Initialize the response cache.
+        
+        Args:
+            ttl_seconds: Seconds an entry stays valid after it is stored
+            max_entries: Maximum number of entries kept
+            evict_every: Run expiry and size eviction after this many stores
+        """
+        self.enabled = True
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+    
+    @staticmethod
+    def make_key(provider: str, model: str, system_prompt: Optional[str], prompt: str,
+                 temperature: float, max_tokens: int) -> str:
+        """
+        Build the cache key for a generation request.
+        
+        Args:
+            provider: Provider name
+            model: Model name
+            system_prompt: System prompt, if any
+            prompt: User prompt
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+        
+        Returns:
+            Hex SHA-256 digest
+        """
+        payload = json.dumps(
+            [provider, model, system_prompt, prompt, float(temperature), int(max_tokens)],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, provider: str, model: str, system_prompt: Optional[str], prompt: str,
+            temperature: float, max_tokens: int) -> Optional[str]:
+        """
+        Look up a cached response.
+        
+        Args:
+            provider: Provider name
+            model: Model name
+            system_prompt: System prompt, if any
+            prompt: User prompt
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+        
+        Returns:
+            Cached response, or None on a miss or if the cache is disabled
+        """
+        if not self.enabled:
+            return None
+        
+        key = self.make_key(provider, model, system_prompt, prompt, temperature, max_tokens)
+        now = time.time()
+        
+        row = db.execute(
+            "SELECT response FROM ai_response_cache WHERE key = ? AND created_at > ?",
+            (key, now - self.ttl_seconds)
+        ).fetchone()
+        
+        if row is None:
+            with self._lock:
+                self._misses += 1
+            return None
+        
+        db.execute("UPDATE ai_response_cache SET last_used_at = ? WHERE key = ?", (now, key))
+        db.commit()
+        
+        with self._lock:
+            self._hits += 1
+        
+        return row['response']
+    
+    def put(self, provider: str, model: str, system_prompt: Optional[str], prompt: str,
+            temperature: float, max_tokens: int, response: str) -> None:
+        """
+        Store a response.
+        
+        Args:
+            provider: Provider name
+            model: Model name
+            system_prompt: System prompt, if any
+            prompt: User prompt
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            response: Generated content
+        """
+        if not self.enabled:
+            return
+        
+        key = self.make_key(provider, model, system_prompt, prompt, temperature, max_tokens)
+        now = time.time()
+        
+        db.execute(
+            """
+            INSERT INTO ai_response_cache (key, provider, model, response, created_at, last_used_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                response = excluded.response,
+                created_at = excluded.created_at,
+                last_used_at = excluded.last_used_at
+            """,
+            (key, provider, model, response, now, now)
+        )
+        db.commit()
+        
+        with self._lock:
+            self._stores += 1
+            run_eviction = self._stores % self.evict_every == 0
+        
+        if run_eviction:
+            self.evict()
+    
+    def evict(self) -> int:
+        """
+        Remove expired entries and the least recently used ones beyond max_entries.
+        
+        Returns:
+            Number of entries removed
+        """
+        with db.transaction():
+            removed = db.delete(
+                table='ai_response_cache',
+                where='created_at <= ?',
+                where_params=(time.time() - self.ttl_seconds,)
+            )
+            
+            count = db.execute("SELECT COUNT(*) AS count FROM ai_response_cache").fetchone()['count']
+            if count > self.max_entries:
+                removed += db.delete(
+                    table='ai_response_cache',
+                    where='key IN (SELECT key FROM ai_response_cache ORDER BY last_used_at LIMIT ?)',
+                    where_params=(count - self.max_entries,)
+                )
+        
+        with self._lock:
+            self._evictions += removed
+        
+        return removed
+    
+    def clear(self) -> None:
+        """Remove every cached response."""
+        db.delete(table='ai_response_cache', where='1=1', where_params=())
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters for this process.
+        
+        Returns:
+            Dictionary with hits, misses, hit_rate, stores and evictions
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'stores': self._stores,
+                'evictions': self._evictions
+            }
+
+
+# Create a global instance
+response_cache = ResponseCache()
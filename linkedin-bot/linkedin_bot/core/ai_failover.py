@@ -0,0 +1,344 @@
+"""
+Composite AI provider with failover, hedged requests and per-provider health stats.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .ai_providers import AIProvider, async_provider_slot, get_provider, provider_slot
+
+# Providers tried by default, in rank order, if they have a stored API key
+DEFAULT_PROVIDER_ORDER = ["openai", "claude", "gemini"]
+
+class ProviderStats:
+    """
+    Rolling latency and error rate per provider.
+    
+    Keeps the most recent attempts per provider, dropping any older than
+    max_age seconds so a provider that was failing gets retried eventually.
+    """
+    
+    def __init__(self, window_size: int = 200, max_age: float = 300.0):
+        """
+        Initialize the stats.
+        
+        Args:
+            window_size: Maximum attempts kept per provider
+            max_age: Seconds an attempt counts towards the stats
+        """
+        self.window_size = window_size
+        self.max_age = max_age
+        
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[Tuple[float, float, bool]]] = {}
+    
+    def record(self, provider_name: str, latency: float, ok: bool) -> None:
+        """
+        Record one attempt.
+        
+        Args:
+            provider_name: Name of the provider
+            latency: Seconds the attempt took (or waited before timing out)
+            ok: Whether the attempt succeeded
+        """
+        with self._lock:
+            samples = self._samples.setdefault(provider_name, deque(maxlen=self.window_size))
+            samples.append((time.monotonic(), latency, ok))
+    
+    def _recent(self, provider_name: str) -> List[Tuple[float, float, bool]]:
+        cutoff = time.monotonic() - self.max_age
+        with self._lock:
+            return [sample for sample in self._samples.get(provider_name, ()) if sample[0] >= cutoff]
+    
+    def sample_count(self, provider_name: str) -> int:
+        """Number of recent attempts for a provider."""
+        return len(self._recent(provider_name))
+    
+    def error_rate(self, provider_name: str) -> float:
+        """
+        Fraction of recent attempts that failed or timed out.
+        
+        Returns:
+            Error rate between 0.0 and 1.0 (0.0 with no samples)
+        """
+        samples = self._recent(provider_name)
+        if not samples:
+            return 0.0
+        
+        return sum(1 for _, _, ok in samples if not ok) / len(samples)
+    
+    def latency_percentile(self, provider_name: str, percentile: float) -> Optional[float]:
+        """
+        Latency percentile of recent successful attempts.
+        
+        Args:
+            provider_name: Name of the provider
+            percentile: Percentile between 0 and 100
+        
+        Returns:
+            Latency in seconds, or None with no successful samples
+        """
+        latencies = sorted(latency for _, latency, ok in self._recent(provider_name) if ok)
+        if not latencies:
+            return None
+        
+        index = min(len(latencies) - 1, int(round(percentile / 100 * (len(latencies) - 1))))
+        return latencies[index]
+    
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the current stats for every provider seen.
+        
+        Returns:
+            Dictionary mapping provider name to samples, error_rate, p50 and p95
+        """
+        with self._lock:
+            names = list(self._samples)
+        
+        return {
+            name: {
+                'samples': self.sample_count(name),
+                'error_rate': self.error_rate(name),
+                'p50': self.latency_percentile(name, 50),
+                'p95': self.latency_percentile(name, 95)
+            }
+            for name in names
+        }
+
+
+class FailoverProvider(AIProvider):
+    """
+    Tries a ranked list of providers until one succeeds.
+    
+    A provider that errors or exceeds the timeout is skipped in favour of the
+    next one. With hedge_percentile set, a second provider is started when the
+    first one runs past that latency percentile, and whichever answers first
+    wins. Healthy providers are reordered by median latency once each has
+    enough samples; providers above max_error_rate are moved to the back.
+    """
+    
+    def __init__(self, providers: List[AIProvider], timeout: float = 60.0,
+                 hedge_percentile: Optional[float] = None, min_samples: int = 20,
+                 max_error_rate: float = 0.5, stats: Optional[ProviderStats] = None):
+        """
+        Initialize the failover provider.
+        
+        Args:
+            providers: Providers in rank order
+            timeout: Seconds each attempt may take before failing over
+            hedge_percentile: Latency percentile (e.g. 95) after which a hedge
+                request is sent to the next provider; None disables hedging
+            min_samples: Attempts needed before a provider's stats are trusted
+            max_error_rate: Error rate above which a provider is tried last
+            stats: Stats to read and update (defaults to the shared provider_stats)
+        """
+        if not providers:
+            raise ValueError("FailoverProvider needs at least one provider")
+        
+        self.api_key = None
+        self.providers = providers
+        self.timeout = timeout
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.stats = stats or provider_stats
+        
+        # Part of the response cache key
+        self.model = "+".join(provider.provider_name() for provider in providers)
+    
+    @classmethod
+    def provider_name(cls) -> str:
+        return "failover"
+    
+    def ranked_providers(self) -> List[AIProvider]:
+        """
+        Get the providers in the order they will be tried.
+        
+        Returns:
+            List of providers
+        """
+        healthy = []
+        unhealthy = []
+        
+        for provider in self.providers:
+            name = provider.provider_name()
+            trusted = self.stats.sample_count(name) >= self.min_samples
+            if trusted and self.stats.error_rate(name) > self.max_error_rate:
+                unhealthy.append(provider)
+            else:
+                healthy.append(provider)
+        
+        # Only reorder by speed once every healthy provider has been measured
+        if all(self.stats.sample_count(p.provider_name()) >= self.min_samples for p in healthy):
+            latency = {p.provider_name(): self.stats.latency_percentile(p.provider_name(), 50) for p in healthy}
+            healthy.sort(key=lambda p: latency[p.provider_name()] if latency[p.provider_name()] is not None
+                         else float('inf'))
+        
+        return healthy + unhealthy
+    
+    def _hedge_delay(self, provider: AIProvider) -> Optional[float]:
+        """Seconds to wait on a provider before hedging, or None to not hedge."""
+        if self.hedge_percentile is None:
+            return None
+        
+        name = provider.provider_name()
+        if self.stats.sample_count(name) < self.min_samples:
+            return None
+        
+        return self.stats.latency_percentile(name, self.hedge_percentile)
+    
+    def _generate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
+        """
+        Generate content with failover, waiting on provider threads.
+        
+        Attempts that time out are abandoned; their threads finish in the
+        background and the result is ignored.
+        """
+        remaining = self.ranked_providers()
+        hedge_delay = self._hedge_delay(remaining[0])
+        first_started = time.monotonic()
+        hedged = False
+        
+        pending: Dict[Future, Tuple[AIProvider, float]] = {}
+        errors = []
+        
+        def call(provider: AIProvider) -> str:
+            with provider_slot(provider.provider_name()):
+                return provider._generate_content(prompt, max_tokens=max_tokens, temperature=temperature)
+        
+        def launch() -> None:
+            provider = remaining.pop(0)
+            pending[_failover_executor.submit(call, provider)] = (provider, time.monotonic())
+        
+        launch()
+        
+        while pending:
+            now = time.monotonic()
+            wake = min(started + self.timeout for _, started in pending.values())
+            if hedge_delay is not None and not hedged and remaining:
+                wake = min(wake, first_started + hedge_delay)
+            
+            done, _ = wait(list(pending), timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            
+            for future in done:
+                provider, started = pending.pop(future)
+                name = provider.provider_name()
+                error = future.exception()
+                
+                self.stats.record(name, now - started, error is None)
+                if error is None:
+                    return future.result()
+                
+                errors.append(f"{name}: {str(error)}")
+            
+            for future, (provider, started) in list(pending.items()):
+                if now - started >= self.timeout:
+                    del pending[future]
+                    self.stats.record(provider.provider_name(), now - started, False)
+                    errors.append(f"{provider.provider_name()}: timed out after {self.timeout:g}s")
+            
+            if not pending and remaining:
+                launch()
+            elif (hedge_delay is not None and not hedged and remaining
+                    and now - first_started >= hedge_delay):
+                hedged = True
+                launch()
+        
+        raise Exception(f"All providers failed: {'; '.join(errors)}")
+    
+    async def _agenerate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
+        """Generate content with failover on the running event loop."""
+        loop = asyncio.get_running_loop()
+        remaining = self.ranked_providers()
+        hedge_delay = self._hedge_delay(remaining[0])
+        first_started = loop.time()
+        hedged = False
+        
+        pending: Dict[asyncio.Task, Tuple[AIProvider, float]] = {}
+        errors = []
+        
+        async def call(provider: AIProvider) -> str:
+            async with async_provider_slot(provider.provider_name()):
+                return await provider._agenerate_content(prompt, max_tokens=max_tokens, temperature=temperature)
+        
+        def launch() -> None:
+            provider = remaining.pop(0)
+            task = asyncio.ensure_future(call(provider))
+            pending[task] = (provider, loop.time())
+        
+        launch()
+        
+        try:
+            while pending:
+                now = loop.time()
+                wake = min(started + self.timeout for _, started in pending.values())
+                if hedge_delay is not None and not hedged and remaining:
+                    wake = min(wake, first_started + hedge_delay)
+                
+                done, _ = await asyncio.wait(list(pending), timeout=max(0.0, wake - now),
+                                             return_when=asyncio.FIRST_COMPLETED)
+                now = loop.time()
+                
+                for task in done:
+                    provider, started = pending.pop(task)
+                    name = provider.provider_name()
+                    error = task.exception()
+                    
+                    self.stats.record(name, now - started, error is None)
+                    if error is None:
+                        return task.result()
+                    
+                    errors.append(f"{name}: {str(error)}")
+                
+                for task, (provider, started) in list(pending.items()):
+                    if now - started >= self.timeout:
+                        del pending[task]
+                        task.cancel()
+                        self.stats.record(provider.provider_name(), now - started, False)
+                        errors.append(f"{provider.provider_name()}: timed out after {self.timeout:g}s")
+                
+                if not pending and remaining:
+                    launch()
+                elif (hedge_delay is not None and not hedged and remaining
+                        and now - first_started >= hedge_delay):
+                    hedged = True
+                    launch()
+        finally:
+            # Cancel the losing hedge, or everything if we were cancelled
+            for task in pending:
+                task.cancel()
+        
+        raise Exception(f"All providers failed: {'; '.join(errors)}")
+
+
+def get_failover_provider(provider_names: Optional[List[str]] = None, **options: Any) -> FailoverProvider:
+    """
+    Build a FailoverProvider from configured providers.
+    
+    Args:
+        provider_names: Providers in rank order (defaults to DEFAULT_PROVIDER_ORDER);
+            providers without a stored API key are skipped
+        **options: Passed to FailoverProvider (timeout, hedge_percentile, ...)
+    
+    Returns:
+        FailoverProvider instance
+    """
+    providers = [get_provider(name) for name in (provider_names or DEFAULT_PROVIDER_ORDER)]
+    providers = [provider for provider in providers if provider.api_key]
+    
+    if not providers:
+        raise ValueError("No AI provider has an API key set. Use save_api_key() first.")
+    
+    return FailoverProvider(providers, **options)
+
+
+# Worker threads for synchronous failover attempts, shared by all instances
+_failover_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="ai-failover")
+
+# Create a global instance
+provider_stats = ProviderStats()
@@ -0,0 +1,172 @@
+"""
+Asyncio pipeline for running many AI generations at once.
+"""
+
+import asyncio
+import threading
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Dict, Hashable, List, Optional, Tuple
+
+from .ai_failover import FailoverProvider
+from .ai_providers import AIProvider, async_provider_slot, run_coroutine
+
+class GenerationPipeline:
+    """
+    Runs many prompts against one provider concurrently on an event loop.
+    
+    A semaphore bounds how many requests are in flight, each request also
+    holds one of the provider's concurrency slots, each request gets its
+    own timeout, and cancel() stops the run from any thread. Failures and
+    timeouts are reported per prompt instead of aborting the whole run.
+    """
+    
+    def __init__(self, provider: AIProvider, max_concurrency: int = 100, timeout: float = 120.0,
+                 max_tokens: int = 700, temperature: float = 0.7, use_cache: bool = True):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            provider: AI provider to generate with
+            max_concurrency: Maximum number of requests in flight at once
+            timeout: Seconds each request may take, not counting time spent queued
+            max_tokens: Maximum number of tokens to generate per request
+            temperature: Controls randomness (0.0 to 1.0)
+            use_cache: Set to False to bypass the response cache
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        
+        self.provider = provider
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.use_cache = use_cache
+        
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self._cancelled = False
+    
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancel() has been called."""
+        return self._cancelled
+    
+    def cancel(self) -> None:
+        """
+        Cancel the run. Safe to call from any thread.
+        
+        Requests in flight are cancelled and queued ones never start. A
+        cancelled pipeline stays cancelled; create a new one to run again.
+        """
+        with self._lock:
+            self._cancelled = True
+            loop, tasks = self._loop, list(self._tasks)
+        
+        if loop is None:
+            return
+        
+        try:
+            loop.call_soon_threadsafe(lambda: [task.cancel() for task in tasks])
+        except RuntimeError:
+            # The loop has already closed, so there is nothing left to cancel
+            pass
+    
+    async def _generate(self, semaphore: asyncio.Semaphore, key: Hashable,
+                        prompt: str) -> Tuple[Hashable, Optional[str], Optional[Exception]]:
+        # FailoverProvider takes the slot of each provider it calls itself
+        if isinstance(self.provider, FailoverProvider):
+            provider_slot = nullcontext()
+        else:
+            provider_slot = async_provider_slot(self.provider.provider_name())
+        
+        async with semaphore, provider_slot:
+            try:
+                content = await asyncio.wait_for(
+                    self.provider.agenerate_content(
+                        prompt,
+                        max_tokens=self.max_tokens,
+                        temperature=self.temperature,
+                        use_cache=self.use_cache
+                    ),
+                    timeout=self.timeout
+                )
+            except asyncio.TimeoutError:
+                return key, None, TimeoutError(f"Generation timed out after {self.timeout:g}s")
+            except Exception as e:
+                return key, None, e
+        
+        return key, content, None
+    
+    async def stream(self, prompts: Dict[Hashable, str]) -> AsyncIterator[Tuple[Hashable, Optional[str], Optional[Exception]]]:
+        """
+        Generate every prompt, yielding results as they complete.
+        
+        Args:
+            prompts: Dictionary mapping a caller-chosen key to its prompt
+        
+        Yields:
+            (key, content, error) tuples in completion order; exactly one of
+            content and error is set. Prompts not finished when the run is
+            cancelled are not yielded.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        with self._lock:
+            if self._cancelled:
+                return
+            self._loop = asyncio.get_running_loop()
+            self._tasks = tasks = [
+                asyncio.ensure_future(self._generate(semaphore, key, prompt))
+                for key, prompt in prompts.items()
+            ]
+        
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    yield await next_done
+                except asyncio.CancelledError:
+                    if not self._cancelled:
+                        raise
+                    break
+        finally:
+            # Don't leave requests running if the run was cancelled or the consumer stopped early
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            
+            with self._lock:
+                self._loop = None
+                self._tasks = []
+    
+    async def run(self, prompts: Dict[Hashable, str]) -> Dict[Hashable, Dict[str, Any]]:
+        """
+        Generate every prompt and collect the results.
+        
+        Args:
+            prompts: Dictionary mapping a caller-chosen key to its prompt
+        
+        Returns:
+            Dictionary mapping each finished key to {'content': str or None, 'error': Exception or None}
+        """
+        results = {}
+        
+        async for key, content, error in self.stream(prompts):
+            results[key] = {'content': content, 'error': error}
+        
+        return results
+    
+    def run_sync(self, prompts: Dict[Hashable, str]) -> Dict[Hashable, Dict[str, Any]]:
+        """
+        Blocking wrapper around run() for Flask and Qt callers.
+        
+        Must not be called from a thread that is already running an event loop.
+        
+        Args:
+            prompts: Dictionary mapping a caller-chosen key to its prompt
+        
+        Returns:
+            Same as run()
+        """
+        return run_coroutine(self.run(prompts))
@@ -3,17 +3,65 @@ AI Providers module for content generation.
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Awaitable, Iterator, Optional, Dict, Any, Tuple, TypeVar
+import asyncio
+import functools
 import json
 import os
+import threading
+import weakref
 
 from .database import db
+from .ai_cache import response_cache
+
+# Maximum concurrent requests per provider, shared by every caller in the process
+PROVIDER_CONCURRENCY = {
+    "openai": 8,
+    "gemini": 4,
+    "claude": 4
+}
+DEFAULT_PROVIDER_CONCURRENCY = 4
+
+_provider_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_provider_semaphores_lock = threading.Lock()
+
+# asyncio semaphores only work on the loop they are used from, so the async
+# slots are kept per loop as (limit, semaphore) and rebuilt when the limit changes
+_async_provider_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Tuple[int, asyncio.Semaphore]]]" = \
+    weakref.WeakKeyDictionary()
+
+# Long-lived SDK clients shared by all provider instances, keyed by
+# (provider name, API key, model), so connection pools are reused across calls
+_sdk_clients: Dict[Tuple[str, str, str], Any] = {}
+_sdk_clients_lock = threading.Lock()
+
+# Async SDK clients hold connections bound to one event loop, so they are
+# cached per loop and released with it
+_async_sdk_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str, str], Any]]" = \
+    weakref.WeakKeyDictionary()
+
+# Event loop that run_coroutine() runs blocking callers' coroutines on, so the
+# async clients and slots cached for it are reused instead of rebuilt per call
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_loop_lock = threading.Lock()
+
+T = TypeVar("T")
 
 class AIProvider(ABC):
     """
     Abstract base class for AI content generation providers.
+    
+    Subclasses implement _generate_content; generate_content adds the
+    response cache in front of it. agenerate_content is the coroutine
+    equivalent: subclasses with an async SDK client override
+    _agenerate_content, the others run _generate_content in an executor.
     """
     
+    # Model and system prompt sent with every request (part of the cache key)
+    model: str = ""
+    system_prompt: Optional[str] = None
+    
     def __init__(self, api_key: Optional[str] = None):
         """
         Initialize the AI provider with an API key.
@@ -38,10 +86,141 @@ class AIProvider(ABC):
         """
         pass
     
+    def generate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7,
+                         use_cache: bool = True) -> str:
+        """
+        Generate content using the AI provider, reusing a cached response when available.
+        
+        Args:
+            prompt: The prompt for content generation
+            max_tokens: Maximum number of tokens to generate
+            temperature: Controls randomness (0.0 to 1.0)
+            use_cache: Set to False to always call the provider (e.g. to get a fresh variation)
+            
+        Returns:
+            Generated content
+        """
+        cache_args = (self.provider_name(), self.model, self.system_prompt, prompt, temperature, max_tokens)
+        
+        if use_cache:
+            cached = response_cache.get(*cache_args)
+            if cached is not None:
+                return cached
+        
+        content = self._generate_content(prompt, max_tokens=max_tokens, temperature=temperature)
+        
+        if use_cache:
+            response_cache.put(*cache_args, content)
+        
+        return content
+    
+    async def agenerate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7,
+                                use_cache: bool = True) -> str:
+        """
+        Coroutine version of generate_content.
+        
+        Args:
+            prompt: The prompt for content generation
+            max_tokens: Maximum number of tokens to generate
+            temperature: Controls randomness (0.0 to 1.0)
+            use_cache: Set to False to always call the provider (e.g. to get a fresh variation)
+            
+        Returns:
+            Generated content
+        """
+        cache_args = (self.provider_name(), self.model, self.system_prompt, prompt, temperature, max_tokens)
+        
+        # Cache reads and writes are SQLite calls, keep them off the event loop
+        if use_cache:
+            cached = await asyncio.to_thread(response_cache.get, *cache_args)
+            if cached is not None:
+                return cached
+        
+        content = await self._agenerate_content(prompt, max_tokens=max_tokens, temperature=temperature)
+        
+        if use_cache:
+            await asyncio.to_thread(response_cache.put, *cache_args, content)
+        
+        return content
+    
+    async def _agenerate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
+        """
+        Call the provider's API without blocking the event loop.
+        
+        The default runs the blocking _generate_content in the loop's default
+        executor. If the awaiting task is cancelled, the executor thread still
+        finishes its request; only the result is discarded.
+        
+        Args:
+            prompt: The prompt for content generation
+            max_tokens: Maximum number of tokens to generate
+            temperature: Controls randomness (0.0 to 1.0)
+            
+        Returns:
+            Generated content
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(self._generate_content, prompt, max_tokens=max_tokens, temperature=temperature)
+        )
+    
+    def _get_client(self) -> Any:
+        """
+        Get the SDK client for this provider's API key, creating it on first use.
+        
+        Returns:
+            SDK client object
+        """
+        key = (self.provider_name(), self.api_key, self.model)
+        
+        with _sdk_clients_lock:
+            client = _sdk_clients.get(key)
+            if client is None:
+                client = _sdk_clients[key] = self._create_client()
+        
+        return client
+    
+    def _create_client(self) -> Any:
+        """
+        Create the SDK client. Called once per API key and model.
+        
+        Returns:
+            SDK client object
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not use an SDK client")
+    
+    def _get_async_client(self) -> Any:
+        """
+        Get the async SDK client for this provider's API key on the running event loop.
+        
+        Returns:
+            Async SDK client object
+        """
+        loop = asyncio.get_running_loop()
+        key = (self.provider_name(), self.api_key, self.model)
+        
+        with _sdk_clients_lock:
+            clients = _async_sdk_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                client = clients[key] = self._create_async_client()
+        
+        return client
+    
+    def _create_async_client(self) -> Any:
+        """
+        Create the async SDK client. Called once per API key, model and event loop.
+        
+        Returns:
+            Async SDK client object
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not use an async SDK client")
+    
     @abstractmethod
-    def generate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
+    def _generate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
         """
-        Generate content using the AI provider.
+        Call the provider's API to generate content.
         
         Args:
             prompt: The prompt for content generation
@@ -60,8 +239,18 @@ class AIProvider(ABC):
         Args:
             api_key: API key to save
         """
+        old_key = self.api_key
         self.api_key = api_key
         db.set_credential(self.provider_name(), 'api_key', api_key)
+        
+        # Drop clients built for the replaced key
+        if old_key and old_key != api_key:
+            with _sdk_clients_lock:
+                for key in [k for k in _sdk_clients if k[:2] == (self.provider_name(), old_key)]:
+                    del _sdk_clients[key]
+                for clients in _async_sdk_clients.values():
+                    for key in [k for k in clients if k[:2] == (self.provider_name(), old_key)]:
+                        del clients[key]
 
 
 class OpenAIProvider(AIProvider):
@@ -69,11 +258,30 @@ class OpenAIProvider(AIProvider):
     OpenAI (GPT) implementation.
     """
     
+    model = "gpt-4"
+    system_prompt = "You are an expert sales consultant with years of experience in home sales."
+    
     @classmethod
     def provider_name(cls) -> str:
         return "openai"
     
-    def generate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
+    def _create_client(self) -> Any:
+        try:
+            import openai
+        except ImportError:
+            raise ImportError("OpenAI package not installed. Run: pip install openai")
+        
+        return openai.OpenAI(api_key=self.api_key)
+    
+    def _create_async_client(self) -> Any:
+        try:
+            import openai
+        except ImportError:
+            raise ImportError("OpenAI package not installed. Run: pip install openai")
+        
+        return openai.AsyncOpenAI(api_key=self.api_key)
+    
+    def _generate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
         """
         Generate content using OpenAI's GPT.
         
@@ -85,21 +293,37 @@ class OpenAIProvider(AIProvider):
         Returns:
             Generated content
         """
-        try:
-            import openai
-        except ImportError:
-            raise ImportError("OpenAI package not installed. Run: pip install openai")
+        if not self.api_key:
+            raise ValueError("OpenAI API key not set. Use save_api_key() first.")
         
+        client = self._get_client()
+        
+        try:
+            response = client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": self.system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            raise Exception(f"OpenAI generation failed: {str(e)}")
+    
+    async def _agenerate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
         if not self.api_key:
             raise ValueError("OpenAI API key not set. Use save_api_key() first.")
         
-        openai.api_key = self.api_key
+        client = self._get_async_client()
         
         try:
-            response = openai.chat.completions.create(
-                model="gpt-4",
+            response = await client.chat.completions.create(
+                model=self.model,
                 messages=[
-                    {"role": "system", "content": "You are an expert sales consultant with years of experience in home sales."},
+                    {"role": "system", "content": self.system_prompt},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=temperature,
@@ -116,11 +340,35 @@ class GeminiProvider(AIProvider):
     Google Gemini implementation.
     """
     
+    model = "gemini-pro"
+    
     @classmethod
     def provider_name(cls) -> str:
         return "gemini"
     
-    def generate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
+    def _create_client(self) -> Any:
+        glm, _ = _import_gemini()
+        # The key goes to this client, not to genai.configure(), which is
+        # process-wide and would switch every cached client to the last key set
+        return glm.GenerativeServiceClient(client_options={"api_key": self.api_key})
+    
+    def _create_async_client(self) -> Any:
+        glm, _ = _import_gemini()
+        return glm.GenerativeServiceAsyncClient(client_options={"api_key": self.api_key})
+    
+    def _build_request(self, prompt: str, max_tokens: int, temperature: float) -> Any:
+        """Build a generateContent request for this provider's model."""
+        _, genai = _import_gemini()
+        return genai.protos.GenerateContentRequest(
+            model=f"models/{self.model}",
+            contents=[genai.protos.Content(role="user", parts=[genai.protos.Part(text=prompt)])],
+            generation_config=genai.protos.GenerationConfig(
+                temperature=temperature,
+                max_output_tokens=max_tokens,
+            )
+        )
+    
+    def _generate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
         """
         Generate content using Google's Gemini.
         
@@ -132,41 +380,72 @@ class GeminiProvider(AIProvider):
         Returns:
             Generated content
         """
-        try:
-            import google.generativeai as genai
-        except ImportError:
-            raise ImportError("Google Generative AI package not installed. Run: pip install google-generativeai")
+        if not self.api_key:
+            raise ValueError("Gemini API key not set. Use save_api_key() first.")
+        
+        client = self._get_client()
+        _, genai = _import_gemini()
         
+        try:
+            response = client.generate_content(request=self._build_request(prompt, max_tokens, temperature))
+            return genai.types.GenerateContentResponse.from_response(response).text
+        except Exception as e:
+            raise Exception(f"Gemini generation failed: {str(e)}")
+    
+    async def _agenerate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
         if not self.api_key:
             raise ValueError("Gemini API key not set. Use save_api_key() first.")
         
-        genai.configure(api_key=self.api_key)
-        model = genai.GenerativeModel('gemini-pro')
+        client = self._get_async_client()
+        _, genai = _import_gemini()
         
         try:
-            response = model.generate_content(
-                prompt,
-                generation_config={
-                    "temperature": temperature,
-                    "max_output_tokens": max_tokens,
-                }
-            )
-            
-            return response.text
+            response = await client.generate_content(request=self._build_request(prompt, max_tokens, temperature))
+            return genai.types.AsyncGenerateContentResponse.from_response(response).text
         except Exception as e:
             raise Exception(f"Gemini generation failed: {str(e)}")
 
 
+def _import_gemini() -> Tuple[Any, Any]:
+    """Import the Gemini SDK modules (google.ai.generativelanguage, google.generativeai)."""
+    try:
+        import google.ai.generativelanguage as glm
+        import google.generativeai as genai
+    except ImportError:
+        raise ImportError("Google Generative AI package not installed. Run: pip install google-generativeai")
+    
+    return glm, genai
+
+
 class ClaudeProvider(AIProvider):
     """
     Anthropic Claude implementation.
     """
     
+    model = "claude-3-7-sonnet-20250219"  # Updated to the latest Claude model as of May 2025
+    system_prompt = "You are an expert real estate marketing consultant with years of experience in home sales."
+    
     @classmethod
     def provider_name(cls) -> str:
         return "claude"
     
-    def generate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
+    def _create_client(self) -> Any:
+        try:
+            import anthropic
+        except ImportError:
+            raise ImportError("Anthropic package not installed. Run: pip install anthropic")
+        
+        return anthropic.Anthropic(api_key=self.api_key)
+    
+    def _create_async_client(self) -> Any:
+        try:
+            import anthropic
+        except ImportError:
+            raise ImportError("Anthropic package not installed. Run: pip install anthropic")
+        
+        return anthropic.AsyncAnthropic(api_key=self.api_key)
+    
+    def _generate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
         """
         Generate content using Anthropic's Claude.
         
@@ -178,22 +457,38 @@ class ClaudeProvider(AIProvider):
         Returns:
             Generated content
         """
-        try:
-            import anthropic
-        except ImportError:
-            raise ImportError("Anthropic package not installed. Run: pip install anthropic")
-        
         if not self.api_key:
             raise ValueError("Claude API key not set. Use save_api_key() first.")
         
-        client = anthropic.Anthropic(api_key=self.api_key)
+        client = self._get_client()
         
         try:
             response = client.messages.create(
-                model="claude-3-7-sonnet-20250219",  # Updated to the latest Claude model as of May 2025
+                model=self.model,
                 max_tokens=max_tokens,
                 temperature=temperature,
-                system="You are an expert real estate marketing consultant with years of experience in home sales.",
+                system=self.system_prompt,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ]
+            )
+            
+            return response.content[0].text
+        except Exception as e:
+            raise Exception(f"Claude generation failed: {str(e)}")
+    
+    async def _agenerate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
+        if not self.api_key:
+            raise ValueError("Claude API key not set. Use save_api_key() first.")
+        
+        client = self._get_async_client()
+        
+        try:
+            response = await client.messages.create(
+                model=self.model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=self.system_prompt,
                 messages=[
                     {"role": "user", "content": prompt}
                 ]
@@ -209,12 +504,17 @@ def get_provider(provider_name: str, api_key: Optional[str] = None) -> AIProvide
     Factory function to get the appropriate AI provider.
     
     Args:
-        provider_name: Name of the provider ('openai', 'gemini', or 'claude')
+        provider_name: Name of the provider ('openai', 'gemini', 'claude', or
+            'failover' for every provider with a stored key, with failover)
         api_key: Optional API key (if not provided, will try to load from database)
         
     Returns:
         AIProvider instance
     """
+    if provider_name == "failover":
+        from .ai_failover import get_failover_provider
+        return get_failover_provider()
+    
     providers = {
         "openai": OpenAIProvider,
         "gemini": GeminiProvider,
@@ -227,6 +527,114 @@ def get_provider(provider_name: str, api_key: Optional[str] = None) -> AIProvide
     return providers[provider_name](api_key)
 
 
+def set_provider_concurrency(provider_name: str, limit: int) -> None:
+    """
+    Change the maximum number of concurrent requests to a provider.
+    
+    Requests already holding a slot finish under the previous limit.
+    
+    Args:
+        provider_name: Name of the provider
+        limit: Maximum concurrent requests
+    """
+    if limit < 1:
+        raise ValueError("Provider concurrency limit must be at least 1")
+    
+    with _provider_semaphores_lock:
+        PROVIDER_CONCURRENCY[provider_name] = limit
+        _provider_semaphores[provider_name] = threading.BoundedSemaphore(limit)
+
+
+@contextmanager
+def provider_slot(provider_name: str) -> Iterator[None]:
+    """
+    Hold one of the provider's concurrency slots for the duration of a request.
+    
+    Args:
+        provider_name: Name of the provider
+    """
+    with _provider_semaphores_lock:
+        semaphore = _provider_semaphores.get(provider_name)
+        if semaphore is None:
+            limit = PROVIDER_CONCURRENCY.get(provider_name, DEFAULT_PROVIDER_CONCURRENCY)
+            semaphore = _provider_semaphores[provider_name] = threading.BoundedSemaphore(limit)
+    
+    with semaphore:
+        yield
+
+
+@asynccontextmanager
+async def async_provider_slot(provider_name: str) -> AsyncIterator[None]:
+    """
+    Hold one of the provider's concurrency slots on the running event loop.
+    
+    Uses the same limits as provider_slot(); the slots are counted per event
+    loop, so requests made from other threads are not included.
+    
+    Args:
+        provider_name: Name of the provider
+    """
+    loop = asyncio.get_running_loop()
+    
+    with _provider_semaphores_lock:
+        limit = PROVIDER_CONCURRENCY.get(provider_name, DEFAULT_PROVIDER_CONCURRENCY)
+        semaphores = _async_provider_semaphores.setdefault(loop, {})
+        current = semaphores.get(provider_name)
+        if current is None or current[0] != limit:
+            current = semaphores[provider_name] = (limit, asyncio.Semaphore(limit))
+    
+    async with current[1]:
+        yield
+
+
+def run_coroutine(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine on the shared background event loop and wait for its result.
+    
+    Blocking callers use this instead of asyncio.run(), which would build and
+    abandon a new loop, with new async SDK clients, on every call.
+    Must not be called from a thread that is already running an event loop.
+    
+    Args:
+        coro: Coroutine to run
+        
+    Returns:
+        The coroutine's result
+    """
+    global _background_loop
+    
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        raise RuntimeError("run_coroutine() cannot be called from a running event loop")
+    
+    with _background_loop_lock:
+        if _background_loop is None:
+            _background_loop = asyncio.new_event_loop()
+            threading.Thread(target=_background_loop.run_forever, name="ai-provider-loop",
+                             daemon=True).start()
+        loop = _background_loop
+    
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result()
+    finally:
+        # Interrupted callers (e.g. KeyboardInterrupt) stop waiting; don't leave the task running
+        future.cancel()
+
+
+def _reset_background_loop() -> None:
+    """Forget the background loop in a forked child, where its thread does not exist."""
+    global _background_loop
+    _background_loop = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_background_loop)
+
+
 def save_provider_api_key(provider_name: str, api_key: str) -> None:
     """
     Save an API key for a provider.
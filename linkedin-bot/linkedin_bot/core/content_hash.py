@@ -0,0 +1,38 @@
+"""
+Normalized text hashes used to keep duplicate content out of the repository.
+"""
+
+import hashlib
+import unicodedata
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize post text for duplicate detection.
+    
+    Applies Unicode NFKC normalization, case folding and whitespace collapsing,
+    so posts that differ only in case, spacing or equivalent characters match.
+    
+    Args:
+        text: Post text
+        
+    Returns:
+        Normalized text
+    """
+    # ASCII text is already NFKC-normalized, and is most of what gets imported
+    if not text.isascii():
+        text = unicodedata.normalize('NFKC', text)
+    
+    return ' '.join(text.casefold().split())
+
+
+def content_hash(text: str) -> str:
+    """
+    Hash post text after normalization.
+    
+    Args:
+        text: Post text
+        
+    Returns:
+        Hex SHA-256 digest of the normalized text
+    """
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
@@ -2,24 +2,166 @@
 Core database module that provides a unified interface for database operations.
 """
 import os
+import re
+import socket
 import sqlite3
 import threading
 import time
-from typing import List, Dict, Any, Tuple, Optional, Union
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, List, Dict, Any, Tuple, Optional, Union
+
+from .content_hash import content_hash
+from .search import CATEGORY_KEY_SQL
+
+class Row(sqlite3.Row):
+    """
+    Result row built natively by sqlite3, with the dict-style helpers callers use.
+    
+    Supports row['column'], row.get('column', default), 'column' in row and
+    dict(row). Column names are looked up in the cursor description only when
+    accessed, so fetching a row costs no Python-level work.
+    """
+    __slots__ = ()
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get a column value, or default if the row has no such column.
+        
+        Args:
+            key: Column name
+            default: Value to return if the column doesn't exist
+            
+        Returns:
+            Column value or default
+        """
+        try:
+            return self[key]
+        except IndexError:
+            return default
+    
+    def __contains__(self, key: object) -> bool:
+        return key in self.keys()
+    
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
 
 class Database:
     """
     Database class that handles connections and operations with SQLite.
     Uses thread-local storage for connections to ensure thread safety.
+    
+    Connections use WAL journaling so readers never block on a writer, and a
+    busy timeout so writers wait inside SQLite instead of failing immediately.
     """
-    _local = threading.local()
     
-    def __init__(self, db_path: str = None):
+    # Secondary indexes for the hot WHERE / ORDER BY clauses, keyed by name.
+    # _init_db creates missing ones and drops any other idx_* index, so this
+    # dictionary is the single source of truth for the schema's indexes.
+    INDEXES = {
+        # Scheduler: status = 'pending' AND schedule_time <= ?
+        'idx_scheduled_posts_pending_due':
+            "ON scheduled_posts (schedule_time) WHERE status = 'pending'",
+        # Review queue: needs_review = 1 AND reviewed = 0 AND status = 'pending', by schedule_time
+        'idx_scheduled_posts_review_due':
+            "ON scheduled_posts (schedule_time) "
+            "WHERE needs_review = 1 AND reviewed = 0 AND status = 'pending'",
+        # Scheduler: status = 'retrying' AND next_attempt_at <= ?
+        'idx_scheduled_posts_retry_due':
+            "ON scheduled_posts (next_attempt_at) WHERE status = 'retrying'",
+        # Reclaiming expired leases: status = 'publishing' AND lease_expires <= ?
+        'idx_scheduled_posts_lease_expiry':
+            "ON scheduled_posts (lease_expires) WHERE status = 'publishing'",
+        # Topics by campaign, optionally filtered and ordered by is_used
+        'idx_campaign_topics_campaign_used':
+            "ON campaign_topics (campaign_id, is_used)",
+        # Unused content, optionally by category
+        'idx_content_repository_unused_category':
+            "ON content_repository (category) WHERE is_used = 0",
+        # Category equality and DISTINCT category
+        'idx_content_repository_category':
+            "ON content_repository (category)",
+        # Campaign content, optionally filtered by is_used
+        'idx_content_repository_campaign_used':
+            "ON content_repository (campaign_id, is_used)",
+        # Content by topic (also serves ON DELETE SET NULL from campaign_topics)
+        'idx_content_repository_topic':
+            "ON content_repository (topic_id)",
+        # One row per normalized text; the conflict target for upsert-or-skip inserts
+        'idx_content_repository_hash':
+            "ON content_repository (content_hash)",
+        # Content flagged as a near duplicate of a row (serves ON DELETE SET NULL)
+        'idx_content_repository_near_duplicate':
+            "ON content_repository (near_duplicate_of) WHERE near_duplicate_of IS NOT NULL",
+        # Near-duplicate candidates: band_N = ? for each of the NUM_BANDS (near_duplicates.py) bands
+        **{
+            f'idx_content_signatures_band_{band}': f"ON content_signatures (band_{band})"
+            for band in range(8)
+        },
+        # Signatures whose content was edited, waiting to be signed again
+        'idx_content_signatures_stale':
+            "ON content_signatures (content_id) WHERE stale = 1",
+        # Posts by source content (also serves ON DELETE SET NULL from content_repository)
+        'idx_scheduled_posts_content':
+            "ON scheduled_posts (content_id)",
+        # Response cache expiry and least-recently-used eviction
+        'idx_ai_response_cache_created':
+            "ON ai_response_cache (created_at)",
+        'idx_ai_response_cache_last_used':
+            "ON ai_response_cache (last_used_at)",
+    }
+    
+    # Indexes from INDEXES that are created as UNIQUE
+    UNIQUE_INDEXES = {'idx_content_repository_hash'}
+    
+    # FTS5 full-text indexes over a table's columns, kept in sync by triggers:
+    # name -> (table, indexed columns)
+    FULL_TEXT_INDEXES = {
+        'content_repository_fts': ('content_repository', ('post_text', 'category', 'category_key')),
+        'scheduled_posts_fts': ('scheduled_posts', ('post_text', 'status')),
+    }
+    
+    # Rows indexed per transaction when a deferred full-text index catches up
+    FULL_TEXT_CATCH_UP_ROWS = 50000
+    
+    # Seconds a full-text deferral stays reserved for its owner without being
+    # renewed; after that another process may index its rows
+    FULL_TEXT_DEFERRAL_LEASE = 600
+    
+    # Tables whose writes are counted in table_changes by triggers, so pollers
+    # can tell their changes apart from other writes: table -> columns whose
+    # updates count (inserts and deletes always do)
+    CHANGE_COUNTED_TABLES = {
+        'scheduled_posts': ('schedule_time', 'status', 'next_attempt_at', 'reviewed', 'needs_review',
+                            'lease_expires'),
+    }
+    
+    # Schema migrations, applied in order to databases whose user_version is
+    # lower than the migration's position (1-based) in this list
+    MIGRATIONS = [
+        '_migrate_campaign_links',
+        '_migrate_publish_retries',
+        '_migrate_publish_leases',
+        '_migrate_content_hashes',
+        '_migrate_near_duplicates',
+        '_migrate_full_text_search',
+        '_migrate_change_counters',
+        '_migrate_signature_invalidation',
+        '_migrate_deferred_full_text_indexing',
+        '_migrate_full_text_deferred_ranges',
+    ]
+    
+    def __init__(self, db_path: str = None, busy_timeout_ms: int = 5000,
+                 cache_size_kib: int = 16384, mmap_size: int = 64 * 1024 * 1024):
         """
         Initialize the database connection.
         
         Args:
             db_path: Path to the SQLite database file. If None, uses default path.
+            busy_timeout_ms: Milliseconds a connection waits for a lock before failing
+            cache_size_kib: Page cache size per connection, in KiB
+            mmap_size: Bytes of the database file to memory-map (0 disables mmap)
         """
         if db_path is None:
             # Default to user's home directory for desktop app
@@ -29,6 +171,10 @@ class Database:
             db_path = os.path.join(db_dir, "linkedin_bot.db")
             
         self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size = mmap_size
+        self._local = threading.local()
         self._init_db()
     
     def _get_connection(self) -> sqlite3.Connection:
@@ -39,13 +185,20 @@ class Database:
             SQLite connection object
         """
         if not hasattr(self._local, 'connection'):
-            self._local.connection = sqlite3.connect(self.db_path)
+            self._local.connection = sqlite3.connect(
+                self.db_path, timeout=self.busy_timeout_ms / 1000
+            )
+            # WAL lets readers proceed while another connection writes;
+            # NORMAL sync is durable in WAL mode and avoids an fsync per commit
+            self._local.connection.execute("PRAGMA journal_mode = WAL")
+            self._local.connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+            self._local.connection.execute(f"PRAGMA cache_size = {-int(self.cache_size_kib)}")
+            self._local.connection.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
             # Enable foreign keys
             self._local.connection.execute("PRAGMA foreign_keys = ON")
-            # Configure connection to return rows as dictionaries
-            self._local.connection.row_factory = lambda c, r: {
-                col[0]: r[idx] for idx, col in enumerate(c.description)
-            }
+            # Return rows that support key access like dictionaries
+            self._local.connection.row_factory = Row
         
         return self._local.connection
     
@@ -63,17 +216,29 @@ class Database:
             status TEXT DEFAULT 'pending',
             created_at TEXT DEFAULT CURRENT_TIMESTAMP,
             needs_review INTEGER DEFAULT 0,
-            reviewed INTEGER DEFAULT 0
+            reviewed INTEGER DEFAULT 0,
+            content_id INTEGER REFERENCES content_repository (id) ON DELETE SET NULL,
+            attempt_count INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TEXT,
+            last_error TEXT,
+            lease_owner TEXT,
+            lease_expires TEXT
         )
         ''')
         
-        cursor.execute('''
+        cursor.execute(f'''
         CREATE TABLE IF NOT EXISTS content_repository (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             post_text TEXT NOT NULL,
             category TEXT,
             is_used INTEGER DEFAULT 0,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            campaign_id INTEGER REFERENCES campaigns (id) ON DELETE CASCADE,
+            topic_id INTEGER REFERENCES campaign_topics (id) ON DELETE SET NULL,
+            content_hash TEXT,
+            near_duplicate_of INTEGER REFERENCES content_repository (id) ON DELETE SET NULL,
+            near_duplicate_similarity REAL,
+            category_key TEXT GENERATED ALWAYS AS ({CATEGORY_KEY_SQL}) VIRTUAL
         )
         ''')
         
@@ -124,12 +289,483 @@ class Database:
         )
         ''')
         
+        # Cache of AI provider responses, keyed by a hash of the request
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ai_response_cache (
+            key TEXT PRIMARY KEY,
+            provider TEXT NOT NULL,
+            model TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL
+        )
+        ''')
+        
+        # Rows whose full-text indexing is deferred, as id ranges per index (see
+        # deferred_full_text_index); to_id is NULL while the owner's transaction
+        # is still inserting the range
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS full_text_deferred_ranges (
+            index_name TEXT NOT NULL,
+            from_id INTEGER NOT NULL,
+            to_id INTEGER,
+            owner TEXT NOT NULL,
+            lease_expires REAL NOT NULL,
+            PRIMARY KEY (index_name, from_id)
+        )
+        ''')
+        
+        # Write counters maintained by triggers for CHANGE_COUNTED_TABLES
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS table_changes (
+            table_name TEXT PRIMARY KEY,
+            change_count INTEGER NOT NULL DEFAULT 0
+        )
+        ''')
+        
+        # Publishing token buckets shared by every process (see rate_limiter.py)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+            bucket TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated REAL NOT NULL,
+            blocked_until REAL NOT NULL DEFAULT 0
+        )
+        ''')
+        
+        # MinHash signature and LSH band keys per content item (see near_duplicates.py)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS content_signatures (
+            content_id INTEGER PRIMARY KEY REFERENCES content_repository (id) ON DELETE CASCADE,
+            signature BLOB,
+            band_0 INTEGER,
+            band_1 INTEGER,
+            band_2 INTEGER,
+            band_3 INTEGER,
+            band_4 INTEGER,
+            band_5 INTEGER,
+            band_6 INTEGER,
+            band_7 INTEGER,
+            stale INTEGER NOT NULL DEFAULT 0
+        )
+        ''')
+        
+        # Highest content_repository id NearDuplicateIndex.sync has reached
+        # (rows signed one at a time can be ahead of it)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS content_signature_sync (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            last_id INTEGER NOT NULL
+        )
+        ''')
+        
+        # Heartbeats from scheduler workers, one row per running scheduler
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scheduler_workers (
+            worker_id TEXT PRIMARY KEY,
+            hostname TEXT NOT NULL,
+            pid INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            concurrency INTEGER NOT NULL,
+            in_flight INTEGER NOT NULL DEFAULT 0,
+            started_at TEXT NOT NULL,
+            last_heartbeat TEXT NOT NULL
+        )
+        ''')
+        
         conn.commit()
+        
+        self._migrate(conn)
+        
+        self._init_indexes(cursor)
+        
+        conn.commit()
+        
+        # Index rows skipped by an import that was interrupted
+        self.finish_deferred_full_text_indexes()
+    
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """
+        Apply pending schema migrations, each in its own transaction.
+        
+        Args:
+            conn: Connection being initialized
+        """
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        
+        for target_version, name in enumerate(self.MIGRATIONS, start=1):
+            if version >= target_version:
+                continue
+            
+            with self.transaction():
+                getattr(self, name)(conn.cursor())
+                conn.execute(f"PRAGMA user_version = {target_version}")
+            
+            print(f"Applied database migration {target_version}: {name}")
+    
+    @staticmethod
+    def _add_column(cursor: sqlite3.Cursor, table: str, column: str, definition: str) -> None:
+        """
+        Add a column to a table unless it already exists.
+        
+        Args:
+            cursor: Database cursor
+            table: Table name
+            column: Column name
+            definition: Column type and constraints
+        """
+        # table_xinfo also lists generated columns
+        columns = {row['name'] for row in cursor.execute(f"PRAGMA table_xinfo({table})").fetchall()}
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    
+    def _migrate_campaign_links(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Add campaign_id/topic_id to content_repository and content_id to scheduled_posts.
+        
+        Existing rows are backfilled by parsing 'Campaign: {id} - {topic}' categories
+        and by matching scheduled post text to repository content.
+        
+        Args:
+            cursor: Database cursor
+        """
+        self._add_column(cursor, 'content_repository', 'campaign_id',
+                         "INTEGER REFERENCES campaigns (id) ON DELETE CASCADE")
+        self._add_column(cursor, 'content_repository', 'topic_id',
+                         "INTEGER REFERENCES campaign_topics (id) ON DELETE SET NULL")
+        self._add_column(cursor, 'scheduled_posts', 'content_id',
+                         "INTEGER REFERENCES content_repository (id) ON DELETE SET NULL")
+        
+        campaign_ids = {row['id'] for row in cursor.execute("SELECT id FROM campaigns").fetchall()}
+        topic_ids = {}
+        for row in cursor.execute("SELECT id, campaign_id, topic FROM campaign_topics ORDER BY id").fetchall():
+            topic_ids.setdefault((row['campaign_id'], row['topic']), row['id'])
+        
+        category_pattern = re.compile(r"^Campaign: (\d+)(?: - (.*))?$", re.DOTALL)
+        content_links = []
+        for row in cursor.execute(
+            "SELECT id, category FROM content_repository WHERE campaign_id IS NULL AND category IS NOT NULL"
+        ).fetchall():
+            match = category_pattern.match(row['category'])
+            if not match or int(match.group(1)) not in campaign_ids:
+                continue
+            
+            campaign_id = int(match.group(1))
+            content_links.append((campaign_id, topic_ids.get((campaign_id, match.group(2))), row['id']))
+        
+        cursor.executemany(
+            "UPDATE content_repository SET campaign_id = ?, topic_id = ? WHERE id = ?",
+            content_links
+        )
+        
+        # Link scheduled posts to the (first) repository item with the same text
+        content_by_text = {}
+        for row in cursor.execute("SELECT id, post_text FROM content_repository ORDER BY id").fetchall():
+            content_by_text.setdefault(row['post_text'], row['id'])
+        
+        post_links = []
+        for row in cursor.execute("SELECT id, post_text FROM scheduled_posts WHERE content_id IS NULL").fetchall():
+            content_id = content_by_text.get(row['post_text'])
+            if content_id is not None:
+                post_links.append((content_id, row['id']))
+        
+        cursor.executemany("UPDATE scheduled_posts SET content_id = ? WHERE id = ?", post_links)
+    
+    def _migrate_publish_retries(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Add attempt_count, next_attempt_at and last_error to scheduled_posts.
+        
+        Posts that failed before retries existed become dead letters, with the
+        ' [ERROR: ...]' suffix that used to be appended to their text moved
+        into last_error.
+        
+        Args:
+            cursor: Database cursor
+        """
+        self._add_column(cursor, 'scheduled_posts', 'attempt_count', "INTEGER NOT NULL DEFAULT 0")
+        self._add_column(cursor, 'scheduled_posts', 'next_attempt_at', "TEXT")
+        self._add_column(cursor, 'scheduled_posts', 'last_error', "TEXT")
+        
+        error_pattern = re.compile(r"^(.*) \[ERROR: (.*)\]$", re.DOTALL)
+        dead_posts = []
+        for row in cursor.execute("SELECT id, post_text FROM scheduled_posts WHERE status = 'failed'").fetchall():
+            match = error_pattern.match(row['post_text'])
+            if match:
+                dead_posts.append((match.group(1), match.group(2), row['id']))
+            else:
+                dead_posts.append((row['post_text'], None, row['id']))
+        
+        cursor.executemany(
+            "UPDATE scheduled_posts SET status = 'dead', attempt_count = 1, post_text = ?, last_error = ? "
+            "WHERE id = ?",
+            dead_posts
+        )
+    
+    def _migrate_publish_leases(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Add lease_owner and lease_expires to scheduled_posts.
+        
+        Args:
+            cursor: Database cursor
+        """
+        self._add_column(cursor, 'scheduled_posts', 'lease_owner', "TEXT")
+        self._add_column(cursor, 'scheduled_posts', 'lease_expires', "TEXT")
+    
+    def _migrate_content_hashes(self, cursor: sqlite3.Cursor, batch_size: int = 5000) -> None:
+        """
+        Add content_hash to content_repository and backfill it.
+        
+        The unique index is created first and rows are hashed in id order, so
+        the oldest copy of duplicated text keeps the hash and later copies are
+        left with a NULL content_hash rather than being deleted.
+        
+        Args:
+            cursor: Database cursor
+            batch_size: Rows hashed per batch
+        """
+        self._add_column(cursor, 'content_repository', 'content_hash', "TEXT")
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_content_repository_hash "
+            f"{self.INDEXES['idx_content_repository_hash']}"
+        )
+        
+        last_id = 0
+        duplicates = 0
+        while True:
+            rows = cursor.execute(
+                "SELECT id, post_text FROM content_repository WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size)
+            ).fetchall()
+            if not rows:
+                break
+            
+            cursor.executemany(
+                "UPDATE OR IGNORE content_repository SET content_hash = ? WHERE id = ?",
+                [(content_hash(row['post_text']), row['id']) for row in rows]
+            )
+            duplicates += len(rows) - cursor.rowcount
+            last_id = rows[-1]['id']
+        
+        if duplicates:
+            print(f"{duplicates} duplicate content items were left without a content hash")
+    
+    def _migrate_near_duplicates(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Add near_duplicate_of and near_duplicate_similarity to content_repository.
+        
+        Args:
+            cursor: Database cursor
+        """
+        self._add_column(cursor, 'content_repository', 'near_duplicate_of',
+                         "INTEGER REFERENCES content_repository (id) ON DELETE SET NULL")
+        self._add_column(cursor, 'content_repository', 'near_duplicate_similarity', "REAL")
+    
+    def _migrate_full_text_search(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Create the FULL_TEXT_INDEXES tables and their sync triggers, and index existing rows.
+        
+        The FTS5 tables are external-content tables: they store only the index
+        and read column values from the base table by rowid.
+        
+        Args:
+            cursor: Database cursor
+        """
+        self._add_column(cursor, 'content_repository', 'category_key',
+                         f"TEXT GENERATED ALWAYS AS ({CATEGORY_KEY_SQL}) VIRTUAL")
+        
+        for name, (table, columns) in self.FULL_TEXT_INDEXES.items():
+            # Index 2- and 3-character prefixes so search-as-you-type stays fast
+            cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5(
+                {', '.join(columns)},
+                content='{table}',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            )
+            ''')
+            
+            self._create_full_text_triggers(cursor, name)
+            
+            cursor.execute(f"INSERT INTO {name} ({name}) VALUES ('rebuild')")
+    
+    def _create_full_text_triggers(self, cursor: sqlite3.Cursor, name: str) -> None:
+        """
+        Create the triggers that keep a FULL_TEXT_INDEXES table in sync with its base table.
+        
+        Rows in a full_text_deferred_ranges range are skipped; they are indexed
+        together when the deferral ends. Ranges never overlap, so only the
+        nearest range starting at or below a row's id can cover it.
+        
+        Args:
+            cursor: Database cursor
+            name: Full-text index name
+        """
+        table, columns = self.FULL_TEXT_INDEXES[name]
+        column_list = ', '.join(columns)
+        new_values = ', '.join(f"new.{column}" for column in columns)
+        old_values = ', '.join(f"old.{column}" for column in columns)
+        
+        def indexed(row: str) -> str:
+            return (f"NOT EXISTS (SELECT 1 FROM (SELECT to_id FROM full_text_deferred_ranges "
+                    f"WHERE index_name = '{name}' AND from_id <= {row}.id ORDER BY from_id DESC LIMIT 1) "
+                    f"WHERE to_id IS NULL OR to_id >= {row}.id)")
+        
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {name}_insert AFTER INSERT ON {table}
+        WHEN {indexed('new')} BEGIN
+            INSERT INTO {name} (rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {name}_delete AFTER DELETE ON {table}
+        WHEN {indexed('old')} BEGIN
+            INSERT INTO {name} ({name}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {name}_update AFTER UPDATE OF {column_list} ON {table}
+        WHEN {indexed('old')} BEGIN
+            INSERT INTO {name} ({name}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {name} (rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+        ''')
+    
+    def _migrate_deferred_full_text_indexing(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Recreate the full-text triggers so they skip rows whose indexing is deferred.
+        
+        Args:
+            cursor: Database cursor
+        """
+        for name in self.FULL_TEXT_INDEXES:
+            for event in ('insert', 'delete', 'update'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}_{event}")
+            self._create_full_text_triggers(cursor, name)
+    
+    def _migrate_full_text_deferred_ranges(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Replace table-wide full-text deferrals with per-owner ranges.
+        
+        Rows left unindexed by a table-wide deferral are indexed first, then
+        the triggers are recreated against full_text_deferred_ranges.
+        
+        Args:
+            cursor: Database cursor
+        """
+        if cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'full_text_deferrals'").fetchone():
+            for name, from_id in cursor.execute("SELECT index_name, from_id FROM full_text_deferrals").fetchall():
+                table, columns = self.FULL_TEXT_INDEXES[name]
+                column_list = ', '.join(columns)
+                cursor.execute(
+                    f"INSERT INTO {name} (rowid, {column_list}) "
+                    f"SELECT id, {column_list} FROM {table} WHERE id >= ? ORDER BY id",
+                    (from_id,)
+                )
+        
+        self._migrate_deferred_full_text_indexing(cursor)
+        cursor.execute("DROP TABLE IF EXISTS full_text_deferrals")
+    
+    def _migrate_change_counters(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Create the table_changes rows and triggers for CHANGE_COUNTED_TABLES.
+        
+        Args:
+            cursor: Database cursor
+        """
+        for table, columns in self.CHANGE_COUNTED_TABLES.items():
+            cursor.execute("INSERT OR IGNORE INTO table_changes (table_name) VALUES (?)", (table,))
+            
+            bump = f"UPDATE table_changes SET change_count = change_count + 1 WHERE table_name = '{table}';"
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_count_insert AFTER INSERT ON {table} "
+                           f"BEGIN {bump} END")
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_count_delete AFTER DELETE ON {table} "
+                           f"BEGIN {bump} END")
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_count_update "
+                           f"AFTER UPDATE OF {', '.join(columns)} ON {table} BEGIN {bump} END")
+    
+    def _migrate_signature_invalidation(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Add content_signatures.stale and a trigger that sets it when post_text is edited.
+        
+        The trigger also clears the signature and band keys, so edited content
+        is not matched on its old text before it is signed again.
+        
+        Args:
+            cursor: Database cursor
+        """
+        self._add_column(cursor, 'content_signatures', 'stale', "INTEGER NOT NULL DEFAULT 0")
+        
+        cleared = ', '.join(['signature = NULL'] + [f"band_{band} = NULL" for band in range(8)])
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS content_signatures_invalidate
+        AFTER UPDATE OF post_text ON content_repository
+        WHEN new.post_text IS NOT old.post_text
+        BEGIN
+            UPDATE content_signatures SET {cleared}, stale = 1 WHERE content_id = new.id;
+        END
+        ''')
+    
+    def _init_indexes(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Bring the schema's secondary indexes in line with INDEXES.
+        
+        Args:
+            cursor: Cursor on the connection being initialized
+        """
+        existing = {
+            row['name'] for row in cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx\\_%' ESCAPE '\\'"
+            ).fetchall()
+        }
+        
+        # Drop indexes that are no longer part of the managed set
+        for name in existing - self.INDEXES.keys():
+            cursor.execute(f"DROP INDEX IF EXISTS {name}")
+        
+        for name, definition in self.INDEXES.items():
+            unique = "UNIQUE " if name in self.UNIQUE_INDEXES else ""
+            cursor.execute(f"CREATE {unique}INDEX IF NOT EXISTS {name} {definition}")
+    
+    def explain_query_plan(self, query: str, params: Tuple = ()) -> List[str]:
+        """
+        Get SQLite's query plan for a statement.
+        
+        Args:
+            query: SQL query to explain
+            params: Parameters for the query
+            
+        Returns:
+            List of plan step descriptions (e.g. 'SEARCH scheduled_posts USING INDEX ...')
+        """
+        cursor = self.execute(f"EXPLAIN QUERY PLAN {query}", params)
+        return [row['detail'] for row in cursor.fetchall()]
+    
+    def change_count(self, table: str) -> int:
+        """
+        Get the number of counted writes made to a table from CHANGE_COUNTED_TABLES.
+        
+        The count goes up with every insert, delete or update of a counted
+        column, from any connection or process, so it is a cheap way to
+        notice changes to that table without reacting to writes elsewhere.
+        
+        Args:
+            table: Table name
+            
+        Returns:
+            Change count
+        """
+        row = self.execute("SELECT change_count FROM table_changes WHERE table_name = ?", (table,)).fetchone()
+        return row['change_count'] if row else 0
     
-    def execute(self, query: str, params: Tuple = (), max_retries: int = 5) -> sqlite3.Cursor:
+    def execute(self, query: str, params: Tuple = (), max_retries: int = 3) -> sqlite3.Cursor:
         """
         Execute a query with retry logic for handling database locks.
         
+        Lock waits are normally absorbed by busy_timeout inside SQLite. The retry
+        loop is a fallback for the cases the busy handler cannot resolve, such as
+        a read transaction that needs to be upgraded to a write.
+        
         Args:
             query: SQL query to execute
             params: Parameters for the query
@@ -168,7 +804,14 @@ class Database:
         return conn.executemany(query, params_list)
     
     def commit(self):
-        """Commit the current transaction."""
+        """
+        Commit the current transaction.
+        
+        Inside a transaction() block this is a no-op; the block commits once at the end.
+        """
+        if getattr(self._local, 'transaction_depth', 0):
+            return
+        
         if hasattr(self._local, 'connection'):
             self._local.connection.commit()
     
@@ -177,6 +820,190 @@ class Database:
         if hasattr(self._local, 'connection'):
             self._local.connection.rollback()
     
+    @contextmanager
+    def transaction(self) -> Iterator["Database"]:
+        """
+        Group several writes into a single transaction on this thread's connection.
+        
+        Per-call commits from insert, update, delete and the credential/setting
+        helpers are suspended until the outermost block exits, which commits once.
+        Any exception rolls the whole transaction back. Blocks can be nested.
+        
+        Example:
+            with db.transaction():
+                db.insert('campaign_topics', {...})
+                db.update('campaigns', {...}, 'id = ?', (campaign_id,))
+        
+        Yields:
+            This Database instance
+        """
+        conn = self._get_connection()
+        depth = getattr(self._local, 'transaction_depth', 0)
+        
+        if depth == 0 and not conn.in_transaction:
+            # Take the write lock up front so the transaction never has to
+            # upgrade from a read lock (which busy_timeout cannot wait out)
+            self.execute("BEGIN IMMEDIATE")
+        
+        self._local.transaction_depth = depth + 1
+        try:
+            if depth == 0:
+                self._open_full_text_deferrals()
+            yield self
+            if depth == 0:
+                self._close_full_text_deferrals()
+        except BaseException:
+            self._local.transaction_depth = depth
+            if depth == 0:
+                conn.rollback()
+            raise
+        else:
+            self._local.transaction_depth = depth
+            if depth == 0:
+                conn.commit()
+    
+    def _open_full_text_deferrals(self) -> None:
+        """
+        Start a deferred range for each deferral active on this thread.
+        
+        Called at the start of an outermost transaction, which holds the write
+        lock, so no other connection inserts rows until the range is closed
+        and no other connection sees the open range.
+        """
+        for name, owner in getattr(self._local, 'full_text_deferrals', {}).items():
+            table, _ = self.FULL_TEXT_INDEXES[name]
+            lease_expires = time.time() + self.FULL_TEXT_DEFERRAL_LEASE
+            self.execute(
+                f"INSERT INTO full_text_deferred_ranges (index_name, from_id, owner, lease_expires) "
+                f"SELECT ?, COALESCE(MAX(id), 0) + 1, ?, ? FROM {table}",
+                (name, owner, lease_expires)
+            )
+            self.execute("UPDATE full_text_deferred_ranges SET lease_expires = ? WHERE index_name = ? AND owner = ?",
+                         (lease_expires, name, owner))
+    
+    def _close_full_text_deferrals(self) -> None:
+        """End the ranges _open_full_text_deferrals started, at the rows inserted since."""
+        for name, owner in getattr(self._local, 'full_text_deferrals', {}).items():
+            table, _ = self.FULL_TEXT_INDEXES[name]
+            self.execute(
+                f"UPDATE full_text_deferred_ranges SET to_id = (SELECT COALESCE(MAX(id), 0) FROM {table}) "
+                f"WHERE index_name = ? AND owner = ? AND to_id IS NULL",
+                (name, owner)
+            )
+            # Nothing was inserted
+            self.execute(
+                "DELETE FROM full_text_deferred_ranges WHERE index_name = ? AND owner = ? AND to_id < from_id",
+                (name, owner)
+            )
+    
+    @contextmanager
+    def deferred_full_text_index(self, name: str) -> Iterator[None]:
+        """
+        Skip full-text indexing of rows this thread inserts inside the block, then index them in bulk.
+        
+        Meant for bulk inserts: FTS5 then builds large index segments from
+        many rows at once instead of updating the index row by row. Rows
+        inserted by each transaction() block on this thread are recorded as a
+        deferred id range and become searchable when the block exits. Writes
+        outside transaction() blocks, and writes from other connections, are
+        indexed as usual. Ranges are leased to this block; a range whose lease
+        ran out because its process died is indexed when the database is next
+        opened.
+        
+        Args:
+            name: Full-text index name from FULL_TEXT_INDEXES
+        """
+        deferrals = self._local.__dict__.setdefault('full_text_deferrals', {})
+        if name in deferrals:
+            # Already deferred by an enclosing block, which indexes the rows
+            yield
+            return
+        
+        owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        deferrals[name] = owner
+        try:
+            yield
+        finally:
+            del deferrals[name]
+            self._finish_deferred_full_text_index(name, owner)
+    
+    def _finish_deferred_full_text_index(self, name: str, owner: str) -> int:
+        """
+        Index the rows an owner's deferred ranges skipped and remove the ranges.
+        
+        Ranges are indexed about FULL_TEXT_CATCH_UP_ROWS ids at a time, each
+        batch in one transaction that also removes its ranges, so the write
+        lock is released between batches and an interrupted catch-up resumes
+        where it stopped. Automerge is switched off inside each batch: FTS5
+        otherwise merges segments repeatedly while one statement adds many
+        rows, which costs about a quarter of the indexing time for few extra
+        segments.
+        
+        Args:
+            name: Full-text index name
+            owner: Owner of the ranges
+            
+        Returns:
+            Number of rows indexed
+        """
+        table, columns = self.FULL_TEXT_INDEXES[name]
+        column_list = ', '.join(columns)
+        selected = ', '.join(f"t.{column}" for column in columns)
+        batch = "index_name = ? AND owner = ? AND to_id IS NOT NULL AND from_id >= ? AND from_id < ?"
+        indexed = 0
+        
+        while True:
+            with self.transaction():
+                first = self.execute(
+                    "SELECT MIN(from_id) AS from_id FROM full_text_deferred_ranges "
+                    "WHERE index_name = ? AND owner = ? AND to_id IS NOT NULL",
+                    (name, owner)
+                ).fetchone()['from_id']
+                if first is None:
+                    return indexed
+                
+                params = (name, owner, first, first + self.FULL_TEXT_CATCH_UP_ROWS)
+                self.execute(
+                    "UPDATE full_text_deferred_ranges SET lease_expires = ? WHERE index_name = ? AND owner = ?",
+                    (time.time() + self.FULL_TEXT_DEFERRAL_LEASE, name, owner)
+                )
+                
+                automerge = self.execute(
+                    f"SELECT v FROM {name}_config WHERE k = 'automerge'"
+                ).fetchone()
+                self.execute(f"INSERT INTO {name} ({name}, rank) VALUES ('automerge', 0)")
+                cursor = self.execute(
+                    f"INSERT INTO {name} (rowid, {column_list}) "
+                    f"SELECT t.id, {selected} FROM full_text_deferred_ranges "
+                    f"JOIN {table} t ON t.id BETWEEN from_id AND to_id "
+                    f"WHERE {batch} ORDER BY t.id",
+                    params
+                )
+                indexed += cursor.rowcount
+                # 4 is the FTS5 default when automerge was never configured
+                self.execute(f"INSERT INTO {name} ({name}, rank) VALUES ('automerge', ?)",
+                             (automerge['v'] if automerge else 4,))
+                
+                self.execute(f"DELETE FROM full_text_deferred_ranges WHERE {batch}", params)
+    
+    def finish_deferred_full_text_indexes(self) -> int:
+        """
+        Index the rows of deferrals whose owner is gone, e.g. a crashed import.
+        
+        An owner is gone once none of its ranges has had its lease renewed
+        for FULL_TEXT_DEFERRAL_LEASE seconds; live deferrals are left alone.
+        
+        Returns:
+            Number of rows indexed
+        """
+        expired = self.execute(
+            "SELECT index_name, owner FROM full_text_deferred_ranges "
+            "GROUP BY index_name, owner HAVING MAX(lease_expires) < ?",
+            (time.time(),)
+        ).fetchall()
+        
+        return sum(self._finish_deferred_full_text_index(row['index_name'], row['owner']) for row in expired)
+    
     def close(self):
         """Close the database connection."""
         if hasattr(self._local, 'connection'):
@@ -246,7 +1073,7 @@ class Database:
     
     def select(self, table: str, columns: str = "*", 
                where: str = None, where_params: Tuple = (), 
-               order_by: str = None, limit: int = None) -> List[Dict[str, Any]]:
+               order_by: str = None, limit: int = None) -> List[Row]:
         """
         Select rows from the specified table.
         
@@ -259,7 +1086,7 @@ class Database:
             limit: LIMIT clause (default: None)
             
         Returns:
-            List of dictionaries with selected rows
+            List of rows (supporting key access like dictionaries)
         """
         query = f"SELECT {columns} FROM {table}"
         
@@ -314,6 +1141,23 @@ class Database:
         
         return cursor.lastrowid
     
+    def delete_credential(self, service: str, key: str) -> int:
+        """
+        Remove a credential from the credentials table.
+        
+        Args:
+            service: Service name (e.g., 'linkedin', 'openai')
+            key: Credential key (e.g., 'access_token', 'api_key')
+            
+        Returns:
+            Number of rows affected
+        """
+        return self.delete(
+            table='credentials',
+            where='service = ? AND key = ?',
+            where_params=(service, key)
+        )
+    
     def get_setting(self, key: str, default: Any = None) -> Optional[str]:
         """
         Get a setting value from the settings table.
@@ -4,20 +4,86 @@ LinkedIn API module that handles all interactions with the LinkedIn API.
 
 import os
 import time
+import threading
 import webbrowser
 import requests
-from typing import Dict, Any, Optional
+from collections import deque
+from concurrent.futures import Future
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from typing import Dict, Any, List, Optional
 import json
 import urllib.parse
 from .database import db
+from .rate_limiter import DEFAULT_RETRY_AFTER, RateLimitedError, parse_retry_after, publish_rate_limiter
+
+# Seconds spent opening connections (TCP + TLS) during the current request, per thread
+_connect_timing = threading.local()
+
+
+def _add_connect_time(seconds: float) -> None:
+    """Accumulate connection setup time for the request running on this thread."""
+    _connect_timing.seconds = getattr(_connect_timing, 'seconds', 0.0) + seconds
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    """HTTP connection that records how long connect() takes."""
+    
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.perf_counter() - start)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    """HTTPS connection that records how long connect() (including TLS) takes."""
+    
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.perf_counter() - start)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """Keep-alive adapter whose pools time connection setup."""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool
+        }
+
 
 class LinkedInAPI:
     """
     Handles LinkedIn API requests and authentication.
     """
     
-    def __init__(self):
-        """Initialize the LinkedIn API client."""
+    def __init__(self, pool_size: int = 10, connect_timeout: float = 5.0,
+                 read_timeout: float = 30.0, latency_history: int = 500):
+        """
+        Initialize the LinkedIn API client.
+        
+        Args:
+            pool_size: Maximum number of keep-alive connections per host
+            connect_timeout: Seconds to wait for a connection to be established
+            read_timeout: Seconds to wait for the server to send a response
+            latency_history: Number of recent requests to keep latency records for
+        """
         self.base_url = "https://api.linkedin.com/v2"
         self.auth_url = "https://www.linkedin.com/oauth/v2"
         
@@ -26,14 +92,102 @@ class LinkedInAPI:
         self.client_secret = db.get_credential('linkedin', 'client_secret')
         self.access_token = db.get_credential('linkedin', 'access_token')
         
-        # Set default request headers
-        self.headers = {
-            "X-Restli-Protocol-Version": "2.0.0",
-            "Content-Type": "application/json"
-        }
+        # Author URN for the current access token, resolved once via /me
+        self.user_urn = db.get_credential('linkedin', 'user_urn')
+        self._urn_lock = threading.Lock()
+        
+        # In-flight /me lookups per access token, so concurrent callers share one
+        self._urn_lookups: Dict[Optional[str], Future] = {}
+        
+        # Pooled session so connections (and TLS sessions) are reused across calls
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        adapter = _TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        # Default request headers shared by every call; Content-Type is set
+        # per request by requests (json= or data=)
+        self.headers = self.session.headers
+        self.headers["X-Restli-Protocol-Version"] = "2.0.0"
         
         if self.access_token:
             self.headers["Authorization"] = f"Bearer {self.access_token}"
+        
+        # Recent per-request latency records, split into connection setup and server time
+        self._latencies = deque(maxlen=latency_history)
+        self._latency_lock = threading.Lock()
+    
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session and record its latency.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Extra arguments for requests.Session.request
+            
+        Returns:
+            Response object
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        
+        _connect_timing.seconds = 0.0
+        status_code = None
+        start = time.perf_counter()
+        
+        try:
+            response = self.session.request(method, url, **kwargs)
+            status_code = response.status_code
+            return response
+        finally:
+            total = time.perf_counter() - start
+            connect = getattr(_connect_timing, 'seconds', 0.0)
+            
+            with self._latency_lock:
+                self._latencies.append({
+                    'method': method,
+                    'endpoint': urllib.parse.urlsplit(url).path,
+                    'status_code': status_code,
+                    'new_connection': connect > 0,
+                    'connect_seconds': connect,
+                    'server_seconds': total - connect,
+                    'total_seconds': total
+                })
+    
+    def get_recent_latencies(self) -> List[Dict[str, Any]]:
+        """
+        Get latency records for recent requests, oldest first.
+        
+        Returns:
+            List of dictionaries with method, endpoint, status_code, new_connection,
+            connect_seconds, server_seconds and total_seconds
+        """
+        with self._latency_lock:
+            return list(self._latencies)
+    
+    def get_latency_stats(self) -> Dict[str, Any]:
+        """
+        Summarize recent request latency.
+        
+        Returns:
+            Dictionary with request counts and average connection setup,
+            server and total times in seconds
+        """
+        records = self.get_recent_latencies()
+        count = len(records)
+        
+        if not count:
+            return {'requests': 0, 'new_connections': 0, 'avg_connect_seconds': 0.0,
+                    'avg_server_seconds': 0.0, 'avg_total_seconds': 0.0}
+        
+        return {
+            'requests': count,
+            'new_connections': sum(1 for r in records if r['new_connection']),
+            'avg_connect_seconds': sum(r['connect_seconds'] for r in records) / count,
+            'avg_server_seconds': sum(r['server_seconds'] for r in records) / count,
+            'avg_total_seconds': sum(r['total_seconds'] for r in records) / count
+        }
     
     def is_authenticated(self) -> bool:
         """
@@ -71,6 +225,60 @@ class LinkedInAPI:
         
         # Store in database
         db.set_credential('linkedin', 'access_token', access_token)
+        
+        # The cached URN belongs to the previous token
+        self.invalidate_user_urn()
+    
+    def invalidate_user_urn(self) -> None:
+        """Forget the cached author URN so it is resolved again on the next post."""
+        with self._urn_lock:
+            self.user_urn = None
+            db.delete_credential('linkedin', 'user_urn')
+    
+    def get_user_urn(self) -> str:
+        """
+        Get the author URN of the authenticated member, calling /me only when not cached.
+        
+        The /me request is made without holding the lock; threads that need the
+        URN while it is in flight wait for that request instead of sending their own.
+        
+        Returns:
+            Member URN (e.g., 'urn:li:person:abc123')
+        """
+        with self._urn_lock:
+            if self.user_urn:
+                return self.user_urn
+            
+            token = self.access_token
+            lookup = self._urn_lookups.get(token)
+            if lookup is not None:
+                owner = False
+            else:
+                owner = True
+                lookup = self._urn_lookups[token] = Future()
+        
+        if not owner:
+            return lookup.result()
+        
+        try:
+            user_data = self.get_user_info()
+            user_urn = f"urn:li:person:{user_data['id']}"
+        except BaseException as e:
+            with self._urn_lock:
+                del self._urn_lookups[token]
+            lookup.set_exception(e)
+            raise
+        
+        with self._urn_lock:
+            del self._urn_lookups[token]
+            
+            # Don't cache a URN for a token that was replaced during the lookup
+            if self.access_token == token:
+                self.user_urn = user_urn
+                db.set_credential('linkedin', 'user_urn', user_urn)
+        
+        lookup.set_result(user_urn)
+        return user_urn
     
     def get_authorization_url(self, redirect_uri: str) -> str:
         """
@@ -120,7 +328,11 @@ class LinkedInAPI:
             "client_secret": self.client_secret
         }
         
-        response = requests.post(token_url, data=data)
+        # The token endpoint is not a Rest.li API and takes no bearer token
+        response = self._request(
+            'POST', token_url, data=data,
+            headers={"Authorization": None, "X-Restli-Protocol-Version": None}
+        )
         
         if response.status_code == 200:
             token_data = response.json()
@@ -141,7 +353,7 @@ class LinkedInAPI:
             raise ValueError("Not authenticated. Set access token or authorize first.")
         
         user_info_url = f"{self.base_url}/me"
-        response = requests.get(user_info_url, headers=self.headers)
+        response = self._request('GET', user_info_url)
         
         if response.status_code == 200:
             return response.json()
@@ -157,13 +369,19 @@ class LinkedInAPI:
             
         Returns:
             Boolean indicating success
+            
+        Raises:
+            RateLimitedError: If the post has to wait for the app or member
+                rate limit, or LinkedIn answered 429; retry_after says how long
         """
         if not self.is_authenticated():
             raise ValueError("Not authenticated. Set access token or authorize first.")
         
-        # Get user URN (required for posting)
-        user_data = self.get_user_info()
-        user_urn = f"urn:li:person:{user_data['id']}"
+        # Get user URN (required for posting), cached per access token
+        user_urn = self.get_user_urn()
+        
+        # Raises before anything is sent if either limit is exhausted
+        publish_rate_limiter.acquire(user_urn)
         
         # Create the post payload
         post_url = f"{self.base_url}/ugcPosts"
@@ -184,12 +402,22 @@ class LinkedInAPI:
         }
         
         # Make the API call to create the post
-        response = requests.post(post_url, headers=self.headers, json=post_data)
+        response = self._request('POST', post_url, json=post_data)
         
         if response.status_code == 201:
             print("Post created successfully!")
             return True
+        elif response.status_code == 429:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is None:
+                retry_after = DEFAULT_RETRY_AFTER
+            publish_rate_limiter.throttled(user_urn, retry_after)
+            raise RateLimitedError(retry_after, "LinkedIn returned 429 Too Many Requests")
         else:
+            if response.status_code == 401:
+                # Token revoked or expired; resolve the URN again next time
+                self.invalidate_user_urn()
+            
             print(f"Error creating post: {response.status_code}")
             print(response.text)
             return False
@@ -0,0 +1,307 @@
+"""
+Near-duplicate detection for repository content with MinHash LSH signatures.
+"""
+
+import hashlib
+import re
+import zlib
+from array import array
+from typing import Any, List, Optional, Tuple
+
+from .content_hash import normalize_text
+from .database import db
+
+# One-permutation MinHash: each shingle hash lands in one of NUM_BINS bins,
+# and the signature is the minimum hash seen in every bin
+NUM_BINS = 32
+
+# LSH banding: rows with an identical band are candidates. With 8 bands of 4
+# bins, posts with a Jaccard similarity of 0.8 become candidates 98.5% of the
+# time and posts below 0.4 rarely do
+NUM_BANDS = 8
+ROWS_PER_BAND = NUM_BINS // NUM_BANDS
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+_BIN_BITS = NUM_BINS.bit_length() - 1
+_EMPTY_BIN = 0xFFFFFFFF
+_MIX = 0x9E3779B1
+_WORD = re.compile(r"\w+")
+
+def _shingles(text: str) -> List[str]:
+    """Word shingles of the normalized text (the words themselves for very short text)."""
+    words = _WORD.findall(normalize_text(text))
+    if len(words) <= SHINGLE_SIZE:
+        return [' '.join(words)] if words else []
+    
+    return [' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+
+def minhash_signature(text: str) -> Optional[List[int]]:
+    """
+    Compute the MinHash signature of a post.
+    
+    Args:
+        text: Post text
+        
+    Returns:
+        NUM_BINS 32-bit values, or None if the text has no words
+    """
+    shingles = _shingles(text)
+    if not shingles:
+        return None
+    
+    signature = [_EMPTY_BIN] * NUM_BINS
+    bin_mask = NUM_BINS - 1
+    
+    for shingle in set(shingles):
+        value = (zlib.crc32(shingle.encode('utf-8')) * _MIX) & 0xFFFFFFFF
+        index = value & bin_mask
+        value >>= _BIN_BITS
+        if value < signature[index]:
+            signature[index] = value
+    
+    # Fill empty bins from the next filled bin so short posts still compare
+    # bin for bin; the offset keeps borrowed values distinct from real ones
+    for index in range(NUM_BINS):
+        if signature[index] == _EMPTY_BIN:
+            for distance in range(1, NUM_BINS):
+                value = signature[(index + distance) % NUM_BINS]
+                if value != _EMPTY_BIN and value < (1 << (32 - _BIN_BITS)):
+                    signature[index] = (value + (distance << (32 - _BIN_BITS))) & 0xFFFFFFFF
+                    break
+    
+    return signature
+
+
+def band_keys(signature: List[int]) -> List[int]:
+    """
+    Hash each band of a signature to a signed 64-bit key.
+    
+    Args:
+        signature: MinHash signature
+        
+    Returns:
+        NUM_BANDS integer keys
+    """
+    keys = []
+    for band in range(NUM_BANDS):
+        rows = array('I', signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]).tobytes()
+        digest = hashlib.blake2b(rows, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+def similarity(signature_a: List[int], signature_b: List[int]) -> float:
+    """
+    Estimate the Jaccard similarity of two posts from their signatures.
+    
+    Args:
+        signature_a: MinHash signature
+        signature_b: MinHash signature
+        
+    Returns:
+        Fraction of matching bins, between 0.0 and 1.0
+    """
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / NUM_BINS
+
+
+class NearDuplicateIndex:
+    """
+    LSH index of MinHash signatures for content_repository, kept in SQLite.
+    
+    Signatures and band keys live in content_signatures, one row per content
+    item, with an index per band column, so a lookup reads only the rows that
+    share a band instead of scanning the repository. New rows are indexed
+    incrementally by id. Editing a row's post_text marks its signature stale
+    (a trigger clears it and sets stale = 1) and the next sync signs it again.
+    Rows are removed with their content by ON DELETE CASCADE.
+    
+    Signing a large existing repository takes a while, so the full index is
+    built in the background by the scheduler worker. Lookups on the request
+    path only sign a bounded number of rows, so without a worker the index
+    fills in gradually.
+    """
+    
+    def __init__(self, threshold: float = 0.8, sync_batch_size: int = 5000, lookup_sync_limit: int = 500):
+        """
+        Initialize the index.
+        
+        Args:
+            threshold: Default similarity above which content counts as a near duplicate
+            sync_batch_size: Repository rows signed per transaction while syncing
+            lookup_sync_limit: Most rows find_most_similar() signs before looking up
+        """
+        self.threshold = threshold
+        self.sync_batch_size = sync_batch_size
+        self.lookup_sync_limit = lookup_sync_limit
+    
+    @staticmethod
+    def _entry(row: Any) -> Tuple:
+        """Signature row values for a (id, post_text) repository row."""
+        signature = minhash_signature(row['post_text'])
+        if signature is None:
+            # Still recorded, so the row isn't signed again on every sync
+            return (row['id'], None) + (None,) * NUM_BANDS
+        
+        return (row['id'], array('I', signature).tobytes(), *band_keys(signature))
+    
+    @staticmethod
+    def _upsert_sql() -> str:
+        """Statement that stores an _entry() tuple, replacing any stale signature."""
+        columns = ['signature'] + [f"band_{band}" for band in range(NUM_BANDS)]
+        placeholders = ', '.join('?' for _ in range(len(columns) + 1))
+        updates = ', '.join(f"{column} = excluded.{column}" for column in columns)
+        return (
+            f"INSERT INTO content_signatures (content_id, {', '.join(columns)}) VALUES ({placeholders}) "
+            f"ON CONFLICT(content_id) DO UPDATE SET {updates}, stale = 0"
+        )
+    
+    @staticmethod
+    def _init_sync_position() -> None:
+        """
+        Record where sync() has reached, if it isn't recorded yet.
+        
+        Until rows were signed one at a time, sync() signed rows in id order,
+        so the highest signed id is where it had reached.
+        """
+        db.execute(
+            "INSERT OR IGNORE INTO content_signature_sync (id, last_id) "
+            "SELECT 1, COALESCE(MAX(content_id), 0) FROM content_signatures"
+        )
+    
+    def sign(self, content_id: int, text: str) -> None:
+        """
+        Sign one repository row right away, whatever else is waiting to be signed.
+        
+        Rows older than it that are not signed yet are still signed by the next sync().
+        
+        Args:
+            content_id: ID of the content_repository row
+            text: Its post text
+        """
+        with db.transaction():
+            self._init_sync_position()
+            db.execute(self._upsert_sql(), self._entry({'id': content_id, 'post_text': text}))
+    
+    def sync(self, max_rows: Optional[int] = None) -> int:
+        """
+        Sign repository rows that are new or were edited since they were signed.
+        
+        The first full sync on an existing repository signs every row; later
+        calls only sign rows added or edited since.
+        
+        Args:
+            max_rows: Stop after signing about this many rows (None signs all)
+        
+        Returns:
+            Number of rows signed
+        """
+        upsert = self._upsert_sql()
+        
+        def batch_size() -> int:
+            if max_rows is None:
+                return self.sync_batch_size
+            return min(self.sync_batch_size, max_rows - signed)
+        
+        signed = 0
+        
+        # Edited rows first: their stale signatures are missing from lookups
+        while batch_size() > 0:
+            rows = db.execute(
+                """
+                SELECT c.id, c.post_text FROM content_signatures s
+                JOIN content_repository c ON c.id = s.content_id
+                WHERE s.stale = 1
+                LIMIT ?
+                """,
+                (batch_size(),)
+            ).fetchall()
+            if not rows:
+                break
+            
+            with db.transaction():
+                db.execute_many(upsert, [self._entry(row) for row in rows])
+            signed += len(rows)
+        
+        with db.transaction():
+            self._init_sync_position()
+        
+        while batch_size() > 0:
+            last_id = db.execute("SELECT last_id FROM content_signature_sync WHERE id = 1").fetchone()['last_id']
+            
+            # Rows sign() already handled are signed again; there are only a few
+            rows = db.execute(
+                "SELECT id, post_text FROM content_repository WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size())
+            ).fetchall()
+            if not rows:
+                break
+            
+            with db.transaction():
+                db.execute_many(upsert, [self._entry(row) for row in rows])
+                db.execute("UPDATE content_signature_sync SET last_id = MAX(last_id, ?) WHERE id = 1", (rows[-1]['id'],))
+            signed += len(rows)
+        
+        return signed
+    
+    def find(self, text: str, threshold: Optional[float] = None,
+             exclude_id: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Find indexed content similar to a post.
+        
+        Call sync() first if rows may have been added since the last sync.
+        
+        Args:
+            text: Post text
+            threshold: Minimum similarity (defaults to self.threshold)
+            exclude_id: Content ID to leave out, e.g. the post itself
+            
+        Returns:
+            List of (content_id, similarity) pairs, most similar first
+        """
+        threshold = self.threshold if threshold is None else threshold
+        signature = minhash_signature(text)
+        if signature is None:
+            return []
+        
+        keys = band_keys(signature)
+        where = ' OR '.join(f"band_{band} = ?" for band in range(NUM_BANDS))
+        
+        matches = []
+        for row in db.execute(f"SELECT content_id, signature FROM content_signatures WHERE {where}", keys):
+            if row['content_id'] == exclude_id:
+                continue
+            
+            stored = array('I')
+            stored.frombytes(row['signature'])
+            score = similarity(signature, stored)
+            if score >= threshold:
+                matches.append((row['content_id'], score))
+        
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches
+    
+    def find_most_similar(self, text: str, threshold: Optional[float] = None) -> Optional[Tuple[int, float]]:
+        """
+        Sync the index and return the closest near duplicate of a post.
+        
+        At most lookup_sync_limit rows are signed first, so a repository whose
+        index hasn't been built yet is only partly compared until the worker
+        finishes building it.
+        
+        Args:
+            text: Post text
+            threshold: Minimum similarity (defaults to self.threshold)
+            
+        Returns:
+            (content_id, similarity) of the closest match, or None
+        """
+        self.sync(max_rows=self.lookup_sync_limit)
+        matches = self.find(text, threshold)
+        return matches[0] if matches else None
+
+
+# Create a global instance
+near_duplicate_index = NearDuplicateIndex()
@@ -0,0 +1,245 @@
+"""
+Rate limiting for LinkedIn publishing.
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from .database import db
+
+# Wait used after a 429 that doesn't say how long to back off
+DEFAULT_RETRY_AFTER = 60.0
+
+SECONDS_PER_DAY = 24 * 3600
+
+class RateLimitedError(Exception):
+    """Raised when a request must wait before it can be sent."""
+    
+    def __init__(self, retry_after: float, reason: str):
+        """
+        Args:
+            retry_after: Seconds to wait before trying again
+            reason: What is throttling the request
+        """
+        super().__init__(f"{reason}; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a fixed rate.
+    
+    Holds one bucket's state while PublishRateLimiter updates it; the state
+    itself lives in the rate_limit_buckets table.
+    """
+    
+    def __init__(self, rate: float, capacity: float, tokens: Optional[float] = None,
+                 updated: Optional[float] = None, blocked_until: float = 0.0):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens held (the allowed burst)
+            tokens: Tokens held at the last update (defaults to a full bucket)
+            updated: time.time() of the last update (defaults to now)
+            blocked_until: time.time() before which no tokens are given out
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity if tokens is None else tokens
+        self.updated = time.time() if updated is None else updated
+        self.blocked_until = blocked_until
+    
+    def _refill(self, now: float) -> None:
+        # max() guards against the clock stepping back between processes
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = max(self.updated, now)
+    
+    def wait_time(self, now: float) -> float:
+        """
+        Seconds until a token is available (0 if one is available now).
+        
+        Args:
+            now: Current time.time() value
+        """
+        self._refill(now)
+        
+        wait = max(0.0, self.blocked_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        
+        return wait
+    
+    def consume(self) -> None:
+        """Take one token. Call only after wait_time() returned 0."""
+        self.tokens -= 1
+    
+    def block(self, seconds: float, now: float) -> None:
+        """
+        Refuse tokens for the next number of seconds.
+        
+        Args:
+            seconds: Seconds to block for
+            now: Current time.time() value
+        """
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+class PublishRateLimiter:
+    """
+    Limits posts per app and per member, shared by every publishing path.
+    
+    A post needs a token from both the app bucket and the member's bucket.
+    When LinkedIn answers 429, the member's bucket is blocked for the
+    Retry-After period so later posts wait instead of hitting it again.
+    
+    Bucket state is kept in the database and updated in a write transaction,
+    so every process and thread publishing with the same database shares one
+    budget. The limits themselves are per instance.
+    """
+    
+    APP_BUCKET = 'app'
+    MEMBER_BUCKET_PREFIX = 'member:'
+    
+    def __init__(self, app_per_day: float = 100000, member_per_day: float = 150,
+                 app_burst: float = 100, member_burst: float = 10):
+        """
+        Initialize the rate limiter.
+        
+        Args:
+            app_per_day: Posts per day allowed for the application
+            member_per_day: Posts per day allowed for each member
+            app_burst: Posts the application may send back to back
+            member_burst: Posts a member may send back to back
+        """
+        self._lock = threading.Lock()
+        self.configure(app_per_day, member_per_day, app_burst, member_burst)
+    
+    def configure(self, app_per_day: Optional[float] = None, member_per_day: Optional[float] = None,
+                  app_burst: Optional[float] = None, member_burst: Optional[float] = None) -> None:
+        """
+        Change the limits. Omitted values keep their current setting.
+        
+        Stored buckets keep their tokens, capped at the new burst size.
+        
+        Args:
+            app_per_day: Posts per day allowed for the application
+            member_per_day: Posts per day allowed for each member
+            app_burst: Posts the application may send back to back
+            member_burst: Posts a member may send back to back
+        """
+        with self._lock:
+            self.app_per_day = app_per_day if app_per_day is not None else self.app_per_day
+            self.member_per_day = member_per_day if member_per_day is not None else self.member_per_day
+            self.app_burst = app_burst if app_burst is not None else self.app_burst
+            self.member_burst = member_burst if member_burst is not None else self.member_burst
+    
+    def _load_bucket(self, bucket: str, per_day: float, burst: float) -> TokenBucket:
+        row = db.execute(
+            "SELECT tokens, updated, blocked_until FROM rate_limit_buckets WHERE bucket = ?",
+            (bucket,)
+        ).fetchone()
+        
+        if row is None:
+            return TokenBucket(per_day / SECONDS_PER_DAY, burst)
+        
+        return TokenBucket(per_day / SECONDS_PER_DAY, burst, row['tokens'], row['updated'], row['blocked_until'])
+    
+    def _save_bucket(self, bucket: str, state: TokenBucket) -> None:
+        db.execute(
+            """
+            INSERT INTO rate_limit_buckets (bucket, tokens, updated, blocked_until) VALUES (?, ?, ?, ?)
+            ON CONFLICT(bucket) DO UPDATE SET
+                tokens = excluded.tokens, updated = excluded.updated, blocked_until = excluded.blocked_until
+            """,
+            (bucket, state.tokens, state.updated, state.blocked_until)
+        )
+    
+    def _limits(self) -> Tuple[float, float, float, float]:
+        with self._lock:
+            return self.app_per_day, self.app_burst, self.member_per_day, self.member_burst
+    
+    def acquire(self, member: str) -> None:
+        """
+        Take a token for one post, or raise without taking anything.
+        
+        Args:
+            member: Member URN the post is published as
+        
+        Raises:
+            RateLimitedError: If either limit has no token available
+        """
+        app_per_day, app_burst, member_per_day, member_burst = self._limits()
+        member_key = self.MEMBER_BUCKET_PREFIX + member
+        
+        with db.transaction():
+            now = time.time()
+            app_bucket = self._load_bucket(self.APP_BUCKET, app_per_day, app_burst)
+            member_bucket = self._load_bucket(member_key, member_per_day, member_burst)
+            
+            app_wait = app_bucket.wait_time(now)
+            member_wait = member_bucket.wait_time(now)
+            
+            if app_wait or member_wait:
+                if app_wait >= member_wait:
+                    raise RateLimitedError(app_wait, "Application post limit reached")
+                raise RateLimitedError(member_wait, "Member post limit reached")
+            
+            app_bucket.consume()
+            member_bucket.consume()
+            self._save_bucket(self.APP_BUCKET, app_bucket)
+            self._save_bucket(member_key, member_bucket)
+    
+    def throttled(self, member: str, retry_after: float) -> None:
+        """
+        Record that LinkedIn throttled a member's request.
+        
+        Args:
+            member: Member URN the request was sent as
+            retry_after: Seconds LinkedIn asked us to wait
+        """
+        _, _, member_per_day, member_burst = self._limits()
+        member_key = self.MEMBER_BUCKET_PREFIX + member
+        
+        with db.transaction():
+            now = time.time()
+            member_bucket = self._load_bucket(member_key, member_per_day, member_burst)
+            member_bucket.wait_time(now)
+            member_bucket.block(retry_after, now)
+            self._save_bucket(member_key, member_bucket)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header.
+    
+    Args:
+        value: Header value, either delay-seconds or an HTTP date
+    
+    Returns:
+        Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+# Create a global instance
+publish_rate_limiter = PublishRateLimiter()
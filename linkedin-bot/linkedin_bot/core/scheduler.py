@@ -2,25 +2,74 @@
 Scheduler module that handles post scheduling and execution.
 """
 
+import os
 import time
+import heapq
+import socket
 import threading
-from datetime import datetime, timedelta
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional, Tuple
 import random
 
+from .content_hash import content_hash
 from .database import db
 from .linkedin_api import linkedin_api
+from .rate_limiter import RateLimitedError
 
 class Scheduler:
     """
     Handles scheduling and publishing of LinkedIn posts.
     """
     
-    def __init__(self):
-        """Initialize the scheduler."""
+    def __init__(self, max_publish_workers: int = 4, max_attempts: int = 5,
+                 retry_base_delay: float = 60.0, retry_max_delay: float = 6 * 3600.0,
+                 lease_duration: float = 300.0):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            max_publish_workers: Maximum number of posts published concurrently
+            max_attempts: Publish attempts before a post is moved to the dead-letter status
+            retry_base_delay: Seconds before the first retry; doubles with each attempt
+            retry_max_delay: Upper bound on the delay between retries, in seconds
+            lease_duration: Seconds a claimed post stays reserved for this worker;
+                after that another worker may reclaim it
+        """
         self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
         self._scheduler_thread = None
-        self._check_interval = 60  # Check for posts every 60 seconds by default
+        self._resync_interval = 900  # Reload due times from the database every 15 minutes
+        
+        # In-memory index of publishable posts: a min-heap of (due time, post ID)
+        # plus the authoritative due time per post. Heap entries that no longer
+        # match _due_times are stale and skipped when popped.
+        self._due_heap = []
+        self._due_times = {}
+        self._due_lock = threading.Lock()
+        
+        # Bounded pool for publishing
+        self._max_publish_workers = max_publish_workers
+        self._publish_executor = None
+        self._publish_lock = threading.Lock()
+        
+        # Posts are claimed with a lease (status 'publishing', lease_owner,
+        # lease_expires) so several workers, in any process or host sharing
+        # the database file, never publish the same row
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_duration = lease_duration
+        
+        # Heartbeat and change detection, configured by start_scheduler
+        self._heartbeat_interval = 60
+        self._change_poll_interval = None
+        self._started_at = None
+        self._active_publishes = 0
+        
+        # Failed publishes are retried with exponential backoff, then dead-lettered
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
     
     def add_post(self, post_text: str, schedule_time: str) -> int:
         """
@@ -38,23 +87,31 @@ class Scheduler:
             'schedule_time': schedule_time
         })
         
+        self._track_post(post_id, schedule_time)
+        
         print(f"Post scheduled with ID {post_id} for {schedule_time}")
         return post_id
     
     def get_pending_posts(self) -> List[Dict[str, Any]]:
         """
-        Get all posts that are due to be published.
+        Get all posts that are due to be published, including retries that are due.
         
         Returns:
             List of post dictionaries for pending posts
         """
         now = datetime.utcnow().isoformat()
         
-        pending_posts = db.select(
-            table='scheduled_posts',
-            where="status = 'pending' AND schedule_time <= ? AND (reviewed = 1 OR needs_review = 0)",
-            where_params=(now,)
-        )
+        # Two SELECTs so each side uses its own partial index
+        pending_posts = db.execute(
+            """
+            SELECT * FROM scheduled_posts
+            WHERE status = 'pending' AND schedule_time <= ? AND (reviewed = 1 OR needs_review = 0)
+            UNION ALL
+            SELECT * FROM scheduled_posts
+            WHERE status = 'retrying' AND next_attempt_at <= ?
+            """,
+            (now, now)
+        ).fetchall()
         
         return pending_posts
     
@@ -76,47 +133,153 @@ class Scheduler:
         """
         Mark a post as published after successful posting.
         
+        Only applies while this worker holds the post's lease.
+        
         Args:
             post_id: ID of the post to mark
         """
-        db.update(
-            table='scheduled_posts',
-            data={'status': 'published'},
-            where='id = ?',
-            where_params=(post_id,)
+        db.execute(
+            """
+            UPDATE scheduled_posts
+            SET status = 'published', attempt_count = attempt_count + 1, next_attempt_at = NULL,
+                lease_owner = NULL, lease_expires = NULL
+            WHERE id = ? AND status = 'publishing' AND lease_owner = ?
+            """,
+            (post_id, self.worker_id)
         )
+        db.commit()
         
         print(f"Post {post_id} marked as published")
     
+    def _retry_delay(self, attempt_count: int) -> float:
+        """
+        Get the backoff before the next attempt, with jitter.
+        
+        Args:
+            attempt_count: Number of attempts made so far (1 after the first failure)
+            
+        Returns:
+            Seconds to wait, between half and all of the exponential delay
+        """
+        delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempt_count - 1))
+        return random.uniform(delay / 2, delay)
+    
     def mark_as_failed(self, post_id: int, error_message: Optional[str] = None) -> None:
         """
-        Mark a post as failed if it couldn't be published.
+        Record a failed publish attempt.
+        
+        The post is retried with exponential backoff until max_attempts is
+        reached, then moved to the 'dead' status. The post text is left as is;
+        the error goes to last_error. Only applies while this worker holds the
+        post's lease.
         
         Args:
             post_id: ID of the post to mark
             error_message: Optional error message
         """
-        # Get the current post text
-        post = db.select(
-            table='scheduled_posts',
-            where='id = ?',
-            where_params=(post_id,),
-            limit=1
-        )[0]
+        error_message = error_message or 'Unknown error'
         
-        updated_text = post['post_text'] + f" [ERROR: {error_message or 'Unknown error'}]"
+        with db.transaction():
+            # Leave the post alone if its lease expired and it was reclaimed
+            posts = db.select(
+                table='scheduled_posts',
+                columns='attempt_count',
+                where="id = ? AND status = 'publishing' AND lease_owner = ?",
+                where_params=(post_id, self.worker_id),
+                limit=1
+            )
+            if not posts:
+                return
+            
+            attempt_count = posts[0]['attempt_count'] + 1
+            
+            if attempt_count >= self.max_attempts:
+                status = 'dead'
+                next_attempt_at = None
+            else:
+                status = 'retrying'
+                next_attempt_at = (datetime.utcnow() + timedelta(seconds=self._retry_delay(attempt_count))
+                                   ).isoformat(timespec='seconds')
+            
+            db.update(
+                table='scheduled_posts',
+                data={
+                    'status': status,
+                    'attempt_count': attempt_count,
+                    'next_attempt_at': next_attempt_at,
+                    'last_error': error_message,
+                    'lease_owner': None,
+                    'lease_expires': None
+                },
+                where='id = ?',
+                where_params=(post_id,)
+            )
         
-        db.update(
+        if next_attempt_at:
+            self._track_post(post_id, next_attempt_at)
+            print(f"Post {post_id} failed (attempt {attempt_count}/{self.max_attempts}), "
+                  f"retrying at {next_attempt_at}: {error_message}")
+        else:
+            print(f"Post {post_id} moved to dead letters after {attempt_count} attempts: {error_message}")
+    
+    def retry_dead_post(self, post_id: int) -> int:
+        """
+        Give a dead-lettered post a fresh set of attempts, starting now.
+        
+        Args:
+            post_id: ID of the post to retry
+            
+        Returns:
+            Number of rows affected
+        """
+        next_attempt_at = datetime.utcnow().isoformat(timespec='seconds')
+        
+        rowcount = db.update(
             table='scheduled_posts',
             data={
-                'status': 'failed',
-                'post_text': updated_text
+                'status': 'retrying',
+                'attempt_count': 0,
+                'next_attempt_at': next_attempt_at
             },
-            where='id = ?',
+            where="id = ? AND status = 'dead'",
             where_params=(post_id,)
         )
         
-        print(f"Post {post_id} marked as failed: {error_message}")
+        if rowcount:
+            self._track_post(post_id, next_attempt_at)
+        
+        return rowcount
+    
+    def requeue_post(self, post_id: int, delay_seconds: float, reason: Optional[str] = None) -> None:
+        """
+        Push a post's next attempt into the future without counting a failure.
+        
+        The scheduled time is kept; the post waits in the 'retrying' status
+        until next_attempt_at.
+        
+        Args:
+            post_id: ID of the post to requeue
+            delay_seconds: Seconds from now until the post is due again
+            reason: Optional reason, for logging
+        """
+        next_attempt_at = (datetime.utcnow() + timedelta(seconds=delay_seconds)).isoformat(timespec='seconds')
+        
+        rowcount = db.update(
+            table='scheduled_posts',
+            data={
+                'status': 'retrying',
+                'next_attempt_at': next_attempt_at,
+                'lease_owner': None,
+                'lease_expires': None
+            },
+            where="id = ? AND (status IN ('pending', 'retrying') AND lease_owner IS NULL "
+                  "OR status = 'publishing' AND lease_owner = ?)",
+            where_params=(post_id, self.worker_id)
+        )
+        
+        if rowcount:
+            self._track_post(post_id, next_attempt_at)
+            print(f"Post {post_id} requeued for {next_attempt_at}: {reason}")
     
     def delete_post(self, post_id: int) -> None:
         """
@@ -131,97 +294,584 @@ class Scheduler:
             where_params=(post_id,)
         )
         
+        self._untrack_post(post_id)
+        
         print(f"Post {post_id} deleted")
     
-    def check_and_publish(self) -> None:
-        """Check for pending posts and publish them."""
-        pending_posts = self.get_pending_posts()
+    def approve_post(self, post_id: int) -> int:
+        """
+        Approve a post that needs review so it can be published.
         
-        if not pending_posts:
-            print("No pending posts to publish")
+        Args:
+            post_id: ID of the post to approve
+            
+        Returns:
+            Number of rows affected
+        """
+        rowcount = db.update(
+            table='scheduled_posts',
+            data={'reviewed': 1},
+            where='id = ?',
+            where_params=(post_id,)
+        )
+        
+        if rowcount and self._scheduler_running():
+            posts = db.select(
+                table='scheduled_posts',
+                columns='schedule_time',
+                where="id = ? AND status = 'pending'",
+                where_params=(post_id,),
+                limit=1
+            )
+            if posts:
+                self._track_post(post_id, posts[0]['schedule_time'])
+        
+        return rowcount
+    
+    def refresh_schedule(self) -> None:
+        """
+        Reload the due-time index from the database and wake the scheduler.
+        
+        Call this after writing to scheduled_posts without going through
+        add_post, delete_post or approve_post (e.g. bulk campaign scheduling).
+        Does nothing unless the scheduler thread runs in this process; a
+        standalone worker picks the writes up through the change counter.
+        """
+        if not self._scheduler_running():
             return
         
-        print(f"Found {len(pending_posts)} posts to publish")
+        self._load_due_times()
+        self._wake_event.set()
+    
+    def set_publish_concurrency(self, max_publish_workers: int) -> None:
+        """
+        Change the maximum number of posts published concurrently.
+        
+        Args:
+            max_publish_workers: Maximum number of concurrent publishes
+        """
+        if max_publish_workers < 1:
+            raise ValueError("max_publish_workers must be at least 1")
+        
+        with self._publish_lock:
+            self._max_publish_workers = max_publish_workers
+            old_executor = self._publish_executor
+            self._publish_executor = None
+        
+        # In-flight publishes on the old pool finish on their own
+        if old_executor:
+            old_executor.shutdown(wait=False)
+    
+    def _get_publish_executor(self) -> ThreadPoolExecutor:
+        """
+        Get the publishing pool, creating it on first use.
+        
+        Returns:
+            Thread pool used for publishing
+        """
+        with self._publish_lock:
+            if self._publish_executor is None:
+                self._publish_executor = ThreadPoolExecutor(
+                    max_workers=self._max_publish_workers,
+                    thread_name_prefix='publisher'
+                )
+            return self._publish_executor
+    
+    def _publish_post(self, post: Dict[str, Any]) -> None:
+        """
+        Publish a single post and record its status.
+        
+        Args:
+            post: Post dictionary from scheduled_posts
+        """
+        post_id = post['id']
+        post_text = post['post_text']
+        
+        print(f"Publishing post {post_id}: {post_text[:50]}...")
+        
+        with self._publish_lock:
+            self._active_publishes += 1
         
-        for post in pending_posts:
-            post_id = post['id']
-            post_text = post['post_text']
+        try:
+            success = linkedin_api.create_post(post_text)
             
-            print(f"Publishing post {post_id}: {post_text[:50]}...")
+            if success:
+                self.mark_as_published(post_id)
+            else:
+                self.mark_as_failed(post_id, "API returned failure")
+        except RateLimitedError as e:
+            # Throttled posts wait their turn rather than failing
+            self.requeue_post(post_id, e.retry_after, str(e))
+        except Exception as e:
+            print(f"Error publishing post {post_id}: {str(e)}")
+            self.mark_as_failed(post_id, str(e))
+        finally:
+            with self._publish_lock:
+                self._active_publishes -= 1
+    
+    def claim_due_posts(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        Atomically lease due posts to this worker.
+        
+        Claimed posts move to the 'publishing' status, so no other worker
+        selects them until they are published, failed, requeued, or the lease
+        expires.
+        
+        Args:
+            limit: Maximum number of posts to claim
             
-            try:
-                success = linkedin_api.create_post(post_text)
-                
-                if success:
-                    self.mark_as_published(post_id)
-                else:
-                    self.mark_as_failed(post_id, "API returned failure")
-            except Exception as e:
-                print(f"Error publishing post {post_id}: {str(e)}")
-                self.mark_as_failed(post_id, str(e))
+        Returns:
+            List of claimed post dictionaries
+        """
+        now = datetime.utcnow()
+        lease_expires = (now + timedelta(seconds=self.lease_duration)).isoformat(timespec='seconds')
+        now = now.isoformat()
+        
+        posts = db.execute(
+            """
+            UPDATE scheduled_posts
+            SET status = 'publishing', lease_owner = ?, lease_expires = ?
+            WHERE id IN (
+                SELECT id FROM scheduled_posts
+                WHERE status = 'pending' AND schedule_time <= ? AND (reviewed = 1 OR needs_review = 0)
+                UNION ALL
+                SELECT id FROM scheduled_posts
+                WHERE status = 'retrying' AND next_attempt_at <= ?
+                LIMIT ?
+            )
+            RETURNING *
+            """,
+            (self.worker_id, lease_expires, now, now, limit)
+        ).fetchall()
+        db.commit()
+        
+        return posts
     
-    def start_scheduler(self, check_interval: int = 60) -> None:
+    def reclaim_expired_leases(self) -> int:
         """
-        Start the scheduler thread to periodically check for posts to publish.
+        Release posts whose worker stopped before finishing them.
+        
+        The interrupted publish counts as a failed attempt: the post is
+        retried right away, or dead-lettered if it has used up its attempts.
+        
+        Returns:
+            Number of posts reclaimed
+        """
+        now = datetime.utcnow().isoformat(timespec='seconds')
+        
+        posts = db.execute(
+            """
+            UPDATE scheduled_posts
+            SET status = CASE WHEN attempt_count + 1 >= ? THEN 'dead' ELSE 'retrying' END,
+                next_attempt_at = CASE WHEN attempt_count + 1 >= ? THEN NULL ELSE ? END,
+                attempt_count = attempt_count + 1,
+                last_error = 'Publishing lease of ' || lease_owner || ' expired',
+                lease_owner = NULL,
+                lease_expires = NULL
+            WHERE status = 'publishing' AND lease_expires <= ?
+            RETURNING id, status, next_attempt_at
+            """,
+            (self.max_attempts, self.max_attempts, now, now)
+        ).fetchall()
+        db.commit()
+        
+        for post in posts:
+            if post['status'] == 'retrying':
+                self._track_post(post['id'], post['next_attempt_at'])
+        
+        if posts:
+            print(f"Reclaimed {len(posts)} posts with expired leases")
+        
+        return len(posts)
+    
+    def check_and_publish(self) -> None:
+        """Claim due posts and publish them concurrently."""
+        self.reclaim_expired_leases()
+        
+        executor = self._get_publish_executor()
+        claim_size = self._max_publish_workers * 4
+        published = 0
+        
+        # Claim in chunks so other workers can share a large backlog; stop
+        # claiming once shutdown starts so the drain only covers this chunk
+        while not self._stop_event.is_set():
+            batch = self.claim_due_posts(claim_size)
+            if not batch:
+                break
+            
+            print(f"Claimed {len(batch)} posts to publish")
+            published += len(batch)
+            
+            # Each post records its own status, so just wait for the chunk to finish
+            wait([executor.submit(self._publish_post, post) for post in batch])
+            
+            if len(batch) < claim_size:
+                break
+        
+        if not published:
+            print("No pending posts to publish")
+    
+    def start_scheduler(self, resync_interval: int = 900, heartbeat_interval: float = 60,
+                        change_poll_interval: Optional[float] = None) -> None:
+        """
+        Start the scheduler thread to publish posts as they become due.
+        
+        The thread sleeps until the next due time or until the schedule changes,
+        so no queries are run while nothing is due.
         
         Args:
-            check_interval: Seconds between checks for posts to publish
+            resync_interval: Maximum seconds between reloads of the due-time index
+                from the database, to pick up posts written by other processes
+            heartbeat_interval: Seconds between heartbeat writes to scheduler_workers
+            change_poll_interval: If set, seconds between checks for writes to
+                scheduled_posts (Database.change_count); the due-time index is
+                reloaded as soon as one is seen. Use this when posts are added
+                from another process, e.g. a standalone worker.
         """
-        if self._scheduler_thread and self._scheduler_thread.is_alive():
+        if self._scheduler_running():
             print("Scheduler is already running")
             return
         
-        self._check_interval = check_interval
+        self._resync_interval = resync_interval
+        self._heartbeat_interval = heartbeat_interval
+        self._change_poll_interval = change_poll_interval
+        self._started_at = datetime.utcnow().isoformat(timespec='seconds')
         self._stop_event.clear()
+        self._wake_event.clear()
         
         self._scheduler_thread = threading.Thread(target=self._scheduler_loop)
         self._scheduler_thread.daemon = True
         self._scheduler_thread.start()
         
-        print(f"Scheduler started, checking for posts every {check_interval} seconds")
+        print(f"Scheduler {self.worker_id} started, resyncing due times every {resync_interval} seconds")
     
-    def stop_scheduler(self) -> None:
-        """Stop the scheduler thread."""
-        if not self._scheduler_thread or not self._scheduler_thread.is_alive():
+    def stop_scheduler(self, drain_timeout: Optional[float] = 10) -> None:
+        """
+        Stop the scheduler thread, letting in-flight publishes finish.
+        
+        Args:
+            drain_timeout: Maximum seconds to wait for the current publishing
+                pass; None waits however long it takes. Posts still being published
+                after that keep their lease and are reclaimed once it expires.
+        """
+        if not self._scheduler_running():
             print("Scheduler is not running")
             return
         
         print("Stopping scheduler...")
         self._stop_event.set()
-        self._scheduler_thread.join(timeout=10)
-        print("Scheduler stopped")
+        self._wake_event.set()
+        self._scheduler_thread.join(timeout=drain_timeout)
+        
+        drained = not self._scheduler_thread.is_alive()
+        
+        with self._publish_lock:
+            executor = self._publish_executor
+            self._publish_executor = None
+        if executor:
+            executor.shutdown(wait=drained)
+        
+        self._write_heartbeat('stopped' if drained else 'stopping')
+        
+        if drained:
+            print("Scheduler stopped")
+        else:
+            print(f"Scheduler stopped with publishes still in flight after {drain_timeout} seconds")
+    
+    def _write_heartbeat(self, status: str) -> None:
+        """
+        Record this scheduler's status in scheduler_workers.
+        
+        Args:
+            status: 'running', 'stopping' or 'stopped'
+        """
+        with self._publish_lock:
+            in_flight = self._active_publishes
+        
+        db.execute(
+            """
+            INSERT INTO scheduler_workers
+                (worker_id, hostname, pid, status, concurrency, in_flight, started_at, last_heartbeat)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(worker_id) DO UPDATE SET
+                status = excluded.status,
+                concurrency = excluded.concurrency,
+                in_flight = excluded.in_flight,
+                last_heartbeat = excluded.last_heartbeat
+            """,
+            (self.worker_id, socket.gethostname(), os.getpid(), status, self._max_publish_workers,
+             in_flight, self._started_at or datetime.utcnow().isoformat(timespec='seconds'),
+             datetime.utcnow().isoformat(timespec='seconds'))
+        )
+        db.commit()
+    
+    def get_live_workers(self, max_age: float = 180) -> List[Dict[str, Any]]:
+        """
+        Get the schedulers that are running, judged by their heartbeats.
+        
+        Args:
+            max_age: Seconds since the last heartbeat for a worker to count as alive
+            
+        Returns:
+            List of scheduler_workers rows
+        """
+        cutoff = (datetime.utcnow() - timedelta(seconds=max_age)).isoformat(timespec='seconds')
+        
+        return db.select(
+            table='scheduler_workers',
+            where="status = 'running' AND last_heartbeat >= ?",
+            where_params=(cutoff,),
+            order_by='started_at'
+        )
+    
+    def prune_workers(self, max_age: float = 7 * 24 * 3600) -> int:
+        """
+        Delete heartbeat rows that haven't been updated for a while.
+        
+        Args:
+            max_age: Seconds since the last heartbeat after which a row is removed
+            
+        Returns:
+            Number of rows removed
+        """
+        cutoff = (datetime.utcnow() - timedelta(seconds=max_age)).isoformat(timespec='seconds')
+        
+        return db.delete(
+            table='scheduler_workers',
+            where='last_heartbeat < ?',
+            where_params=(cutoff,)
+        )
     
     def _scheduler_loop(self) -> None:
         """Main loop for the scheduler thread."""
+        self._load_due_times()
+        last_resync = time.monotonic()
+        
+        try:
+            self.prune_workers()
+            self._write_heartbeat('running')
+        except Exception as e:
+            print(f"Error writing scheduler heartbeat: {str(e)}")
+        last_heartbeat = time.monotonic()
+        
+        change_count = db.change_count('scheduled_posts')
+        last_change_poll = time.monotonic()
+        
         while not self._stop_event.is_set():
+            # Clear before computing the timeout so a change signalled while
+            # publishing is not lost
+            self._wake_event.clear()
+            
             try:
-                self.check_and_publish()
+                if self._pop_due_posts():
+                    self.check_and_publish()
             except Exception as e:
                 print(f"Error in scheduler loop: {str(e)}")
             
-            # Sleep until next check, but allow stopping during sleep
-            self._stop_event.wait(self._check_interval)
+            if time.monotonic() - last_heartbeat >= self._heartbeat_interval:
+                try:
+                    self._write_heartbeat('running')
+                except Exception as e:
+                    print(f"Error writing scheduler heartbeat: {str(e)}")
+                last_heartbeat = time.monotonic()
+            
+            # Pick up posts another process added or changed
+            if self._change_poll_interval and time.monotonic() - last_change_poll >= self._change_poll_interval:
+                try:
+                    # Heartbeats and other tables don't count, so this only
+                    # fires when posts were added, changed, claimed or deleted
+                    current_count = db.change_count('scheduled_posts')
+                    if current_count != change_count:
+                        change_count = current_count
+                        self._load_due_times()
+                except Exception as e:
+                    print(f"Error checking for schedule changes: {str(e)}")
+                last_change_poll = time.monotonic()
+            
+            if time.monotonic() - last_resync >= self._resync_interval:
+                try:
+                    self._load_due_times()
+                except Exception as e:
+                    print(f"Error reloading schedule: {str(e)}")
+                last_resync = time.monotonic()
+                continue
+            
+            # Sleep until the next post is due, the schedule changes, or it is
+            # time to resync, heartbeat or poll for changes - whichever comes first
+            now = time.monotonic()
+            timeout = min(self._resync_interval - (now - last_resync),
+                          self._heartbeat_interval - (now - last_heartbeat))
+            if self._change_poll_interval:
+                timeout = min(timeout, self._change_poll_interval - (now - last_change_poll))
+            next_due = self._seconds_until_next_due()
+            if next_due is not None:
+                timeout = min(timeout, next_due)
+            
+            self._wake_event.wait(max(timeout, 0))
+    
+    @staticmethod
+    def _parse_due_time(schedule_time: str) -> datetime:
+        """
+        Parse a stored schedule time into a naive UTC datetime.
+        
+        Args:
+            schedule_time: ISO format datetime string
+            
+        Returns:
+            Naive datetime in UTC; unparseable values are treated as due now
+        """
+        try:
+            due = datetime.fromisoformat(schedule_time)
+        except (TypeError, ValueError):
+            return datetime.utcnow()
+        
+        if due.tzinfo is not None:
+            due = due.astimezone(timezone.utc).replace(tzinfo=None)
+        
+        return due
+    
+    def _load_due_times(self) -> None:
+        """
+        Rebuild the due-time index from the publishable posts in the database.
+        
+        Posts leased by any worker are tracked until their lease expires, so a
+        post left behind by a crashed worker wakes the scheduler to reclaim it.
+        """
+        posts = db.execute(
+            """
+            SELECT id, schedule_time AS due_time FROM scheduled_posts
+            WHERE status = 'pending' AND (reviewed = 1 OR needs_review = 0)
+            UNION ALL
+            SELECT id, next_attempt_at AS due_time FROM scheduled_posts
+            WHERE status = 'retrying'
+            UNION ALL
+            SELECT id, lease_expires AS due_time FROM scheduled_posts
+            WHERE status = 'publishing'
+            """
+        ).fetchall()
+        
+        due_times = {post['id']: self._parse_due_time(post['due_time']) for post in posts}
+        heap = [(due, post_id) for post_id, due in due_times.items()]
+        heapq.heapify(heap)
+        
+        with self._due_lock:
+            self._due_times = due_times
+            self._due_heap = heap
+    
+    def _scheduler_running(self) -> bool:
+        """
+        Whether this process's scheduler thread is running.
+        
+        Only a running thread pops the due-time index, so the index is kept up
+        to date only while it runs; the thread rebuilds it when it starts.
+        """
+        return self._scheduler_thread is not None and self._scheduler_thread.is_alive()
+    
+    def _track_post(self, post_id: int, schedule_time: str) -> None:
+        """
+        Add or move a post in the due-time index and wake the scheduler.
+        
+        Does nothing unless the scheduler thread runs in this process.
+        
+        Args:
+            post_id: ID of the post
+            schedule_time: ISO format datetime string
+        """
+        if not self._scheduler_running():
+            return
+        
+        due = self._parse_due_time(schedule_time)
+        
+        with self._due_lock:
+            self._due_times[post_id] = due
+            heapq.heappush(self._due_heap, (due, post_id))
+        
+        self._wake_event.set()
+    
+    def _untrack_post(self, post_id: int) -> None:
+        """
+        Remove a post from the due-time index and wake the scheduler.
+        
+        Does nothing unless the scheduler thread runs in this process.
+        
+        Args:
+            post_id: ID of the post
+        """
+        if not self._scheduler_running():
+            return
+        
+        with self._due_lock:
+            self._due_times.pop(post_id, None)
+        
+        self._wake_event.set()
+    
+    def _pop_due_posts(self) -> List[int]:
+        """
+        Remove every post that is now due from the due-time index.
+        
+        Returns:
+            IDs of the posts that are due
+        """
+        now = datetime.utcnow()
+        due_ids = []
+        
+        with self._due_lock:
+            while self._due_heap and self._due_heap[0][0] <= now:
+                due, post_id = heapq.heappop(self._due_heap)
+                if self._due_times.get(post_id) == due:
+                    del self._due_times[post_id]
+                    due_ids.append(post_id)
+        
+        return due_ids
+    
+    def _seconds_until_next_due(self) -> Optional[float]:
+        """
+        Get the number of seconds until the next tracked post is due.
+        
+        Returns:
+            Seconds until the next due time, or None if nothing is scheduled
+        """
+        with self._due_lock:
+            # Drop stale entries so they don't cause early wakeups
+            while self._due_heap and self._due_times.get(self._due_heap[0][1]) != self._due_heap[0][0]:
+                heapq.heappop(self._due_heap)
+            
+            if not self._due_heap:
+                return None
+            
+            next_due = self._due_heap[0][0]
+        
+        return (next_due - datetime.utcnow()).total_seconds()
     
     # === CONTENT REPOSITORY METHODS ===
     
-    def add_content(self, post_text: str, category: Optional[str] = None) -> int:
+    def add_content(self, post_text: str, category: Optional[str] = None) -> Optional[int]:
         """
-        Add content to the repository.
+        Add content to the repository unless the same text is already there.
+        
+        Text is compared after normalization (see content_hash), through the
+        unique index on content_repository.content_hash.
         
         Args:
             post_text: The content to add
             category: Optional category for grouping content
             
         Returns:
-            The ID of the newly added content
+            The ID of the newly added content, or None if it was a duplicate
         """
-        content_id = db.insert('content_repository', {
-            'post_text': post_text,
-            'category': category
-        })
+        cursor = db.execute(
+            "INSERT INTO content_repository (post_text, category, content_hash) VALUES (?, ?, ?) "
+            "ON CONFLICT(content_hash) DO NOTHING",
+            (post_text, category, content_hash(post_text))
+        )
+        db.commit()
+        
+        if not cursor.rowcount:
+            print("Content already in repository, skipped duplicate")
+            return None
         
-        print(f"Content added to repository with ID {content_id}")
-        return content_id
+        print(f"Content added to repository with ID {cursor.lastrowid}")
+        return cursor.lastrowid
     
     def get_content_repository(self) -> List[Dict[str, Any]]:
         """
@@ -338,19 +988,29 @@ class Scheduler:
         # Get content from repository
         content_to_schedule = self.get_unused_content(category=category, limit=num_posts)
         
+        # Insert everything with a single commit; the due-time index is
+        # refreshed afterwards so the scheduler never sees uncommitted rows
         scheduled_count = 0
-        for i, content in enumerate(content_to_schedule):
-            if i < len(schedule_times):
-                content_id = content['id']
-                post_text = content['post_text']
-                
-                # Schedule the post
-                schedule_time = schedule_times[i].isoformat()
-                post_id = self.add_post(post_text, schedule_time)
-                
-                # Mark content as used
-                self.mark_content_as_used(content_id)
-                scheduled_count += 1
+        with db.transaction():
+            for i, content in enumerate(content_to_schedule):
+                if i < len(schedule_times):
+                    content_id = content['id']
+                    post_text = content['post_text']
+                    
+                    # Schedule the post
+                    schedule_time = schedule_times[i].isoformat()
+                    post_id = db.insert('scheduled_posts', {
+                        'post_text': post_text,
+                        'schedule_time': schedule_time,
+                        'content_id': content_id
+                    })
+                    
+                    # Mark content as used
+                    self.mark_content_as_used(content_id)
+                    scheduled_count += 1
+        
+        if scheduled_count:
+            self.refresh_schedule()
         
         return scheduled_count
 
@@ -0,0 +1,96 @@
+"""
+Helpers for building SQLite FTS5 full-text queries from user input.
+"""
+
+import re
+from typing import Optional
+
+# Runs of letters and digits, the same tokens FTS5's unicode61 tokenizer
+# produces, with an optional trailing '*' asking for a prefix match
+_TERM = re.compile(r"[^\W_]+")
+_QUERY_TERM = re.compile(r"[^\W_]+\*?")
+
+# Shortest term searched as a prefix; the FTS tables index 2- and 3-character prefixes
+MIN_PREFIX_LENGTH = 2
+
+# Default number of matches ranked per search. BM25 has to score every match
+# before the best can be picked, which takes over a second for a word found in
+# most of a million posts, so by default only the newest matches that pass the
+# search's filters are ranked (the services take max_ranked=None to rank all)
+MAX_RANKED_MATCHES = 5000
+
+# content_repository.category_key: the whole category as one FTS token, so an
+# exact category filter is a single-term match rather than a phrase. The
+# prefix keeps keys from matching ordinary words
+CATEGORY_KEY_PREFIX = 'zzcat'
+CATEGORY_KEY_SQL = f"CASE WHEN category != '' THEN '{CATEGORY_KEY_PREFIX}' || hex(category) END"
+
+def match_query(text: str, prefix: bool = True) -> Optional[str]:
+    """
+    Build an FTS5 MATCH expression from a user's search text.
+    
+    Every word must appear in the row. Words are quoted, so FTS5 operators and
+    punctuation in the input are never interpreted. A word typed with a
+    trailing '*' is matched as a prefix, and with prefix=True so is the last
+    word, which suits search-as-you-type.
+    
+    Args:
+        text: Search text as typed
+        prefix: Match the last word as a prefix
+        
+    Returns:
+        MATCH expression, or None if the text has no searchable words
+    """
+    words = _QUERY_TERM.findall(text)
+    if not words:
+        return None
+    
+    parts = []
+    for index, word in enumerate(words):
+        is_prefix = word.endswith('*') or (prefix and index == len(words) - 1)
+        word = word.rstrip('*')
+        
+        if is_prefix and len(word) >= MIN_PREFIX_LENGTH:
+            parts.append(f'"{word}"*')
+        else:
+            parts.append(f'"{word}"')
+    
+    return ' '.join(parts)
+
+
+def column_phrase(column: str, value: str) -> Optional[str]:
+    """
+    Build an FTS5 expression matching a phrase in one column.
+    
+    Used to narrow a search by an exact-match filter inside the full-text
+    index; callers still compare the column exactly.
+    
+    Args:
+        column: FTS column name
+        value: Column value to match
+        
+    Returns:
+        Column filter expression, or None if the value has no searchable words
+    """
+    terms = _TERM.findall(value)
+    if not terms:
+        return None
+    
+    return f'{column} : "{" ".join(terms)}"'
+
+
+def category_term(category: Optional[str]) -> Optional[str]:
+    """
+    Build an FTS5 term matching a category's category_key (see CATEGORY_KEY_SQL).
+    
+    Args:
+        category: Category name
+        
+    Returns:
+        Term matching exactly the rows in the category, or None for no or an empty category
+    """
+    if not category:
+        return None
+    
+    # SQLite's hex() encodes the text's UTF-8 bytes; FTS5 folds the case
+    return f'"{CATEGORY_KEY_PREFIX}{category.encode("utf-8").hex()}"'
@@ -16,6 +16,8 @@ def parse_arguments():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description='LinkedIn Bot Desktop Application')
     parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    parser.add_argument('--embedded-scheduler', action='store_true',
+                        help='Publish posts from this app instead of a standalone worker')
     return parser.parse_args()
 
 def main():
@@ -38,14 +40,17 @@ def main():
     main_window = MainWindow(debug_mode=args.debug)
     main_window.show()
     
-    # Start the scheduler in a background thread
-    scheduler.start_scheduler()
+    # Publishing normally runs in the standalone worker
+    # (python -m linkedin_bot.worker.app); optionally run it in-process
+    if args.embedded_scheduler:
+        scheduler.start_scheduler()
     
     # Execute the application
     result = app.exec_()
     
     # Stop the scheduler when the application exits
-    scheduler.stop_scheduler()
+    if args.embedded_scheduler:
+        scheduler.stop_scheduler()
     
     return result
 
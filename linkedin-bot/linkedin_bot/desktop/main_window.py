@@ -224,8 +224,12 @@ def _create_tabs(self):
         if file_path:
             try:
                 from ..services.content_service import ContentService
-                count = ContentService.import_from_csv(file_path)
-                self.show_message("Import Complete", f"Successfully imported {count} content items")
+                report = ContentService.import_from_csv(file_path)
+                self.show_message(
+                    "Import Complete",
+                    f"Successfully imported {report['imported']} content items "
+                    f"({report['duplicates']} duplicates skipped)"
+                )
                 
                 # Refresh content repository view if it exists
                 if hasattr(self, 'content_repository_view'):
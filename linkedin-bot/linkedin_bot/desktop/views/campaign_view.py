@@ -791,7 +791,10 @@ class CampaignView(QtWidgets.QWidget):
             content_list.setWordWrap(True)
             
             for item in content:
-                list_item = QtWidgets.QListWidgetItem(f"[{'Used' if item['is_used'] else 'Available'}] {item['topic']}")
+                label = f"[{'Used' if item['is_used'] else 'Available'}] {item['topic']}"
+                if item['near_duplicate_of']:
+                    label += f" (similar to #{item['near_duplicate_of']})"
+                list_item = QtWidgets.QListWidgetItem(label)
                 list_item.setData(QtCore.Qt.UserRole, item)
                 content_list.addItem(list_item)
             
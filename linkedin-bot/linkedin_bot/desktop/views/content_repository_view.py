@@ -7,6 +7,12 @@ from datetime import datetime
 
 from ...services.content_service import ContentService
 
+# Most results shown for a search
+SEARCH_RESULT_LIMIT = 200
+
+# Milliseconds to wait after the last keystroke before searching
+SEARCH_DELAY_MS = 250
+
 class ContentRepositoryView(QtWidgets.QWidget):
     """View for managing the content repository."""
     
@@ -58,6 +64,36 @@ class ContentRepositoryView(QtWidgets.QWidget):
         
         layout.addLayout(title_layout)
         
+        # Search bar
+        search_layout = QtWidgets.QHBoxLayout()
+        
+        self.search_edit = QtWidgets.QLineEdit()
+        self.search_edit.setPlaceholderText("Search content...")
+        self.search_edit.setClearButtonEnabled(True)
+        search_layout.addWidget(self.search_edit)
+        
+        self.category_combo = QtWidgets.QComboBox()
+        self.category_combo.addItem("All categories", None)
+        search_layout.addWidget(self.category_combo)
+        
+        self.status_combo = QtWidgets.QComboBox()
+        self.status_combo.addItem("Any status", None)
+        self.status_combo.addItem("Available", False)
+        self.status_combo.addItem("Used", True)
+        search_layout.addWidget(self.status_combo)
+        
+        layout.addLayout(search_layout)
+        
+        # Search as the user types, once they pause
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.refresh)
+        self.search_edit.textChanged.connect(self.search_timer.start)
+        self.search_edit.returnPressed.connect(self.refresh)
+        self.category_combo.currentIndexChanged.connect(self.refresh)
+        self.status_combo.currentIndexChanged.connect(self.refresh)
+        
         # Content table
         self.content_table = QtWidgets.QTableWidget()
         self.content_table.setColumnCount(5)
@@ -75,9 +111,21 @@ class ContentRepositoryView(QtWidgets.QWidget):
     
     def refresh(self):
         """Refresh the content repository data."""
+        self.search_timer.stop()
+        
         try:
-            # Get content
-            content = ContentService.get_all_content()
+            self.update_categories()
+            
+            # Get content, searching if a query or filter is set
+            query = self.search_edit.text().strip()
+            category = self.category_combo.currentData()
+            is_used = self.status_combo.currentData()
+            
+            if query or category is not None or is_used is not None:
+                content = ContentService.search_content(query, category=category, is_used=is_used,
+                                                        limit=SEARCH_RESULT_LIMIT)
+            else:
+                content = ContentService.get_all_content()
             
             # Update table
             self.content_table.setRowCount(len(content))
@@ -126,6 +174,23 @@ class ContentRepositoryView(QtWidgets.QWidget):
             if self.parent:
                 self.parent.show_error("Refresh Error", f"Error refreshing content repository: {str(e)}")
     
+    def update_categories(self):
+        """Reload the category filter, keeping the current selection."""
+        selected = self.category_combo.currentData()
+        
+        # Repopulating must not trigger another refresh
+        self.category_combo.blockSignals(True)
+        try:
+            self.category_combo.clear()
+            self.category_combo.addItem("All categories", None)
+            for category in sorted(ContentService.get_categories()):
+                self.category_combo.addItem(category, category)
+            
+            index = self.category_combo.findData(selected)
+            self.category_combo.setCurrentIndex(max(index, 0))
+        finally:
+            self.category_combo.blockSignals(False)
+    
     def show_add_content_dialog(self):
         """Show dialog for adding new content."""
         dialog = QtWidgets.QDialog(self)
@@ -170,7 +235,10 @@ class ContentRepositoryView(QtWidgets.QWidget):
             try:
                 content_id = ContentService.add_content(post_text, category)
                 if self.parent:
-                    self.parent.show_message("Success", f"Content added with ID: {content_id}")
+                    if content_id is None:
+                        self.parent.show_message("Duplicate", "This content is already in the repository")
+                    else:
+                        self.parent.show_message("Success", f"Content added with ID: {content_id}")
                 self.refresh()
             except Exception as e:
                 print(f"Error adding content: {str(e)}")
@@ -185,9 +253,13 @@ class ContentRepositoryView(QtWidgets.QWidget):
         
         if file_path:
             try:
-                count = ContentService.import_from_csv(file_path)
+                report = ContentService.import_from_csv(file_path)
                 if self.parent:
-                    self.parent.show_message("Import Complete", f"Successfully imported {count} content items")
+                    self.parent.show_message(
+                        "Import Complete",
+                        f"Successfully imported {report['imported']} content items "
+                        f"({report['duplicates']} duplicates skipped)"
+                    )
                 self.refresh()
             except Exception as e:
                 print(f"Error importing CSV: {str(e)}")
@@ -52,6 +52,10 @@ class DashboardView(QWidget):
         self.failed_posts_label = QLabel("Failed: 0")
         stats_layout.addWidget(self.failed_posts_label)
         
+        # Scheduler workers
+        self.workers_label = QLabel("Scheduler: not running")
+        stats_layout.addWidget(self.workers_label)
+        
         # Spacer
         stats_layout.addStretch()
         
@@ -85,12 +89,18 @@ class DashboardView(QWidget):
             # Update stats
             pending_count = sum(1 for post in posts if post['status'] == 'pending')
             published_count = sum(1 for post in posts if post['status'] == 'published')
-            failed_count = sum(1 for post in posts if post['status'] == 'failed')
+            failed_count = sum(1 for post in posts if post['status'] in ('dead', 'failed'))
             
             self.pending_posts_label.setText(f"Pending: {pending_count}")
             self.published_posts_label.setText(f"Published: {published_count}")
             self.failed_posts_label.setText(f"Failed: {failed_count}")
             
+            workers = PostService.get_live_workers()
+            if workers:
+                self.workers_label.setText(f"Scheduler: {len(workers)} worker(s) running")
+            else:
+                self.workers_label.setText("Scheduler: not running")
+            
             # Update table
             self.posts_table.setRowCount(len(posts))
             
@@ -7,6 +7,12 @@ from datetime import datetime, timedelta
 
 from ...services.post_service import PostService
 
+# Most results shown for a search
+SEARCH_RESULT_LIMIT = 200
+
+# Milliseconds to wait after the last keystroke before searching
+SEARCH_DELAY_MS = 250
+
 class PostSchedulerView(QtWidgets.QWidget):
     """View for scheduling and managing posts."""
     
@@ -53,6 +59,32 @@ class PostSchedulerView(QtWidgets.QWidget):
         
         layout.addLayout(title_layout)
         
+        # Search bar
+        search_layout = QtWidgets.QHBoxLayout()
+        
+        self.search_edit = QtWidgets.QLineEdit()
+        self.search_edit.setPlaceholderText("Search posts...")
+        self.search_edit.setClearButtonEnabled(True)
+        search_layout.addWidget(self.search_edit)
+        
+        self.status_combo = QtWidgets.QComboBox()
+        self.status_combo.addItem("Any status", None)
+        for status, label in (('pending', "Pending"), ('publishing', "Publishing"), ('retrying', "Retrying"),
+                              ('published', "Published"), ('dead', "Failed")):
+            self.status_combo.addItem(label, status)
+        search_layout.addWidget(self.status_combo)
+        
+        layout.addLayout(search_layout)
+        
+        # Search as the user types, once typing pauses
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.refresh)
+        self.search_edit.textChanged.connect(self.search_timer.start)
+        self.search_edit.returnPressed.connect(self.refresh)
+        self.status_combo.currentIndexChanged.connect(self.refresh)
+        
         # Scheduled posts table
         self.posts_table = QtWidgets.QTableWidget()
         self.posts_table.setColumnCount(5)
@@ -70,9 +102,18 @@ class PostSchedulerView(QtWidgets.QWidget):
     
     def refresh(self):
         """Refresh the post schedule data."""
+        self.search_timer.stop()
+        
         try:
-            # Get posts
-            posts = PostService.get_all_posts()
+            # Get posts, searching if a query or status is set
+            query = self.search_edit.text().strip()
+            status = self.status_combo.currentData()
+            searching = bool(query) or status is not None
+            
+            if searching:
+                posts = PostService.search_posts(query, status=status, limit=SEARCH_RESULT_LIMIT)
+            else:
+                posts = PostService.get_all_posts()
             
             # Update table
             self.posts_table.setRowCount(len(posts))
@@ -115,7 +156,9 @@ class PostSchedulerView(QtWidgets.QWidget):
                 
                 self.posts_table.setCellWidget(i, 4, actions_widget)
             
-            self.posts_table.sortItems(2)  # Sort by scheduled time
+            # Search results stay in rank order
+            if not searching:
+                self.posts_table.sortItems(2)  # Sort by scheduled time
             
         except Exception as e:
             print(f"Error refreshing post schedule: {str(e)}")
@@ -4,11 +4,25 @@ Campaign service that manages LinkedIn post campaigns.
 
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
+import asyncio
 import random
+import re
 
+from ..core.content_hash import content_hash
 from ..core.database import db
 from ..core.scheduler import scheduler
-from ..core.ai_providers import get_provider
+from ..core.ai_providers import AIProvider, get_provider, run_coroutine
+from ..core.ai_pipeline import GenerationPipeline
+from ..core.near_duplicates import near_duplicate_index
+
+# Section header the model is asked to put before each post in a batched response
+BATCH_SECTION_PATTERN = re.compile(r"^[ \t]*=+[ \t]*POST[ \t]+(\d+)[ \t]*=+[ \t]*$", re.MULTILINE | re.IGNORECASE)
+
+# Rough prompt size estimate used for batching reports (about 4 characters per token)
+CHARS_PER_TOKEN = 4
+
+# What generation does with a post that is a near duplicate of existing content
+NEAR_DUPLICATE_ACTIONS = ('flag', 'regenerate')
 
 class CampaignService:
     """Service for managing campaigns."""
@@ -99,44 +113,26 @@ class CampaignService:
         Returns:
             Campaign dictionary or None if not found
         """
-        campaigns = db.select(
-            table='campaigns',
-            where='id = ?',
-            where_params=(campaign_id,),
-            limit=1
-        )
-        
-        if not campaigns:
-            return None
-        
-        campaign = campaigns[0]
-        
-        # Get topic count
-        topic_count_result = db.execute(
-            "SELECT COUNT(*) as count FROM campaign_topics WHERE campaign_id = ?",
-            (campaign_id,)
-        ).fetchone()
-        topic_count = topic_count_result['count'] if topic_count_result else 0
-        
-        # Get unused topic count
-        unused_topic_count_result = db.execute(
-            "SELECT COUNT(*) as count FROM campaign_topics WHERE campaign_id = ? AND is_used = 0",
-            (campaign_id,)
-        ).fetchone()
-        unused_topic_count = unused_topic_count_result['count'] if unused_topic_count_result else 0
-        
-        # Get scheduled post count
-        scheduled_post_count_result = db.execute(
+        # Campaign row plus topic and scheduled post counts in one query;
+        # each subquery is served by a covering index
+        campaign = db.execute(
             """
-            SELECT COUNT(*) as count FROM scheduled_posts 
-            WHERE post_text IN (
-                SELECT post_text FROM content_repository 
-                WHERE category LIKE ?
-            )
+            SELECT c.*,
+                (SELECT COUNT(*) FROM campaign_topics t
+                 WHERE t.campaign_id = c.id) AS topic_count,
+                (SELECT COUNT(*) FROM campaign_topics t
+                 WHERE t.campaign_id = c.id AND t.is_used = 0) AS unused_topic_count,
+                (SELECT COUNT(*) FROM content_repository r
+                 JOIN scheduled_posts p ON p.content_id = r.id
+                 WHERE r.campaign_id = c.id) AS scheduled_post_count
+            FROM campaigns c
+            WHERE c.id = ?
             """,
-            (f"Campaign: {campaign_id}%",)
+            (campaign_id,)
         ).fetchone()
-        scheduled_post_count = scheduled_post_count_result['count'] if scheduled_post_count_result else 0
+        
+        if not campaign:
+            return None
         
         # Format dates
         try:
@@ -157,9 +153,9 @@ class CampaignService:
             'requires_review': bool(campaign['requires_review']),
             'status': campaign['status'],
             'created_at': campaign['created_at'],
-            'topic_count': topic_count,
-            'unused_topic_count': unused_topic_count,
-            'scheduled_post_count': scheduled_post_count
+            'topic_count': campaign['topic_count'],
+            'unused_topic_count': campaign['unused_topic_count'],
+            'scheduled_post_count': campaign['scheduled_post_count']
         }
     
     @staticmethod
@@ -173,10 +169,8 @@ class CampaignService:
         Returns:
             Boolean indicating success
         """
-        # Start a transaction
-        db.execute("BEGIN TRANSACTION")
-        
-        try:
+        # Delete everything in one transaction (rolled back on error)
+        with db.transaction():
             # Delete the topics
             db.delete(
                 table='campaign_topics',
@@ -187,8 +181,8 @@ class CampaignService:
             # Delete any content in the repository associated with this campaign
             db.delete(
                 table='content_repository',
-                where='category LIKE ?',
-                where_params=(f"Campaign: {campaign_id}%",)
+                where='campaign_id = ?',
+                where_params=(campaign_id,)
             )
             
             # Delete the campaign itself
@@ -197,14 +191,8 @@ class CampaignService:
                 where='id = ?',
                 where_params=(campaign_id,)
             )
-            
-            # Commit the transaction
-            db.commit()
-            return True
-        except:
-            # Rollback in case of error
-            db.rollback()
-            raise
+        
+        return True
     
     @staticmethod
     def generate_topics(campaign_id: int, num_topics: int = 15, api_key: str = None, provider_name: str = "openai") -> int:
@@ -218,7 +206,6 @@ class CampaignService:
         category = campaign['category']
         
         # Get the appropriate AI provider
-        from ai_providers import get_provider
         provider = get_provider(provider_name, api_key)
         
         # Create the prompt for topic generation - MODIFIED FOR ANY CATEGORY
@@ -240,15 +227,16 @@ class CampaignService:
             # Extract and process the generated topics
             topics = [line.strip() for line in content.split('\n') if line.strip()]
             
-            # Store the topics in the database
-            for topic in topics:
-                db.insert(
-                    'campaign_topics',
-                    {
-                        'campaign_id': campaign_id,
-                        'topic': topic
-                    }
-                )
+            # Store the topics in the database with a single commit
+            with db.transaction():
+                for topic in topics:
+                    db.insert(
+                        'campaign_topics',
+                        {
+                            'campaign_id': campaign_id,
+                            'topic': topic
+                        }
+                    )
             
             return len(topics)
                 
@@ -353,38 +341,306 @@ class CampaignService:
         return topic_count
     
     @staticmethod
-    def generate_content(campaign_id: int, api_key: str = None, provider_name: str = "openai", 
-                        persona: dict = None) -> int:
+    def _content_complexity(topic_text: str) -> str:
+        """Determine post complexity based on topic length."""
+        return "simple" if len(topic_text.split()) < 4 else "detailed"
+    
+    @staticmethod
+    def _content_guidelines(persona: dict) -> str:
         """
-        Generate content for campaign topics.
+        Build the persona and writing rules block shared by every content prompt.
+        
+        Args:
+            persona: Dictionary with persona details
+            
+        Returns:
+            Prompt text
+        """
+        return f"""
+        The tone should be professional but conversational, positioning the author as an 
+        expert in the field. Include a call to action at the end.
+        Only include information that is factual and can be substantiated.
+        
+        Write as a {persona['age']}-year-old who {persona['background']}. 
+        The tone should be {persona['tone']}. 
+        The style should be {persona['style']}.
+        Use plain English with short sentences. Sound like someone who's been in the field, not in a meeting.
+        
+        Writing Rules:
+        - Use active voice
+        - Avoid unnecessary adverbs
+        - No corporate buzzwords or fluff
+        - Use relevant industry terminology when it fits
+        - Keep it conversational but professional
+        - Break up long paragraphs for readability
+        - Include at least one concrete example or insight
+        
+        Finish with 2-3 relevant hashtags.
+        
+        Keep the post under 1300 characters (LinkedIn's limit).
+        """
+    
+    @staticmethod
+    def _build_content_prompt(topic_text: str, category: str, persona: dict) -> str:
+        """
+        Build the LinkedIn post prompt for a campaign topic.
+        
+        Args:
+            topic_text: Topic to write about
+            category: Campaign category
+            persona: Dictionary with persona details
+            
+        Returns:
+            Prompt text
+        """
+        complexity = CampaignService._content_complexity(topic_text)
+        
+        # Create the prompt for content generation with dynamic components
+        return f"""
+        Write a professional LinkedIn post about "{topic_text}" for a {category} {persona['profession']}.
+        
+        This post should be {complexity} and include practical insights relevant to {category}.
+        {CampaignService._content_guidelines(persona)}"""
+    
+    @staticmethod
+    def _build_batch_prompt(topic_texts: List[str], category: str, persona: dict) -> str:
+        """
+        Build one prompt asking for a LinkedIn post per topic, in delimited sections.
+        
+        Args:
+            topic_texts: Topics to write about, in section order
+            category: Campaign category
+            persona: Dictionary with persona details
+            
+        Returns:
+            Prompt text
+        """
+        topic_lines = "\n".join(
+            f'        {number}. "{topic_text}" ({CampaignService._content_complexity(topic_text)})'
+            for number, topic_text in enumerate(topic_texts, 1)
+        )
+        
+        return f"""
+        Write {len(topic_texts)} separate professional LinkedIn posts for a {category} {persona['profession']}, one for each topic below.
+        
+        Topics:
+{topic_lines}
+        
+        Each post should be as simple or detailed as marked next to its topic and include practical insights relevant to {category}.
+        Every rule below applies to each post on its own.
+        {CampaignService._content_guidelines(persona)}
+        Output format: before each post write a line containing only "=== POST <topic number> ===",
+        then the post text. Write the posts in topic order and nothing before the first header.
+        """
+    
+    @staticmethod
+    def _parse_batch_response(response: str, count: int) -> Dict[int, str]:
+        """
+        Split a batched response into posts.
+        
+        Args:
+            response: Model output for a batch prompt
+            count: Number of topics in the batch
+            
+        Returns:
+            Dictionary mapping topic number (1-based) to post text; topics whose
+            section is missing, empty, out of range or repeated are left out
+        """
+        headers = list(BATCH_SECTION_PATTERN.finditer(response))
+        sections: Dict[int, List[str]] = {}
+        
+        for index, header in enumerate(headers):
+            end = headers[index + 1].start() if index + 1 < len(headers) else len(response)
+            sections.setdefault(int(header.group(1)), []).append(response[header.end():end].strip())
+        
+        return {
+            number: texts[0]
+            for number, texts in sections.items()
+            if 1 <= number <= count and len(texts) == 1 and texts[0]
+        }
+    
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Roughly estimate the token count of a prompt."""
+        return max(1, len(text) // CHARS_PER_TOKEN)
+    
+    @staticmethod
+    def _default_persona() -> dict:
+        """Persona used when none is provided."""
+        # You can load this from a settings file or database in the future
+        return {
+            "profession": "professional",
+            "age": "28",
+            "background": "lives in the U.S. but was born in Eastern Europe",
+            "tone": "calm, confident, and direct",
+            "style": "honest, grounded, and human"
+        }
+    
+    @staticmethod
+    def _check_near_duplicate_action(action: str) -> None:
+        """Raise ValueError unless action is a supported near_duplicate_action."""
+        if action not in NEAR_DUPLICATE_ACTIONS:
+            raise ValueError(f"near_duplicate_action must be one of {', '.join(NEAR_DUPLICATE_ACTIONS)}")
+    
+    @staticmethod
+    def _save_topic_content(campaign_id: int, topic: Dict[str, Any], content: str,
+                            near_duplicate: Optional[Tuple[int, float]] = None) -> Optional[int]:
+        """
+        Add generated content to the repository and mark its topic as used in one commit.
+        
+        Content whose normalized text is already in the repository is skipped
+        and its topic is left unused.
+        
+        Args:
+            campaign_id: Campaign ID
+            topic: Topic row
+            content: Generated post text
+            near_duplicate: Optional (content_id, similarity) of existing content
+                this post is a near duplicate of, recorded as a flag
+            
+        Returns:
+            Content ID, or None if the content was a duplicate
+        """
+        near_duplicate_of, near_duplicate_similarity = near_duplicate or (None, None)
+        
+        with db.transaction():
+            cursor = db.execute(
+                """
+                INSERT INTO content_repository (post_text, category, campaign_id, topic_id, content_hash,
+                                                near_duplicate_of, near_duplicate_similarity)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(content_hash) DO NOTHING
+                """,
+                (content, f"Campaign: {campaign_id} - {topic['topic']}", campaign_id, topic['id'],
+                 content_hash(content), near_duplicate_of, near_duplicate_similarity)
+            )
+            
+            if not cursor.rowcount:
+                print(f"Skipped duplicate content for topic '{topic['topic']}'")
+                return None
+            
+            content_id = cursor.lastrowid
+            
+            db.update(
+                table='campaign_topics',
+                data={'is_used': 1},
+                where='id = ?',
+                where_params=(topic['id'],)
+            )
+        
+        # Sign the new post now so later posts in the same run are compared with
+        # it, even while older rows are still waiting for the index to sync
+        near_duplicate_index.sign(content_id, content)
+        
+        return content_id
+    
+    @staticmethod
+    def _store_generated_content(campaign_id: int, topic: Dict[str, Any], content: str,
+                                 near_duplicate_threshold: Optional[float], regenerate: bool) -> str:
+        """
+        Check generated content for near duplicates, then save it.
+        
+        Args:
+            campaign_id: Campaign ID
+            topic: Topic row
+            content: Generated post text
+            near_duplicate_threshold: Similarity at or above which content is a
+                near duplicate; None skips the check
+            regenerate: Don't save near duplicates, so the caller can regenerate them
+            
+        Returns:
+            'saved', 'flagged' (saved as a near duplicate), 'duplicate' (exact
+            duplicate, not saved) or 'regenerate' (near duplicate, not saved)
+        """
+        near_duplicate = None
+        if near_duplicate_threshold is not None:
+            near_duplicate = near_duplicate_index.find_most_similar(content, near_duplicate_threshold)
+        
+        if near_duplicate is not None:
+            print(f"Content for topic '{topic['topic']}' is {near_duplicate[1]:.0%} similar "
+                  f"to content {near_duplicate[0]}")
+            if regenerate:
+                return 'regenerate'
+        
+        if CampaignService._save_topic_content(campaign_id, topic, content, near_duplicate) is None:
+            return 'duplicate'
+        
+        return 'flagged' if near_duplicate is not None else 'saved'
+    
+    @staticmethod
+    async def _regenerate_topics(campaign_id: int, provider: AIProvider, topics: List[Dict[str, Any]],
+                                 category: str, persona: dict, near_duplicate_threshold: Optional[float],
+                                 max_concurrency: int, timeout: float) -> Dict[str, int]:
+        """
+        Generate topics again, bypassing the response cache, and save the results.
+        
+        Results that are still near duplicates are saved and flagged; exact
+        duplicates are skipped and their topics stay unused.
+        
+        Args:
+            campaign_id: Campaign ID
+            provider: AI provider to generate with
+            topics: Topic rows whose content was a near or exact duplicate
+            category: Campaign category
+            persona: Persona details
+            near_duplicate_threshold: Similarity at or above which content is a near duplicate
+            max_concurrency: Maximum number of requests at once
+            timeout: Seconds each request may take
+            
+        Returns:
+            Dictionary counting saved, flagged, duplicate and failed topics
+        """
+        print(f"Regenerating {len(topics)} duplicate topics")
+        
+        pipeline = GenerationPipeline(
+            provider,
+            max_concurrency=max_concurrency,
+            timeout=timeout,
+            max_tokens=700,
+            temperature=0.7,
+            use_cache=False
+        )
+        topics_by_id = {topic['id']: topic for topic in topics}
+        prompts = {
+            topic['id']: CampaignService._build_content_prompt(topic['topic'], category, persona)
+            for topic in topics
+        }
+        
+        counts = {'saved': 0, 'flagged': 0, 'duplicate': 0, 'failed': 0}
+        
+        async for topic_id, content, error in pipeline.stream(prompts):
+            topic = topics_by_id[topic_id]
+            
+            if error is not None:
+                print(f"Error regenerating content for topic '{topic['topic']}': {str(error)}")
+                counts['failed'] += 1
+                continue
+            
+            status = await asyncio.to_thread(
+                CampaignService._store_generated_content,
+                campaign_id, topic, content, near_duplicate_threshold, False
+            )
+            counts[status] += 1
+        
+        return counts
+    
+    @staticmethod
+    def _get_generation_inputs(campaign_id: int, persona: Optional[dict]) -> Tuple[str, dict, List[Dict[str, Any]]]:
+        """
+        Load what content generation needs for a campaign.
         
         Args:
             campaign_id: Campaign ID
-            api_key: API key for the AI provider
-            provider_name: Name of the AI provider to use
             persona: Optional dictionary with persona details
-                
+            
         Returns:
-            Number of content items generated
+            Tuple of (category, persona, unused topics)
         """
         # Get the campaign
         campaign = CampaignService.get_campaign(campaign_id)
         if not campaign:
             raise ValueError(f"Campaign with ID {campaign_id} not found")
         
-        category = campaign['category']
-        
-        # Use default persona if none provided
-        if not persona:
-            # You can load this from a settings file or database in the future
-            persona = {
-                "profession": "professional",
-                "age": "28",
-                "background": "lives in the U.S. but was born in Eastern Europe",
-                "tone": "calm, confident, and direct",
-                "style": "honest, grounded, and human"
-            }
-        
         # Get all unused topics
         topics = db.select(
             table='campaign_topics',
@@ -395,69 +651,312 @@ class CampaignService:
         if not topics:
             raise ValueError(f"No unused topics found for campaign {campaign_id}")
         
-        # Get the AI provider
-        provider = get_provider(provider_name, api_key)
+        return campaign['category'], persona or CampaignService._default_persona(), topics
+    
+    @staticmethod
+    def generate_content(campaign_id: int, api_key: str = None, provider_name: str = "openai", 
+                        persona: dict = None, max_concurrency: int = 8, timeout: float = 120.0,
+                        batch_size: int = 1, near_duplicate_threshold: Optional[float] = 0.8,
+                        near_duplicate_action: str = 'flag') -> int:
+        """
+        Generate content for campaign topics.
+        
+        Blocking wrapper around agenerate_content (or agenerate_content_batched
+        when batch_size is above 1) for Flask and Qt callers.
+        
+        Args:
+            campaign_id: Campaign ID
+            api_key: API key for the AI provider
+            provider_name: Name of the AI provider to use
+            persona: Optional dictionary with persona details
+            max_concurrency: Maximum number of requests at once
+            timeout: Seconds each topic's request may take
+            batch_size: Number of topics to pack into each request
+            near_duplicate_threshold: Similarity to existing content at or above
+                which a post is a near duplicate; None disables the check
+            near_duplicate_action: 'flag' to save near duplicates flagged, or
+                'regenerate' to generate them once more without the cache
+                
+        Returns:
+            Number of content items generated
+        """
+        if batch_size > 1:
+            report = run_coroutine(CampaignService.agenerate_content_batched(
+                campaign_id,
+                api_key=api_key,
+                provider_name=provider_name,
+                persona=persona,
+                batch_size=batch_size,
+                max_concurrency=max_concurrency,
+                timeout=timeout,
+                near_duplicate_threshold=near_duplicate_threshold,
+                near_duplicate_action=near_duplicate_action
+            ))
+            return report['generated']
+        
+        return run_coroutine(CampaignService.agenerate_content(
+            campaign_id,
+            api_key=api_key,
+            provider_name=provider_name,
+            persona=persona,
+            max_concurrency=max_concurrency,
+            timeout=timeout,
+            near_duplicate_threshold=near_duplicate_threshold,
+            near_duplicate_action=near_duplicate_action
+        ))
+    
+    @staticmethod
+    async def agenerate_content(campaign_id: int, api_key: str = None, provider_name: str = "openai",
+                                persona: dict = None, max_concurrency: int = 8, timeout: float = 120.0,
+                                pipeline: Optional[GenerationPipeline] = None,
+                                near_duplicate_threshold: Optional[float] = 0.8,
+                                near_duplicate_action: str = 'flag') -> int:
+        """
+        Generate content for campaign topics on the running event loop.
+        
+        Topics go through a GenerationPipeline and each result is saved as soon
+        as it arrives. A topic that fails or times out is left unused so it can
+        be retried; the rest still complete. Results are checked against the
+        repository's near-duplicate index before they are saved. A result that
+        exactly duplicates existing content may have come from the response
+        cache, so its topic is generated once more without the cache.
+        
+        Args:
+            campaign_id: Campaign ID
+            api_key: API key for the AI provider
+            provider_name: Name of the AI provider to use
+            persona: Optional dictionary with persona details
+            max_concurrency: Maximum number of topics generated at once
+            timeout: Seconds each topic's request may take
+            pipeline: Optional pipeline to use instead of building one, e.g. so
+                another thread can cancel() it; overrides the three arguments above
+            near_duplicate_threshold: Similarity to existing content at or above
+                which a post is a near duplicate; None disables the check
+            near_duplicate_action: 'flag' to save near duplicates flagged, or
+                'regenerate' to generate them once more without the cache
+                
+        Returns:
+            Number of content items generated (duplicates of existing content
+            are skipped and not counted)
+        """
+        CampaignService._check_near_duplicate_action(near_duplicate_action)
+        category, persona, topics = CampaignService._get_generation_inputs(campaign_id, persona)
+        
+        if pipeline is None:
+            pipeline = GenerationPipeline(
+                get_provider(provider_name, api_key),
+                max_concurrency=max_concurrency,
+                timeout=timeout,
+                max_tokens=700,
+                temperature=0.7
+            )
+        
+        topics_by_id = {topic['id']: topic for topic in topics}
+        prompts = {
+            topic['id']: CampaignService._build_content_prompt(topic['topic'], category, persona)
+            for topic in topics
+        }
         
         generated_count = 0
-        for topic in topics:
-            topic_id = topic['id']
-            topic_text = topic['topic']
-            
-            # Determine post complexity based on topic length and complexity
-            complexity = "simple" if len(topic_text.split()) < 4 else "detailed"
-            
-            # Create the prompt for content generation with dynamic components
-            prompt = f"""
-            Write a professional LinkedIn post about "{topic_text}" for a {category} {persona['profession']}.
-            
-            This post should be {complexity} and include practical insights relevant to {category}.
-            
-            The tone should be professional but conversational, positioning the author as an 
-            expert in the field. Include a call to action at the end.
-            Only include information that is factual and can be substantiated.
+        regenerate_topics = []
+        errors = []
+        
+        # Persist in a worker thread as results arrive, one at a time so each
+        # is compared with the ones saved before it, without blocking the loop
+        async for topic_id, content, error in pipeline.stream(prompts):
+            topic = topics_by_id[topic_id]
             
-            Write as a {persona['age']}-year-old who {persona['background']}. 
-            The tone should be {persona['tone']}. 
-            The style should be {persona['style']}.
-            Use plain English with short sentences. Sound like someone who's been in the field, not in a meeting.
+            if error is not None:
+                print(f"Error generating content for topic '{topic['topic']}': {str(error)}")
+                errors.append(error)
+                continue
             
-            Writing Rules:
-            - Use active voice
-            - Avoid unnecessary adverbs
-            - No corporate buzzwords or fluff
-            - Use relevant industry terminology when it fits
-            - Keep it conversational but professional
-            - Break up long paragraphs for readability
-            - Include at least one concrete example or insight
+            status = await asyncio.to_thread(
+                CampaignService._store_generated_content,
+                campaign_id, topic, content, near_duplicate_threshold,
+                near_duplicate_action == 'regenerate'
+            )
+            if status == 'regenerate' or (status == 'duplicate' and pipeline.use_cache):
+                regenerate_topics.append(topic)
+            elif status != 'duplicate':
+                generated_count += 1
+        
+        if regenerate_topics and not pipeline.cancelled:
+            counts = await CampaignService._regenerate_topics(
+                campaign_id, pipeline.provider, regenerate_topics, category, persona,
+                near_duplicate_threshold, pipeline.max_concurrency, pipeline.timeout
+            )
+            generated_count += counts['saved'] + counts['flagged']
+        
+        # Surface the failure if nothing could be generated at all
+        if errors and not generated_count:
+            raise errors[0]
+        
+        return generated_count
+    
+    @staticmethod
+    async def agenerate_content_batched(campaign_id: int, api_key: str = None, provider_name: str = "openai",
+                                        persona: dict = None, batch_size: int = 5, max_concurrency: int = 8,
+                                        timeout: float = 120.0, near_duplicate_threshold: Optional[float] = 0.8,
+                                        near_duplicate_action: str = 'flag') -> Dict[str, Any]:
+        """
+        Generate content for campaign topics, several topics per request.
+        
+        The persona and writing rules are sent once per batch instead of once
+        per topic, and the model is asked for one delimited section per topic.
+        Each parsed section becomes its own content_repository row. Topics whose
+        section is missing or unparseable, and topics from failed batches, are
+        retried one request per topic. Topics whose content exactly duplicates
+        existing content are generated once more without the response cache.
+        
+        Args:
+            campaign_id: Campaign ID
+            api_key: API key for the AI provider
+            provider_name: Name of the AI provider to use
+            persona: Optional dictionary with persona details
+            batch_size: Number of topics to pack into each request
+            max_concurrency: Maximum number of requests at once
+            timeout: Seconds a single-topic request may take; batch requests
+                get batch_size times as long
+            near_duplicate_threshold: Similarity to existing content at or above
+                which a post is a near duplicate; None disables the check
+            near_duplicate_action: 'flag' to save near duplicates flagged, or
+                'regenerate' to generate them once more without the cache
+                
+        Returns:
+            Dictionary with generated, duplicates (skipped), near_duplicates
+            (saved flagged), regenerated, failed, batches, retried, round_trips,
+            round_trips_saved and prompt_tokens_saved (estimated, can be
+            negative if many topics needed a retry)
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        CampaignService._check_near_duplicate_action(near_duplicate_action)
+        
+        category, persona, topics = CampaignService._get_generation_inputs(campaign_id, persona)
+        provider = get_provider(provider_name, api_key)
+        
+        batches = [topics[i:i + batch_size] for i in range(0, len(topics), batch_size)]
+        batch_prompts = {
+            index: CampaignService._build_batch_prompt([topic['topic'] for topic in batch], category, persona)
+            for index, batch in enumerate(batches)
+        }
+        
+        batch_pipeline = GenerationPipeline(
+            provider,
+            max_concurrency=max_concurrency,
+            timeout=timeout * batch_size,
+            max_tokens=700 * batch_size,
+            temperature=0.7
+        )
+        
+        generated_count = 0
+        duplicate_count = 0
+        flagged_count = 0
+        retry_topics = []
+        regenerate_topics = []
+        errors = []
+        
+        async def record(topic: Dict[str, Any], content: str) -> None:
+            nonlocal generated_count, flagged_count
+            status = await asyncio.to_thread(
+                CampaignService._store_generated_content,
+                campaign_id, topic, content, near_duplicate_threshold,
+                near_duplicate_action == 'regenerate'
+            )
+            # An exact duplicate may be a cached response, so it gets one uncached retry too
+            if status in ('regenerate', 'duplicate'):
+                regenerate_topics.append(topic)
+            else:
+                generated_count += 1
+                if status == 'flagged':
+                    flagged_count += 1
+        
+        async for index, response, error in batch_pipeline.stream(batch_prompts):
+            batch = batches[index]
             
-            Finish with 2-3 relevant hashtags.
+            if error is not None:
+                print(f"Error generating content for batch of {len(batch)} topics: {str(error)}")
+                retry_topics.extend(batch)
+                continue
             
-            Keep the post under 1300 characters (LinkedIn's limit).
-            """
+            posts = CampaignService._parse_batch_response(response, len(batch))
             
-            # Generate content
-            content = provider.generate_content(prompt, max_tokens=700, temperature=0.7)
+            for number, topic in enumerate(batch, 1):
+                if number in posts:
+                    await record(topic, posts[number])
+                else:
+                    retry_topics.append(topic)
+        
+        # Fall back to one request per topic for whatever the batches didn't cover
+        retry_prompts = {
+            topic['id']: CampaignService._build_content_prompt(topic['topic'], category, persona)
+            for topic in retry_topics
+        }
+        
+        if retry_prompts:
+            print(f"Retrying {len(retry_prompts)} topics individually")
             
-            # Add to repository
-            content_id = db.insert(
-                'content_repository',
-                {
-                    'post_text': content,
-                    'category': f"Campaign: {campaign_id} - {topic_text}"
-                }
+            retry_pipeline = GenerationPipeline(
+                provider,
+                max_concurrency=max_concurrency,
+                timeout=timeout,
+                max_tokens=700,
+                temperature=0.7
             )
+            topics_by_id = {topic['id']: topic for topic in retry_topics}
             
-            # Mark topic as used
-            db.update(
-                table='campaign_topics',
-                data={'is_used': 1},
-                where='id = ?',
-                where_params=(topic_id,)
+            async for topic_id, content, error in retry_pipeline.stream(retry_prompts):
+                topic = topics_by_id[topic_id]
+                
+                if error is not None:
+                    print(f"Error generating content for topic '{topic['topic']}': {str(error)}")
+                    errors.append(error)
+                    continue
+                
+                await record(topic, content)
+        
+        if regenerate_topics:
+            counts = await CampaignService._regenerate_topics(
+                campaign_id, provider, regenerate_topics, category, persona,
+                near_duplicate_threshold, max_concurrency, timeout
             )
-            
-            generated_count += 1
+            generated_count += counts['saved'] + counts['flagged']
+            flagged_count += counts['flagged']
+            duplicate_count += counts['duplicate']
         
-        return generated_count
+        # Surface the failure if nothing could be generated at all
+        if errors and not generated_count:
+            raise errors[0]
+        
+        estimate = CampaignService._estimate_tokens
+        single_prompt_tokens = sum(
+            estimate(CampaignService._build_content_prompt(topic['topic'], category, persona))
+            for topic in topics
+        )
+        sent_prompt_tokens = (sum(estimate(prompt) for prompt in batch_prompts.values())
+                              + sum(estimate(prompt) for prompt in retry_prompts.values())
+                              + sum(estimate(CampaignService._build_content_prompt(topic['topic'], category, persona))
+                                    for topic in regenerate_topics))
+        round_trips = len(batches) + len(retry_prompts) + len(regenerate_topics)
+        
+        report = {
+            'generated': generated_count,
+            'duplicates': duplicate_count,
+            'near_duplicates': flagged_count,
+            'regenerated': len(regenerate_topics),
+            'failed': len(topics) - generated_count - duplicate_count,
+            'batches': len(batches),
+            'retried': len(retry_prompts),
+            'round_trips': round_trips,
+            'round_trips_saved': len(topics) - round_trips,
+            'prompt_tokens_saved': single_prompt_tokens - sent_prompt_tokens
+        }
+        
+        print(f"Batched generation: {generated_count}/{len(topics)} topics in {round_trips} requests "
+              f"({report['round_trips_saved']} round trips and ~{report['prompt_tokens_saved']} prompt tokens saved)")
+        
+        return report
     
     @staticmethod
     def get_campaign_content(campaign_id: int) -> List[Dict[str, Any]]:
@@ -472,8 +971,8 @@ class CampaignService:
         """
         content = db.select(
             table='content_repository',
-            where='category LIKE ?',
-            where_params=(f"Campaign: {campaign_id}%",),
+            where='campaign_id = ?',
+            where_params=(campaign_id,),
             order_by='is_used, created_at DESC'
         )
         
@@ -488,7 +987,9 @@ class CampaignService:
                 'text': item['post_text'],
                 'topic': topic,
                 'is_used': bool(item['is_used']),
-                'created_at': item['created_at']
+                'created_at': item['created_at'],
+                'near_duplicate_of': item['near_duplicate_of'],
+                'near_duplicate_similarity': item['near_duplicate_similarity']
             })
         
         return formatted_content
@@ -524,8 +1025,8 @@ class CampaignService:
         # Get unscheduled content for this campaign
         content = db.select(
             table='content_repository',
-            where='category LIKE ? AND is_used = 0',
-            where_params=(f"Campaign: {campaign_id}%",)
+            where='campaign_id = ? AND is_used = 0',
+            where_params=(campaign_id,)
         )
         
         if not content:
@@ -562,32 +1063,37 @@ class CampaignService:
             
             current_date += timedelta(days=1)
         
-        # Schedule posts
+        # Schedule posts with a single commit
         scheduled_count = 0
-        for i, post_time in enumerate(time_slots):
-            if i < len(content):
-                content_item = content[i]
-                content_id = content_item['id']
-                post_text = content_item['post_text']
-                
-                # Schedule the post
-                post_id = db.insert(
-                    'scheduled_posts',
-                    {
-                        'post_text': post_text,
-                        'schedule_time': post_time.isoformat(),
-                        'needs_review': 1 if requires_review else 0
-                    }
-                )
-                
-                # Mark content as used
-                db.update(
-                    table='content_repository',
-                    data={'is_used': 1},
-                    where='id = ?',
-                    where_params=(content_id,)
-                )
-                
-                scheduled_count += 1
+        with db.transaction():
+            for i, post_time in enumerate(time_slots):
+                if i < len(content):
+                    content_item = content[i]
+                    content_id = content_item['id']
+                    post_text = content_item['post_text']
+                    
+                    # Schedule the post
+                    post_id = db.insert(
+                        'scheduled_posts',
+                        {
+                            'post_text': post_text,
+                            'schedule_time': post_time.isoformat(),
+                            'needs_review': 1 if requires_review else 0,
+                            'content_id': content_id
+                        }
+                    )
+                    
+                    # Mark content as used
+                    db.update(
+                        table='content_repository',
+                        data={'is_used': 1},
+                        where='id = ?',
+                        where_params=(content_id,)
+                    )
+                    
+                    scheduled_count += 1
+        
+        # Let the scheduler pick up the new due times
+        scheduler.refresh_schedule()
         
         return scheduled_count
\ No newline at end of file
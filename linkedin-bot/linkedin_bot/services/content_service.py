@@ -2,28 +2,60 @@
 Content service that manages the content repository.
 """
 
-import os
+import io
 import csv
-from typing import List, Dict, Any, Optional, Tuple
-import tempfile
+import time
+from itertools import islice
+from typing import List, Dict, Any, BinaryIO, Iterator, Optional, TextIO, Tuple, Union
 
+from ..core.content_hash import content_hash
 from ..core.database import db
 from ..core.scheduler import scheduler
+from ..core.search import MAX_RANKED_MATCHES, category_term, match_query
+
+# Largest CSV upload accepted by import_from_uploaded_file, in bytes
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+
+# Accepted header row for uploads: post content first, optional category second
+CSV_HEADER = ['postcontent', 'category']
+
+
+class _LimitedReader(io.RawIOBase):
+    """Reads a binary stream, raising ValueError once more than max_bytes are read."""
+    
+    def __init__(self, stream: BinaryIO, max_bytes: int):
+        self._stream = stream
+        self._remaining = max_bytes
+        self.max_bytes = max_bytes
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        # Ask for one byte past the limit so an oversized stream is detected
+        data = self._stream.read(min(len(buffer), self._remaining + 1))
+        if len(data) > self._remaining:
+            raise ValueError(f"File is larger than the {self.max_bytes} byte upload limit")
+        
+        self._remaining -= len(data)
+        buffer[:len(data)] = data
+        return len(data)
+
 
 class ContentService:
     """Service for managing the content repository."""
     
     @staticmethod
-    def add_content(post_text: str, category: Optional[str] = None) -> int:
+    def add_content(post_text: str, category: Optional[str] = None) -> Optional[int]:
         """
-        Add content to the repository.
+        Add content to the repository unless the same text is already there.
         
         Args:
             post_text: The content to add
             category: Optional category for grouping content
             
         Returns:
-            ID of the new content
+            ID of the new content, or None if it duplicates existing content
         """
         return scheduler.add_content(post_text, category)
     
@@ -50,6 +82,98 @@ class ContentService:
         
         return formatted_content
     
+    @staticmethod
+    def search_content(query: str, category: Optional[str] = None, is_used: Optional[bool] = None,
+                       limit: int = 50, offset: int = 0, prefix: bool = True,
+                       max_ranked: Optional[int] = MAX_RANKED_MATCHES) -> List[Dict[str, Any]]:
+        """
+        Search the repository with the content_repository_fts full-text index.
+        
+        Every word of the query must appear in the post text or category; see
+        search.match_query. Results are ranked by BM25, best match first. BM25
+        has to score every candidate, so when more than max_ranked rows match
+        the query and filters, only the newest max_ranked of them are ranked
+        and older matches are left out. The filters are applied before that
+        cut, and it is raised to offset + limit so later pages are not empty.
+        With no words in the query, returns the newest content matching the
+        filters, or nothing if no filter is given either.
+        
+        Args:
+            query: Search text
+            category: Only return content with exactly this category
+            is_used: Only return used (True) or unused (False) content
+            limit: Maximum number of results
+            offset: Number of results to skip, for paging
+            prefix: Match the last word of the query as a prefix
+            max_ranked: Most matches to rank (see above); None ranks them all
+            
+        Returns:
+            List of content dictionaries like get_all_content, with a 'rank' key
+            (lower is better, None without a query)
+        """
+        expression = match_query(query, prefix=prefix)
+        conditions = []
+        params = []
+        
+        if category is not None:
+            conditions.append("c.category = ?")
+            params.append(category)
+        if is_used is not None:
+            conditions.append("c.is_used = ?")
+            params.append(int(is_used))
+        
+        if expression is not None:
+            # Narrow by category inside the index too, so only rows in the
+            # category are read; the join then checks every filter exactly
+            category_filter = category_term(category)
+            if category_filter:
+                expression = f"({expression}) AND {category_filter}"
+            
+            join = "JOIN content_repository c ON c.id = content_repository_fts.rowid" if conditions else ""
+            where = ''.join(f" AND {condition}" for condition in conditions)
+            ranked = -1 if max_ranked is None else max(max_ranked, offset + limit)
+            
+            rows = db.execute(
+                f"""
+                SELECT c.*, matches.rank AS rank
+                FROM (
+                    SELECT content_repository_fts.rowid AS rowid, content_repository_fts.rank AS rank
+                    FROM content_repository_fts {join}
+                    WHERE content_repository_fts MATCH ?{where}
+                    ORDER BY content_repository_fts.rowid DESC
+                    LIMIT ?
+                ) AS matches
+                JOIN content_repository c ON c.id = matches.rowid
+                ORDER BY matches.rank
+                LIMIT ? OFFSET ?
+                """,
+                (expression, *params, ranked, limit, offset)
+            ).fetchall()
+        elif conditions:
+            rows = db.execute(
+                f"""
+                SELECT c.*, NULL AS rank FROM content_repository c
+                WHERE {' AND '.join(conditions)}
+                ORDER BY c.id DESC
+                LIMIT ? OFFSET ?
+                """,
+                (*params, limit, offset)
+            ).fetchall()
+        else:
+            return []
+        
+        return [
+            {
+                'id': row['id'],
+                'text': row['post_text'],
+                'category': row['category'] or "None",
+                'is_used': bool(row['is_used']),
+                'created_at': row['created_at'],
+                'rank': row['rank']
+            }
+            for row in rows
+        ]
+    
     @staticmethod
     def get_content(content_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -96,31 +220,119 @@ class ContentService:
         return True
     
     @staticmethod
-    def import_from_csv(file_path: str) -> int:
+    def _csv_rows(text_stream: TextIO, require_header: bool = False) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Yield (post_text, category) for each data row, skipping the header row.
+        
+        With require_header, a missing or unexpected header raises ValueError
+        when the generator is first advanced, before any row is yielded.
+        """
+        csv_reader = csv.reader(text_stream)
+        header = next(csv_reader, None)  # Skip header row if it exists
+        
+        if require_header:
+            if header is None:
+                raise ValueError("CSV file is empty")
+            
+            columns = [column.strip().lower() for column in header[:len(CSV_HEADER)]]
+            if not columns or columns != CSV_HEADER[:len(columns)]:
+                raise ValueError(
+                    f"Unexpected CSV header {','.join(header)!r}; expected PostContent,Category"
+                )
+        
+        for row in csv_reader:
+            if len(row) >= 1:
+                yield row[0], (row[1] if len(row) >= 2 else None)
+    
+    @staticmethod
+    def import_csv_stream(text_stream: TextIO, chunk_size: int = 5000,
+                          require_header: bool = False) -> Dict[str, Any]:
+        """
+        Import content from an open CSV text stream.
+        
+        Rows are read and inserted chunk_size at a time, each chunk in its own
+        transaction, so memory stays flat however large the file is and the
+        write lock is released between chunks. Rows whose normalized text is
+        already in the repository (or earlier in the file) are skipped through
+        the unique content_hash index.
+        
+        Each chunk is staged in a temp table and copied over with a single
+        INSERT ... SELECT. Full-text indexing of the imported rows is deferred
+        and done in bulk at the end, which keeps the import close to its speed
+        without the index; imported rows become searchable once the import
+        finishes, while rows written by other connections meanwhile are
+        searchable right away.
+        
+        Args:
+            text_stream: CSV text stream (open files with newline='')
+            chunk_size: Rows inserted per transaction
+            require_header: Reject the stream unless it starts with a
+                PostContent[,Category] header row
+                
+        Returns:
+            Dictionary with imported, duplicates, seconds and rows_per_second
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        
+        rows = ContentService._csv_rows(text_stream, require_header=require_header)
+        imported = 0
+        duplicates = 0
+        started = time.perf_counter()
+        
+        db.execute("CREATE TEMP TABLE IF NOT EXISTS content_import (post_text TEXT, category TEXT, content_hash TEXT)")
+        
+        with db.deferred_full_text_index('content_repository_fts'):
+            while True:
+                chunk = [(post_text, category, content_hash(post_text))
+                         for post_text, category in islice(rows, chunk_size)]
+                if not chunk:
+                    break
+                
+                with db.transaction():
+                    db.execute("DELETE FROM temp.content_import")
+                    db.execute_many(
+                        "INSERT INTO temp.content_import (post_text, category, content_hash) VALUES (?, ?, ?)",
+                        chunk
+                    )
+                    # WHERE true keeps ON CONFLICT from parsing as a join constraint
+                    cursor = db.execute(
+                        "INSERT INTO content_repository (post_text, category, content_hash) "
+                        "SELECT post_text, category, content_hash FROM temp.content_import WHERE true ORDER BY rowid "
+                        "ON CONFLICT(content_hash) DO NOTHING"
+                    )
+                    db.execute("DELETE FROM temp.content_import")
+                imported += cursor.rowcount
+                duplicates += len(chunk) - cursor.rowcount
+        
+        seconds = time.perf_counter() - started
+        
+        return {
+            'imported': imported,
+            'duplicates': duplicates,
+            'seconds': seconds,
+            'rows_per_second': imported / seconds if seconds > 0 else 0.0
+        }
+    
+    @staticmethod
+    def import_from_csv(file_path: str, chunk_size: int = 5000) -> Dict[str, Any]:
         """
         Import content from a CSV file.
         
         Args:
             file_path: Path to the CSV file
+            chunk_size: Rows inserted per transaction
             
         Returns:
-            Number of imported items
+            Import report, see import_csv_stream
         """
-        count = 0
+        with open(file_path, 'r', encoding='utf-8', newline='') as file:
+            report = ContentService.import_csv_stream(file, chunk_size=chunk_size)
         
-        with open(file_path, 'r', encoding='utf-8') as file:
-            csv_reader = csv.reader(file)
-            header = next(csv_reader, None)  # Skip header row if it exists
-            
-            for row in csv_reader:
-                if len(row) >= 1:
-                    post_text = row[0]
-                    category = row[1] if len(row) >= 2 else None
-                    
-                    ContentService.add_content(post_text, category)
-                    count += 1
-        
-        return count
+        print(f"Imported {report['imported']} items from {file_path} in {report['seconds']:.2f}s "
+              f"({report['rows_per_second']:.0f} rows/s), skipped {report['duplicates']} duplicates")
+        
+        return report
     
     @staticmethod
     def export_to_csv(file_path: str) -> int:
@@ -153,29 +365,59 @@ class ContentService:
         return len(content)
     
     @staticmethod
-    def import_from_uploaded_file(file_data: bytes) -> int:
+    def import_from_uploaded_file(file_data: Union[BinaryIO, bytes], max_bytes: int = MAX_UPLOAD_BYTES,
+                                  chunk_size: int = 5000) -> Dict[str, Any]:
         """
-        Import content from uploaded file data.
+        Import content from an uploaded CSV file.
+        
+        The upload is decoded and parsed as it is read, without buffering it
+        whole or copying it to a temporary file. Uploads without a
+        PostContent[,Category] header are rejected before anything is imported.
         
         Args:
-            file_data: Raw file data
+            file_data: Binary stream positioned at the start of the upload
+                (e.g. the file field read from the request body), or the raw bytes
+            max_bytes: Largest upload accepted, in bytes
+            chunk_size: Rows inserted per transaction
             
         Returns:
-            Number of imported items
+            Import report, see import_csv_stream
+            
+        Raises:
+            ValueError: If the upload is too large, has a bad header or is not UTF-8.
+                An upload that turns out to be too large only part way through keeps
+                the rows imported before the limit was reached.
         """
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as temp_file:
-            temp_path = temp_file.name
-            temp_file.write(file_data)
+        if isinstance(file_data, (bytes, bytearray)):
+            file_data = io.BytesIO(file_data)
+        
+        # Reject oversized uploads up front when the stream knows its size
+        if file_data.seekable():
+            start = file_data.tell()
+            size = file_data.seek(0, io.SEEK_END) - start
+            file_data.seek(start)
+            
+            if size > max_bytes:
+                raise ValueError(f"File is larger than the {max_bytes} byte upload limit")
+        
+        text_stream = io.TextIOWrapper(
+            io.BufferedReader(_LimitedReader(file_data, max_bytes)),
+            encoding='utf-8-sig',
+            newline=''
+        )
         
         try:
-            # Import from the temporary file
-            count = ContentService.import_from_csv(temp_path)
-            return count
+            report = ContentService.import_csv_stream(text_stream, chunk_size=chunk_size, require_header=True)
+        except UnicodeDecodeError:
+            raise ValueError("CSV file is not valid UTF-8")
         finally:
-            # Clean up the temporary file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            # Leave the caller's stream open; closing the wrapper only closes the limiter
+            text_stream.close()
+        
+        print(f"Imported {report['imported']} uploaded items in {report['seconds']:.2f}s "
+              f"({report['rows_per_second']:.0f} rows/s), skipped {report['duplicates']} duplicates")
+        
+        return report
     
     @staticmethod
     def get_categories() -> List[str]:
@@ -7,6 +7,7 @@ from typing import List, Dict, Any, Optional, Tuple
 
 from ..core.database import db
 from ..core.scheduler import scheduler
+from ..core.search import MAX_RANKED_MATCHES, column_phrase, match_query
 
 class PostService:
     """Service for managing posts."""
@@ -59,7 +60,110 @@ class PostService:
                 'status': post['status'],
                 'created_at': post['created_at'],
                 'needs_review': bool(post.get('needs_review', 0)),
-                'reviewed': bool(post.get('reviewed', 0))
+                'reviewed': bool(post.get('reviewed', 0)),
+                'attempt_count': post.get('attempt_count', 0),
+                'last_error': post.get('last_error')
+            })
+        
+        return formatted_posts
+    
+    @staticmethod
+    def search_posts(query: str, status: Optional[str] = None, limit: int = 50,
+                     offset: int = 0, prefix: bool = True,
+                     max_ranked: Optional[int] = MAX_RANKED_MATCHES) -> List[Dict[str, Any]]:
+        """
+        Search scheduled posts with the scheduled_posts_fts full-text index.
+        
+        Every word of the query must appear in the post text; see
+        search.match_query. Results are ranked by BM25, best match first. When
+        more than max_ranked posts match the query and status, only the newest
+        max_ranked of them are ranked; the cut is raised to offset + limit so
+        later pages are not empty. With no words in the query, returns the
+        newest posts with the status, or nothing if no status is given either.
+        
+        Args:
+            query: Search text
+            status: Only return posts with this status (e.g. 'pending', 'published')
+            limit: Maximum number of results
+            offset: Number of results to skip, for paging
+            prefix: Match the last word of the query as a prefix
+            max_ranked: Most matches to rank (see above); None ranks them all
+            
+        Returns:
+            List of post dictionaries like get_all_posts, with a 'rank' key
+            (lower is better, None without a query)
+        """
+        expression = match_query(query, prefix=prefix)
+        status_filter = column_phrase('status', status) if status is not None else None
+        
+        if expression is None:
+            if status_filter is None:
+                return []
+            
+            # No words: list the newest posts with the status, found through the index
+            posts = db.execute(
+                """
+                SELECT p.*, NULL AS rank
+                FROM scheduled_posts_fts
+                JOIN scheduled_posts p ON p.id = scheduled_posts_fts.rowid
+                WHERE scheduled_posts_fts MATCH ? AND p.status = ?
+                ORDER BY scheduled_posts_fts.rowid DESC
+                LIMIT ? OFFSET ?
+                """,
+                (status_filter, status, limit, offset)
+            ).fetchall()
+        else:
+            # Search the text only; status narrows the match inside the index and
+            # is then compared exactly, both before the ranked set is cut
+            expression = f"post_text : ({expression})"
+            join = ""
+            where = ""
+            params = []
+            
+            if status is not None:
+                if status_filter:
+                    expression = f"{expression} AND {status_filter}"
+                join = "JOIN scheduled_posts p ON p.id = scheduled_posts_fts.rowid"
+                where = " AND p.status = ?"
+                params.append(status)
+            
+            ranked = -1 if max_ranked is None else max(max_ranked, offset + limit)
+            
+            posts = db.execute(
+                f"""
+                SELECT p.*, matches.rank AS rank
+                FROM (
+                    SELECT scheduled_posts_fts.rowid AS rowid, scheduled_posts_fts.rank AS rank
+                    FROM scheduled_posts_fts {join}
+                    WHERE scheduled_posts_fts MATCH ?{where}
+                    ORDER BY scheduled_posts_fts.rowid DESC
+                    LIMIT ?
+                ) AS matches
+                JOIN scheduled_posts p ON p.id = matches.rowid
+                ORDER BY matches.rank
+                LIMIT ? OFFSET ?
+                """,
+                (expression, *params, ranked, limit, offset)
+            ).fetchall()
+        
+        formatted_posts = []
+        for post in posts:
+            try:
+                formatted_time = datetime.fromisoformat(post['schedule_time']).strftime('%Y-%m-%d %H:%M:%S')
+            except ValueError:
+                formatted_time = post['schedule_time']
+            
+            formatted_posts.append({
+                'id': post['id'],
+                'text': post['post_text'],
+                'scheduled_time': formatted_time,
+                'status': post['status'],
+                'created_at': post['created_at'],
+                'needs_review': bool(post['needs_review']),
+                'reviewed': bool(post['reviewed']),
+                'attempt_count': post['attempt_count'],
+                'last_error': post['last_error'],
+                'rank': post['rank']
             })
         
         return formatted_posts
@@ -101,7 +205,9 @@ class PostService:
             'status': post['status'],
             'created_at': post['created_at'],
             'needs_review': bool(post.get('needs_review', 0)),
-            'reviewed': bool(post.get('reviewed', 0))
+            'reviewed': bool(post.get('reviewed', 0)),
+            'attempt_count': post.get('attempt_count', 0),
+            'last_error': post.get('last_error')
         }
     
     @staticmethod
@@ -126,6 +232,10 @@ class PostService:
             where_params=(post_id,)
         )
         
+        # Editing marks the post as reviewed, which can make it publishable
+        if rowcount > 0:
+            scheduler.refresh_schedule()
+        
         return rowcount > 0
     
     @staticmethod
@@ -142,6 +252,16 @@ class PostService:
         scheduler.delete_post(post_id)
         return True
     
+    @staticmethod
+    def get_live_workers() -> List[Dict[str, Any]]:
+        """
+        Get the scheduler workers that are currently publishing posts.
+        
+        Returns:
+            List of worker dictionaries (worker_id, hostname, pid, concurrency, in_flight, ...)
+        """
+        return [dict(worker) for worker in scheduler.get_live_workers()]
+    
     @staticmethod
     def approve_post(post_id: int) -> bool:
         """
@@ -153,12 +273,7 @@ class PostService:
         Returns:
             Boolean indicating success
         """
-        rowcount = db.update(
-            table='scheduled_posts',
-            data={'reviewed': 1},
-            where='id = ?',
-            where_params=(post_id,)
-        )
+        rowcount = scheduler.approve_post(post_id)
         
         return rowcount > 0
     
@@ -4,15 +4,16 @@ Flask web application for LinkedIn Bot.
 
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
 from flask_bootstrap import Bootstrap
-import threading
-import time
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import Data, Epilogue, File, MultipartDecoder, NeedData
+import io
 import os
 import traceback
 import sys
 from datetime import datetime 
 
 from ..services.post_service import PostService
-from ..services.content_service import ContentService
+from ..services.content_service import ContentService, MAX_UPLOAD_BYTES
 from ..services.campaign_service import CampaignService
 from ..services.auth_service import AuthService
 from ..core.scheduler import scheduler
@@ -21,6 +22,19 @@ app = Flask(__name__)
 app.secret_key = 'linkedin_bot_secret_key'  # Required for flash messages
 Bootstrap(app)
 
+# Largest CSV file accepted by /import_csv, in bytes
+app.config['MAX_CSV_UPLOAD_BYTES'] = int(os.environ.get('LINKEDIN_BOT_MAX_CSV_UPLOAD_BYTES', MAX_UPLOAD_BYTES))
+
+# Largest request body accepted: the CSV limit plus room for the multipart headers
+app.config['MAX_CONTENT_LENGTH'] = app.config['MAX_CSV_UPLOAD_BYTES'] + 64 * 1024
+
+# Most results shown for a repository or scheduled posts search
+app.config['SEARCH_RESULT_LIMIT'] = int(os.environ.get('LINKEDIN_BOT_SEARCH_RESULT_LIMIT', 200))
+
+# Post statuses offered by the scheduled posts search, with their labels
+POST_STATUSES = [('pending', 'Pending'), ('publishing', 'Publishing'), ('retrying', 'Retrying'),
+                 ('published', 'Published'), ('dead', 'Failed')]
+
 # Global progress tracking variables
 generation_progress = {
     'status': 'idle',
@@ -42,21 +56,84 @@ def log_error(message, exception=None):
     with open("error_log.txt", "a") as f:
         f.write(f"[{datetime.now()}] {error_log}\n\n")
 
-# Background thread for checking posts
-def background_scheduler():
-    while True:
-        scheduler.check_and_publish()
-        time.sleep(60)  # Check every minute
+class _MultipartFileReader(io.RawIOBase):
+    """
+    Reads one file field of a multipart/form-data request body as it arrives.
+    
+    The body is decoded with Werkzeug's incremental multipart decoder, so the
+    file is never spooled to a temporary file or held in memory whole.
+    Parts before the file field are skipped; parts after it are never read.
+    """
+    
+    # Bytes read from the request body at a time
+    READ_SIZE = 64 * 1024
+    
+    def __init__(self, stream, boundary: bytes, field_name: str):
+        """
+        Read the body up to the start of the file field.
+        
+        Args:
+            stream: Request body stream (request.stream, not request.files)
+            boundary: Multipart boundary from the Content-Type header
+            field_name: Name of the file field to read
+        """
+        self._stream = stream
+        self._decoder = MultipartDecoder(boundary)
+        self._pending = b''
+        self._done = False
+        
+        # None if the form has no such file field
+        self.filename = None
+        while not self._done:
+            event = self._next_event()
+            if isinstance(event, Epilogue):
+                self._done = True
+            elif isinstance(event, File) and event.name == field_name:
+                self.filename = event.filename
+                break
+    
+    def _next_event(self):
+        while True:
+            event = self._decoder.next_event()
+            if not isinstance(event, NeedData):
+                return event
+            # An empty read tells the decoder the body has ended
+            self._decoder.receive_data(self._stream.read(self.READ_SIZE) or None)
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        while not self._pending and not self._done:
+            event = self._next_event()
+            if isinstance(event, Data):
+                self._pending = event.data
+                self._done = not event.more_data
+            else:
+                self._done = True
+        
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
 
-# Start the background thread
-scheduler_thread = threading.Thread(target=background_scheduler, daemon=True)
-scheduler_thread.start()
+# Publishing runs in the standalone worker (python -m linkedin_bot.worker.app).
+# Set LINKEDIN_BOT_EMBEDDED_SCHEDULER=1 to publish from this process instead.
+if os.environ.get('LINKEDIN_BOT_EMBEDDED_SCHEDULER') == '1':
+    scheduler.start_scheduler()
 
 @app.route('/')
 def index():
-    # Get all posts from the service
-    posts = PostService.get_all_posts()
-    return render_template('index.html', posts=posts)
+    """Show scheduled posts, or search them with ?q=...&status=..."""
+    query = request.args.get('q', '').strip()
+    status = request.args.get('status') or None
+    if query or status:
+        posts = PostService.search_posts(query, status=status, limit=app.config['SEARCH_RESULT_LIMIT'])
+    else:
+        posts = PostService.get_all_posts()
+    workers = PostService.get_live_workers()
+    return render_template('index.html', posts=posts, workers=workers, query=query, status=status,
+                           statuses=POST_STATUSES)
 
 @app.route('/add', methods=['GET', 'POST'])
 def add_post():
@@ -211,10 +288,19 @@ def delete_post(post_id):
 # Content Repository Routes
 @app.route('/repository')
 def content_repository():
-    """Show content repository"""
+    """Show content repository, or search it with ?q=...&category=...&status=used|available"""
+    query = request.args.get('q', '').strip()
+    category = request.args.get('category') or None
+    status = request.args.get('status') or None
+    is_used = {'used': True, 'available': False}.get(status)
     try:
-        content = ContentService.get_all_content()
-        return render_template('repository.html', content=content)
+        if query or category or is_used is not None:
+            content = ContentService.search_content(query, category=category, is_used=is_used,
+                                                    limit=app.config['SEARCH_RESULT_LIMIT'])
+        else:
+            content = ContentService.get_all_content()
+        return render_template('repository.html', content=content, categories=ContentService.get_categories(),
+                               query=query, category=category, status=status)
     except Exception as e:
         log_error("Error retrieving content repository", e)
         flash("Could not retrieve content repository. See error log for details.", "warning")
@@ -232,7 +318,10 @@ def add_content():
             
         try:
             content_id = ContentService.add_content(post_text, category)
-            flash(f'Content added to repository with ID: {content_id}', 'success')
+            if content_id is None:
+                flash('This content is already in the repository', 'warning')
+            else:
+                flash(f'Content added to repository with ID: {content_id}', 'success')
             return redirect(url_for('content_repository'))
         except Exception as e:
             log_error("Error adding content to repository", e)
@@ -251,24 +340,34 @@ def add_content():
 def import_csv():
     """Import content from CSV file"""
     if request.method == 'POST':
-        if 'csv_file' not in request.files:
-            flash('No file part', 'danger')
+        # Check the declared size before any of the body is read
+        max_bytes = app.config['MAX_CSV_UPLOAD_BYTES']
+        if request.content_length is not None and request.content_length > app.config['MAX_CONTENT_LENGTH']:
+            flash(f'File is larger than the {max_bytes} byte upload limit', 'danger')
             return redirect(request.url)
         
-        file = request.files['csv_file']
-        if file.filename == '':
-            flash('No selected file', 'danger')
+        # Read the file straight from the body; request.files would spool it first
+        content_type, options = parse_options_header(request.headers.get('Content-Type', ''))
+        if content_type != 'multipart/form-data' or 'boundary' not in options:
+            flash('No file part', 'danger')
             return redirect(request.url)
         
-        if file:
-            try:
-                file_data = file.read()
-                count = ContentService.import_from_uploaded_file(file_data)
-                flash(f'Successfully imported {count} posts from CSV', 'success')
-                return redirect(url_for('content_repository'))
-            except Exception as e:
-                log_error("Error importing CSV", e)
-                flash(f'Error importing CSV: {str(e)}', 'danger')
+        try:
+            file = _MultipartFileReader(request.stream, options['boundary'].encode('latin-1'), 'csv_file')
+            if file.filename is None:
+                flash('No file part', 'danger')
+                return redirect(request.url)
+            if file.filename == '':
+                flash('No selected file', 'danger')
+                return redirect(request.url)
+            
+            report = ContentService.import_from_uploaded_file(file, max_bytes=max_bytes)
+            flash(f"Successfully imported {report['imported']} posts from CSV "
+                  f"({report['duplicates']} duplicates skipped)", 'success')
+            return redirect(url_for('content_repository'))
+        except Exception as e:
+            log_error("Error importing CSV", e)
+            flash(f'Error importing CSV: {str(e)}', 'danger')
     
     return render_template('import_csv.html')
 
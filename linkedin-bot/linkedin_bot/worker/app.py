@@ -0,0 +1,79 @@
+"""
+Standalone scheduler worker for the LinkedIn Bot.
+
+Publishes due posts in its own process, so the web and desktop apps only
+need to add posts to the schedule. Several workers can share one database
+(on one or more hosts); post leases keep them from publishing a post twice.
+
+Usage (from the linkedin-bot directory):
+    python -m linkedin_bot.worker.app [--concurrency 4] [--drain-timeout 60]
+"""
+
+import argparse
+import signal
+import sys
+import threading
+
+from ..core.near_duplicates import near_duplicate_index
+from ..core.scheduler import scheduler
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='LinkedIn Bot scheduler worker')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='Maximum number of posts published at once (default: 4)')
+    parser.add_argument('--lease-duration', type=float, default=300,
+                        help='Seconds a claimed post stays reserved for this worker (default: 300)')
+    parser.add_argument('--poll-interval', type=float, default=2,
+                        help='Seconds between checks for posts added by other processes (default: 2)')
+    parser.add_argument('--heartbeat-interval', type=float, default=30,
+                        help='Seconds between heartbeat updates (default: 30)')
+    parser.add_argument('--resync-interval', type=int, default=900,
+                        help='Seconds between full reloads of the schedule (default: 900)')
+    parser.add_argument('--drain-timeout', type=float, default=None,
+                        help='Seconds to wait for in-flight publishes on shutdown (default: no limit)')
+    return parser.parse_args()
+
+def build_near_duplicate_index():
+    """Sign every repository row the near-duplicate index is missing."""
+    try:
+        signed = near_duplicate_index.sync()
+        print(f"Near-duplicate index is up to date ({signed} rows signed)")
+    except Exception as e:
+        print(f"Error building near-duplicate index: {str(e)}")
+
+def main():
+    """Main entry point for the scheduler worker."""
+    args = parse_arguments()
+    
+    scheduler.set_publish_concurrency(args.concurrency)
+    scheduler.lease_duration = args.lease_duration
+    
+    stop_requested = threading.Event()
+    
+    def request_stop(signum, frame):
+        print(f"Received signal {signum}, draining in-flight publishes...")
+        stop_requested.set()
+    
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    
+    # Keep the initial signing of a large repository off the request path
+    threading.Thread(target=build_near_duplicate_index, daemon=True).start()
+    
+    scheduler.start_scheduler(
+        resync_interval=args.resync_interval,
+        heartbeat_interval=args.heartbeat_interval,
+        change_poll_interval=args.poll_interval
+    )
+    
+    # Wait in short slices so signals are handled promptly on every platform
+    while not stop_requested.wait(1):
+        pass
+    
+    scheduler.stop_scheduler(drain_timeout=args.drain_timeout)
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,13 @@
+"""
+Shared pytest setup.
+
+The package opens its SQLite database under the home directory as soon as it
+is imported, so point HOME at a scratch directory before any test imports it.
+"""
+
+import os
+import sys
+import tempfile
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="linkedin_bot_tests_")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,133 @@
+"""
+Tests for provider failover, hedged requests and provider ranking.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from linkedin_bot.core.ai_failover import FailoverProvider, ProviderStats
+from linkedin_bot.core.ai_providers import AIProvider
+
+
+class ScriptedProvider(AIProvider):
+    """Provider that answers (or fails) after a fixed delay."""
+    
+    def __init__(self, name: str, delay: float = 0.0, fail: bool = False):
+        super().__init__(api_key="test-key")
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = False
+    
+    def provider_name(self) -> str:
+        return self.name
+    
+    def _generate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise Exception(f"{self.name} is down")
+        return f"{self.name} answer"
+    
+    async def _agenerate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.fail:
+            raise Exception(f"{self.name} is down")
+        return f"{self.name} answer"
+
+
+def _generate(provider: FailoverProvider, mode: str) -> str:
+    if mode == 'async':
+        return asyncio.run(provider._agenerate_content("prompt"))
+    return provider._generate_content("prompt")
+
+
+def _measured(stats: ProviderStats, name: str, latency: float, count: int = 20, ok: bool = True) -> None:
+    for _ in range(count):
+        stats.record(name, latency, ok)
+
+
+@pytest.mark.parametrize('mode', ['sync', 'async'])
+def test_error_fails_over_to_next_provider(mode):
+    stats = ProviderStats()
+    primary = ScriptedProvider(f"{mode}-down", fail=True)
+    secondary = ScriptedProvider(f"{mode}-up")
+    
+    assert _generate(FailoverProvider([primary, secondary], stats=stats), mode) == f"{mode}-up answer"
+    assert stats.error_rate(primary.name) == 1.0
+    assert stats.error_rate(secondary.name) == 0.0
+
+
+@pytest.mark.parametrize('mode', ['sync', 'async'])
+def test_timeout_fails_over_to_next_provider(mode):
+    stats = ProviderStats()
+    slow = ScriptedProvider(f"{mode}-slow", delay=1.0)
+    fast = ScriptedProvider(f"{mode}-fast")
+    provider = FailoverProvider([slow, fast], timeout=0.1, stats=stats)
+    
+    start = time.monotonic()
+    assert _generate(provider, mode) == f"{mode}-fast answer"
+    assert time.monotonic() - start < 0.8
+    assert stats.error_rate(slow.name) == 1.0
+    if mode == 'async':
+        assert slow.cancelled
+
+
+@pytest.mark.parametrize('mode', ['sync', 'async'])
+def test_all_providers_failing_raises(mode):
+    provider = FailoverProvider([ScriptedProvider(f"{mode}-a", fail=True), ScriptedProvider(f"{mode}-b", fail=True)],
+                                stats=ProviderStats())
+    
+    with pytest.raises(Exception, match=f"All providers failed: {mode}-a: .*; {mode}-b: "):
+        _generate(provider, mode)
+
+
+@pytest.mark.parametrize('mode', ['sync', 'async'])
+def test_slow_request_is_hedged_past_the_latency_percentile(mode):
+    stats = ProviderStats()
+    primary = ScriptedProvider(f"{mode}-lagging", delay=0.5)
+    secondary = ScriptedProvider(f"{mode}-hedge")
+    _measured(stats, primary.name, 0.02)
+    _measured(stats, secondary.name, 0.05)
+    provider = FailoverProvider([primary, secondary], hedge_percentile=95, stats=stats)
+    
+    start = time.monotonic()
+    assert _generate(provider, mode) == f"{mode}-hedge answer"
+    assert time.monotonic() - start < 0.4
+    assert secondary.calls == 1
+    if mode == 'async':
+        assert primary.cancelled
+
+
+def test_no_hedge_without_enough_samples():
+    stats = ProviderStats()
+    primary = ScriptedProvider("unmeasured", delay=0.1)
+    secondary = ScriptedProvider("unmeasured-hedge")
+    provider = FailoverProvider([primary, secondary], hedge_percentile=95, stats=stats)
+    
+    assert _generate(provider, 'async') == "unmeasured answer"
+    assert secondary.calls == 0
+
+
+def test_ranking_moves_failing_providers_last_and_sorts_by_latency():
+    stats = ProviderStats()
+    failing = ScriptedProvider("failing")
+    slow = ScriptedProvider("slow")
+    fast = ScriptedProvider("fast")
+    provider = FailoverProvider([failing, slow, fast], stats=stats)
+    
+    # Configured order until every healthy provider has been measured
+    _measured(stats, failing.name, 0.1, ok=False)
+    _measured(stats, slow.name, 2.0)
+    assert provider.ranked_providers() == [slow, fast, failing]
+    
+    _measured(stats, fast.name, 0.5)
+    assert provider.ranked_providers() == [fast, slow, failing]
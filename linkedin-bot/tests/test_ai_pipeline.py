@@ -0,0 +1,105 @@
+"""
+Tests for the asyncio generation pipeline.
+"""
+
+import asyncio
+
+from linkedin_bot.core.ai_failover import FailoverProvider, ProviderStats
+from linkedin_bot.core.ai_pipeline import GenerationPipeline
+from linkedin_bot.core.ai_providers import AIProvider, set_provider_concurrency
+
+
+class CountingProvider(AIProvider):
+    """Provider that records how many requests it serves at once."""
+    
+    name = "counting"
+    
+    def __init__(self):
+        super().__init__(api_key="test-key")
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    @classmethod
+    def provider_name(cls) -> str:
+        return cls.name
+    
+    def _generate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
+        raise NotImplementedError
+    
+    async def _agenerate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return f"post for {prompt}"
+        finally:
+            self.in_flight -= 1
+
+
+class OtherCountingProvider(CountingProvider):
+    name = "counting-other"
+
+
+def test_pipeline_respects_provider_concurrency():
+    provider = CountingProvider()
+    set_provider_concurrency(provider.provider_name(), 2)
+    
+    pipeline = GenerationPipeline(provider, max_concurrency=50, use_cache=False)
+    results = pipeline.run_sync({i: f"topic {i}" for i in range(20)})
+    
+    assert len(results) == 20
+    assert all(result['error'] is None for result in results.values())
+    assert provider.max_in_flight == 2
+
+
+def test_pipeline_applies_new_limit_on_next_run():
+    provider = CountingProvider()
+    set_provider_concurrency(provider.provider_name(), 2)
+    GenerationPipeline(provider, use_cache=False).run_sync({i: f"topic {i}" for i in range(10)})
+    
+    set_provider_concurrency(provider.provider_name(), 5)
+    provider.max_in_flight = 0
+    GenerationPipeline(provider, use_cache=False).run_sync({i: f"topic {i}" for i in range(20)})
+    
+    assert provider.max_in_flight == 5
+
+
+def test_failover_respects_each_provider_concurrency():
+    primary = CountingProvider()
+    set_provider_concurrency(primary.provider_name(), 3)
+    
+    provider = FailoverProvider([primary, OtherCountingProvider()], stats=ProviderStats())
+    results = GenerationPipeline(provider, max_concurrency=50, use_cache=False).run_sync(
+        {i: f"topic {i}" for i in range(20)}
+    )
+    
+    assert all(result['error'] is None for result in results.values())
+    assert primary.max_in_flight == 3
+
+
+class AsyncClientProvider(CountingProvider):
+    """Provider that builds its async client through the shared cache."""
+    
+    name = "async-client"
+    
+    def __init__(self):
+        super().__init__()
+        self.clients_created = 0
+    
+    def _create_async_client(self):
+        self.clients_created += 1
+        return object()
+    
+    async def _agenerate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
+        self._get_async_client()
+        return f"post for {prompt}"
+
+
+def test_run_sync_reuses_async_clients_across_calls():
+    provider = AsyncClientProvider()
+    
+    for _ in range(3):
+        results = GenerationPipeline(provider, use_cache=False).run_sync({1: "topic"})
+        assert results[1]['content'] == "post for topic"
+    
+    assert provider.clients_created == 1
@@ -0,0 +1,97 @@
+"""
+Tests for generating several campaign topics per request.
+"""
+
+import asyncio
+
+from linkedin_bot.core.ai_providers import AIProvider
+from linkedin_bot.core.database import db
+from linkedin_bot.services import campaign_service
+from linkedin_bot.services.campaign_service import CampaignService
+
+
+def test_sections_are_split_by_topic_number():
+    response = (
+        "Here are your posts:\n"
+        "=== POST 1 ===\nFirst post\nwith two lines\n"
+        "  ===  post 2  ===  \n\nSecond post\n\n"
+        "=== POST 3 ===\nThird post"
+    )
+    
+    assert CampaignService._parse_batch_response(response, 3) == {
+        1: "First post\nwith two lines",
+        2: "Second post",
+        3: "Third post"
+    }
+
+
+def test_unusable_sections_are_left_out():
+    response = (
+        "=== POST 1 ===\n\n"
+        "=== POST 2 ===\nOnce\n"
+        "=== POST 2 ===\nTwice\n"
+        "=== POST 4 ===\nOut of range\n"
+        "=== POST 3 ===\nKept\n"
+        "Not a header: === POST 5 === mid-line"
+    )
+    
+    assert CampaignService._parse_batch_response(response, 4) == {
+        3: "Kept\nNot a header: === POST 5 === mid-line",
+        4: "Out of range"
+    }
+    assert CampaignService._parse_batch_response(response, 3) == {
+        3: "Kept\nNot a header: === POST 5 === mid-line"
+    }
+    assert CampaignService._parse_batch_response("No headers at all", 2) == {}
+
+
+class SkippingBatchProvider(AIProvider):
+    """Provider whose batch answers leave out the second topic."""
+    
+    def __init__(self):
+        super().__init__(api_key="test-key")
+        self.prompts = []
+    
+    @classmethod
+    def provider_name(cls) -> str:
+        return "skipping-batch"
+    
+    def _generate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
+        raise NotImplementedError
+    
+    async def _agenerate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
+        self.prompts.append(prompt)
+        if "=== POST <topic number> ===" in prompt:
+            return "=== POST 1 ===\nBatched post about alpha\n=== POST 3 ===\nBatched post about gamma"
+        return "Single post about beta"
+
+
+def test_missing_sections_are_retried_one_topic_at_a_time(monkeypatch):
+    campaign_id = CampaignService.create_campaign("Batching", "Batch testing", 1, 3)
+    topic_ids = [
+        db.insert('campaign_topics', {'campaign_id': campaign_id, 'topic': topic})
+        for topic in ("Alpha topic", "Beta topic", "Gamma topic")
+    ]
+    provider = SkippingBatchProvider()
+    monkeypatch.setattr(campaign_service, 'get_provider', lambda provider_name, api_key: provider)
+    
+    report = asyncio.run(CampaignService.agenerate_content_batched(
+        campaign_id, batch_size=3, near_duplicate_threshold=None
+    ))
+    
+    assert report['generated'] == 3
+    assert report['batches'] == 1
+    assert report['retried'] == 1
+    assert report['round_trips'] == 2
+    assert report['round_trips_saved'] == 1
+    assert len(provider.prompts) == 2 and "Beta topic" in provider.prompts[1]
+    
+    saved = {
+        row['topic_id']: row['post_text']
+        for row in db.select('content_repository', where='campaign_id = ?', where_params=(campaign_id,))
+    }
+    assert saved == {
+        topic_ids[0]: "Batched post about alpha",
+        topic_ids[1]: "Single post about beta",
+        topic_ids[2]: "Batched post about gamma"
+    }
@@ -0,0 +1,70 @@
+"""
+Tests for saving generated campaign content.
+"""
+
+import asyncio
+
+from linkedin_bot.core.ai_cache import response_cache
+from linkedin_bot.core.ai_pipeline import GenerationPipeline
+from linkedin_bot.core.ai_providers import AIProvider
+from linkedin_bot.core.database import db
+from linkedin_bot.core.near_duplicates import near_duplicate_index
+from linkedin_bot.services.campaign_service import CampaignService
+from linkedin_bot.services.content_service import ContentService
+
+
+class FreshProvider(AIProvider):
+    """Provider whose every real call returns new text."""
+    
+    def __init__(self):
+        super().__init__(api_key="test-key")
+        self.calls = 0
+    
+    @classmethod
+    def provider_name(cls) -> str:
+        return "fresh"
+    
+    def _generate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
+        raise NotImplementedError
+    
+    async def _agenerate_content(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> str:
+        self.calls += 1
+        return f"A freshly written post, take {self.calls}"
+
+
+def test_cached_exact_duplicate_is_generated_again_without_cache():
+    campaign_id = CampaignService.create_campaign("Duplicates", "Testing", 1, 1)
+    topic_id = db.insert('campaign_topics', {'campaign_id': campaign_id, 'topic': 'Repeated topic'})
+    ContentService.add_content("A post that is already in the repository", "Testing")
+    
+    provider = FreshProvider()
+    prompt = CampaignService._build_content_prompt(
+        'Repeated topic', 'Testing', CampaignService._default_persona()
+    )
+    response_cache.put(provider.provider_name(), provider.model, provider.system_prompt, prompt, 0.7, 700,
+                       "A post that is already in the repository")
+    
+    generated = asyncio.run(CampaignService.agenerate_content(
+        campaign_id,
+        pipeline=GenerationPipeline(provider, max_tokens=700, temperature=0.7),
+        near_duplicate_threshold=None
+    ))
+    
+    assert generated == 1
+    assert provider.calls == 1
+    assert db.select('campaign_topics', where='id = ?', where_params=(topic_id,))[0]['is_used'] == 1
+
+
+def test_saved_content_is_signed_ahead_of_the_sync_backlog():
+    campaign_id = CampaignService.create_campaign("Backlog", "Testing", 1, 1)
+    topic_id = db.insert('campaign_topics', {'campaign_id': campaign_id, 'topic': 'Backlog topic'})
+    for number in range(2 * near_duplicate_index.lookup_sync_limit + 10):
+        ContentService.add_content(f"Unsigned backlog post number {number}", "Testing")
+    
+    content = "Three things our support team taught me about writing release notes people read"
+    status = CampaignService._store_generated_content(
+        campaign_id, {'id': topic_id, 'topic': 'Backlog topic'}, content, 0.8, regenerate=False
+    )
+    
+    assert status == 'saved'
+    assert near_duplicate_index.find(content) != []
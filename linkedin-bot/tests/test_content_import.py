@@ -0,0 +1,122 @@
+"""
+Tests for streaming CSV imports into the content repository.
+"""
+
+import io
+
+import pytest
+
+from linkedin_bot.core.database import db
+from linkedin_bot.services.content_service import ContentService
+
+
+def _repository():
+    return [(row['post_text'], row['category'])
+            for row in db.execute("SELECT post_text, category FROM content_repository ORDER BY id").fetchall()]
+
+
+@pytest.fixture(autouse=True)
+def empty_repository():
+    db.execute("DELETE FROM content_repository")
+    db.commit()
+
+
+def test_duplicates_are_skipped_across_chunks_and_existing_content():
+    ContentService.add_content("Already in the repository", "Existing")
+    csv_text = (
+        "PostContent,Category\n"
+        "First post,A\n"
+        "already  IN the repository,B\n"
+        "Second post,A\n"
+        "FIRST   post,C\n"
+        "Third post\n"
+    )
+    
+    report = ContentService.import_csv_stream(io.StringIO(csv_text), chunk_size=2)
+    
+    assert report['imported'] == 3
+    assert report['duplicates'] == 2
+    assert _repository() == [
+        ("Already in the repository", "Existing"),
+        ("First post", "A"),
+        ("Second post", "A"),
+        ("Third post", None)
+    ]
+
+
+def test_imported_rows_are_searchable_once_the_import_finishes():
+    csv_text = "PostContent,Category\n" + "".join(f"quokka import {number},Imported\n" for number in range(10))
+    
+    ContentService.import_csv_stream(io.StringIO(csv_text), chunk_size=3)
+    
+    assert db.execute("SELECT COUNT(*) FROM content_repository_fts WHERE content_repository_fts MATCH 'quokka'"
+                      ).fetchone()[0] == 10
+
+
+def test_chunk_size_must_be_positive():
+    with pytest.raises(ValueError):
+        ContentService.import_csv_stream(io.StringIO("PostContent\nPost\n"), chunk_size=0)
+
+
+class _UnsizedStream(io.RawIOBase):
+    """Request-body-like stream whose length is only known once it is read."""
+    
+    def __init__(self, data: bytes):
+        self._data = io.BytesIO(data)
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        data = self._data.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _upload(rows: int) -> bytes:
+    return ("\ufeffPostContent,Category\n" + "".join(f"Uploaded post {number},Upload\n" for number in range(rows))
+            ).encode('utf-8')
+
+
+def test_upload_with_bom_and_header_is_imported():
+    report = ContentService.import_from_uploaded_file(_upload(3))
+    
+    assert report['imported'] == 3
+    assert _repository()[0] == ("Uploaded post 0", "Upload")
+
+
+def test_oversized_upload_is_rejected_before_importing():
+    data = _upload(100)
+    
+    with pytest.raises(ValueError, match="upload limit"):
+        ContentService.import_from_uploaded_file(io.BytesIO(data), max_bytes=len(data) - 1)
+    
+    assert _repository() == []
+
+
+def test_unsized_upload_stops_at_the_limit_keeping_earlier_chunks():
+    data = _upload(5000)
+    
+    with pytest.raises(ValueError, match="upload limit"):
+        ContentService.import_from_uploaded_file(_UnsizedStream(data), max_bytes=len(data) // 2, chunk_size=100)
+    
+    imported = len(_repository())
+    assert 0 < imported < 5000
+    assert imported % 100 == 0
+    
+    # An upload right at the limit is accepted
+    db.execute("DELETE FROM content_repository")
+    db.commit()
+    assert ContentService.import_from_uploaded_file(_UnsizedStream(data), max_bytes=len(data))['imported'] == 5000
+
+
+@pytest.mark.parametrize('data, message', [
+    (b"", "empty"),
+    (b"Text,Tags\nPost,Category\n", "Unexpected CSV header"),
+    (b"PostContent,Category\n\xff\xfe broken,Upload\n", "not valid UTF-8"),
+])
+def test_bad_uploads_are_rejected(data, message):
+    with pytest.raises(ValueError, match=message):
+        ContentService.import_from_uploaded_file(_UnsizedStream(data))
+    
+    assert _repository() == []
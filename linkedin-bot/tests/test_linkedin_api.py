@@ -0,0 +1,88 @@
+"""
+Tests for resolving the author URN in the LinkedIn API client.
+"""
+
+import threading
+
+from linkedin_bot.core.linkedin_api import LinkedInAPI
+
+
+class SlowMeAPI(LinkedInAPI):
+    """Client whose /me lookup blocks until released."""
+    
+    def __init__(self, fail: bool = False):
+        super().__init__()
+        self.set_access_token("test-token")
+        self.fail = fail
+        self.lookups = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+    
+    def get_user_info(self):
+        self.lookups += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.fail:
+            raise Exception("Failed to get user info: 500")
+        return {'id': 'abc123'}
+
+
+def _resolve_in_threads(api, count):
+    results = []
+    
+    def resolve():
+        try:
+            results.append(api.get_user_urn())
+        except Exception as e:
+            results.append(e)
+    
+    threads = [threading.Thread(target=resolve) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_concurrent_callers_share_one_lookup_without_holding_the_lock():
+    api = SlowMeAPI()
+    threads, results = _resolve_in_threads(api, 5)
+    assert api.started.wait(5)
+    
+    # The lock is free while /me is in flight
+    assert api._urn_lock.acquire(timeout=1)
+    api._urn_lock.release()
+    
+    api.release.set()
+    for thread in threads:
+        thread.join(5)
+    
+    assert results == ["urn:li:person:abc123"] * 5
+    assert api.lookups == 1
+    assert api.get_user_urn() == "urn:li:person:abc123"
+
+
+def test_failed_lookup_is_shared_and_retried_on_next_call():
+    api = SlowMeAPI(fail=True)
+    threads, results = _resolve_in_threads(api, 3)
+    assert api.started.wait(5)
+    api.release.set()
+    for thread in threads:
+        thread.join(5)
+    
+    assert len(results) == 3 and all(isinstance(result, Exception) for result in results)
+    assert api.lookups == 1
+    
+    api.fail = False
+    assert api.get_user_urn() == "urn:li:person:abc123"
+    assert api.lookups == 2
+
+
+def test_urn_for_replaced_token_is_not_cached():
+    api = SlowMeAPI()
+    threads, results = _resolve_in_threads(api, 1)
+    assert api.started.wait(5)
+    api.set_access_token("new-token")
+    api.release.set()
+    threads[0].join(5)
+    
+    assert results == ["urn:li:person:abc123"]
+    assert api.user_urn is None
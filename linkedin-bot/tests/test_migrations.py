@@ -0,0 +1,150 @@
+"""
+Tests for upgrading a database created before schema migrations existed.
+"""
+
+import sqlite3
+
+import pytest
+
+from linkedin_bot.core.database import Database
+
+# Schema of the tables as created before MIGRATIONS was introduced
+BASELINE_SCHEMA = '''
+CREATE TABLE scheduled_posts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    post_text TEXT NOT NULL,
+    schedule_time TEXT NOT NULL,
+    status TEXT DEFAULT 'pending',
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    needs_review INTEGER DEFAULT 0,
+    reviewed INTEGER DEFAULT 0
+);
+CREATE TABLE content_repository (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    post_text TEXT NOT NULL,
+    category TEXT,
+    is_used INTEGER DEFAULT 0,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE campaigns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    posts_per_day INTEGER NOT NULL,
+    duration_days INTEGER NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    requires_review INTEGER DEFAULT 0,
+    status TEXT DEFAULT 'active',
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE campaign_topics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign_id INTEGER NOT NULL,
+    topic TEXT NOT NULL,
+    is_used INTEGER DEFAULT 0,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (campaign_id) REFERENCES campaigns (id) ON DELETE CASCADE
+);
+CREATE TABLE settings (
+    key TEXT PRIMARY KEY,
+    value TEXT,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE credentials (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    service TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(service, key)
+);
+'''
+
+
+@pytest.fixture
+def upgraded(tmp_path):
+    """A baseline database with legacy rows, opened (and so migrated) by Database."""
+    path = str(tmp_path / "baseline.db")
+    
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.execute("INSERT INTO campaigns (id, name, category, posts_per_day, duration_days, start_date, end_date) "
+                 "VALUES (1, 'Launch', 'Product', 1, 7, '2024-01-01', '2024-01-08')")
+    conn.execute("INSERT INTO campaign_topics (id, campaign_id, topic) VALUES (1, 1, 'Pricing')")
+    conn.executemany(
+        "INSERT INTO content_repository (id, post_text, category) VALUES (?, ?, ?)",
+        [
+            (1, "Launch pricing explained", "Campaign: 1 - Pricing"),
+            (2, "Post from a deleted campaign", "Campaign: 99 - Gone"),
+            (3, "Same words twice", "Notes"),
+            (4, "Same words twice", "Notes"),
+        ]
+    )
+    conn.executemany(
+        "INSERT INTO scheduled_posts (id, post_text, schedule_time, status) VALUES (?, ?, ?, ?)",
+        [
+            (1, "Launch pricing explained", "2024-01-02T09:00:00", 'pending'),
+            (2, "Broken post [ERROR: 401 Unauthorized]", "2024-01-01T09:00:00", 'failed'),
+        ]
+    )
+    conn.commit()
+    conn.close()
+    
+    return Database(db_path=path)
+
+
+def _row(database, table, row_id):
+    return database.select(table, where='id = ?', where_params=(row_id,))[0]
+
+
+def test_all_migrations_are_applied(upgraded):
+    assert upgraded.execute("PRAGMA user_version").fetchone()[0] == len(Database.MIGRATIONS)
+    
+    post = _row(upgraded, 'scheduled_posts', 1)
+    for column in ('content_id', 'attempt_count', 'next_attempt_at', 'last_error', 'lease_owner', 'lease_expires'):
+        assert column in post.keys()
+
+
+def test_campaign_content_is_linked_by_id(upgraded):
+    content = _row(upgraded, 'content_repository', 1)
+    assert (content['campaign_id'], content['topic_id']) == (1, 1)
+    
+    orphan = _row(upgraded, 'content_repository', 2)
+    assert orphan['campaign_id'] is None
+    
+    assert _row(upgraded, 'scheduled_posts', 1)['content_id'] == 1
+
+
+def test_failed_posts_become_dead_letters(upgraded):
+    post = _row(upgraded, 'scheduled_posts', 2)
+    
+    assert post['status'] == 'dead'
+    assert post['attempt_count'] == 1
+    assert post['post_text'] == "Broken post"
+    assert post['last_error'] == "401 Unauthorized"
+
+
+def test_only_the_oldest_duplicate_keeps_its_hash(upgraded):
+    assert _row(upgraded, 'content_repository', 3)['content_hash'] is not None
+    assert _row(upgraded, 'content_repository', 4)['content_hash'] is None
+
+
+def test_existing_and_new_rows_are_full_text_indexed(upgraded):
+    def matches(query):
+        return [row['rowid'] for row in upgraded.execute(
+            "SELECT rowid FROM content_repository_fts WHERE content_repository_fts MATCH ? ORDER BY rowid",
+            (query,)
+        ).fetchall()]
+    
+    assert matches('pricing') == [1]
+    
+    upgraded.insert('content_repository', {'post_text': "New pricing tiers", 'category': "Notes"})
+    assert len(matches('pricing')) == 2
+
+
+def test_reopening_applies_nothing(upgraded):
+    reopened = Database(db_path=upgraded.db_path)
+    
+    assert reopened.execute("PRAGMA user_version").fetchone()[0] == len(Database.MIGRATIONS)
+    assert reopened.execute("SELECT COUNT(*) FROM content_repository").fetchone()[0] == 4
@@ -0,0 +1,58 @@
+"""
+Tests for the near-duplicate signature index.
+"""
+
+import pytest
+
+from linkedin_bot.core.database import db
+from linkedin_bot.core.near_duplicates import NearDuplicateIndex
+from linkedin_bot.services.content_service import ContentService
+
+ORIGINAL = "Five lessons I learned from shipping a product to our first thousand customers last year"
+EDITED = "Why our team moved every nightly batch job to a streaming pipeline and what it cost us"
+
+
+@pytest.fixture(autouse=True)
+def empty_repository():
+    db.execute("DELETE FROM content_repository")
+    db.commit()
+
+
+def test_edited_content_is_signed_again():
+    index = NearDuplicateIndex()
+    content_id = ContentService.add_content(ORIGINAL, "Testing")
+    index.sync()
+    assert [match[0] for match in index.find(ORIGINAL)] == [content_id]
+    
+    db.update('content_repository', {'post_text': EDITED}, 'id = ?', (content_id,))
+    
+    # The old signature stops matching as soon as the text changes
+    assert index.find(ORIGINAL) == []
+    
+    assert index.sync() == 1
+    assert index.find(ORIGINAL) == []
+    assert [match[0] for match in index.find(EDITED)] == [content_id]
+
+
+def test_lookup_signs_a_bounded_number_of_rows():
+    index = NearDuplicateIndex(lookup_sync_limit=3)
+    for number in range(10):
+        ContentService.add_content(f"{ORIGINAL} number {number}", "Testing")
+    
+    index.find_most_similar(EDITED)
+    
+    assert db.execute("SELECT COUNT(*) FROM content_signatures").fetchone()[0] == 3
+    assert index.sync() == 7
+
+
+def test_signing_a_new_row_leaves_older_rows_to_sync():
+    index = NearDuplicateIndex()
+    older_ids = {ContentService.add_content(f"{ORIGINAL} number {number}", "Testing") for number in range(3)}
+    newest_id = ContentService.add_content(EDITED, "Testing")
+    
+    index.sign(newest_id, EDITED)
+    assert [match[0] for match in index.find(EDITED)] == [newest_id]
+    assert index.find(ORIGINAL, threshold=0.5) == []
+    
+    index.sync()
+    assert {match[0] for match in index.find(ORIGINAL, threshold=0.5)} == older_ids
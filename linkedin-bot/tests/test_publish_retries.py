@@ -0,0 +1,88 @@
+"""
+Tests for retrying failed posts with backoff and dead-lettering them.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from linkedin_bot.core.database import db
+from linkedin_bot.core.scheduler import Scheduler
+
+
+def _post(post_id: int):
+    return db.select('scheduled_posts', where='id = ?', where_params=(post_id,))[0]
+
+
+def _make_due(post_id: int) -> None:
+    past = (datetime.utcnow() - timedelta(seconds=1)).isoformat(timespec='seconds')
+    db.update('scheduled_posts', {'next_attempt_at': past}, 'id = ?', (post_id,))
+
+
+def _claim_and_fail(scheduler: Scheduler, post_id: int, error: str) -> None:
+    assert [post['id'] for post in scheduler.claim_due_posts(10)] == [post_id]
+    scheduler.mark_as_failed(post_id, error)
+
+
+@pytest.fixture(autouse=True)
+def empty_schedule():
+    db.execute("DELETE FROM scheduled_posts")
+    db.commit()
+
+
+def test_retry_delay_doubles_with_jitter_up_to_the_cap():
+    scheduler = Scheduler(retry_base_delay=10, retry_max_delay=100)
+    
+    for _ in range(50):
+        assert 5 <= scheduler._retry_delay(1) <= 10
+        assert 20 <= scheduler._retry_delay(3) <= 40
+        assert 50 <= scheduler._retry_delay(10) <= 100
+
+
+def test_failed_post_backs_off_then_is_dead_lettered():
+    scheduler = Scheduler(max_attempts=3, retry_base_delay=60)
+    post_id = scheduler.add_post("Retry test post", (datetime.utcnow() - timedelta(seconds=60)).isoformat())
+    
+    before = datetime.utcnow()
+    _claim_and_fail(scheduler, post_id, "first failure")
+    
+    post = _post(post_id)
+    assert post['status'] == 'retrying'
+    assert post['attempt_count'] == 1
+    assert post['last_error'] == "first failure"
+    assert post['post_text'] == "Retry test post"
+    assert post['lease_owner'] is None
+    delay = (datetime.fromisoformat(post['next_attempt_at']) - before).total_seconds()
+    assert 29 <= delay <= 61
+    
+    # Not claimable until the backoff has passed
+    assert scheduler.claim_due_posts(10) == []
+    
+    _make_due(post_id)
+    _claim_and_fail(scheduler, post_id, "second failure")
+    assert _post(post_id)['status'] == 'retrying'
+    assert _post(post_id)['attempt_count'] == 2
+    
+    _make_due(post_id)
+    _claim_and_fail(scheduler, post_id, "third failure")
+    post = _post(post_id)
+    assert post['status'] == 'dead'
+    assert post['attempt_count'] == 3
+    assert post['next_attempt_at'] is None
+    assert post['last_error'] == "third failure"
+    assert scheduler.claim_due_posts(10) == []
+
+
+def test_dead_post_can_be_retried_with_fresh_attempts():
+    scheduler = Scheduler(max_attempts=1)
+    post_id = scheduler.add_post("Dead letter test post", (datetime.utcnow() - timedelta(seconds=60)).isoformat())
+    _claim_and_fail(scheduler, post_id, "only failure")
+    assert _post(post_id)['status'] == 'dead'
+    
+    assert scheduler.retry_dead_post(post_id) == 1
+    assert scheduler.retry_dead_post(post_id) == 0
+    
+    post = _post(post_id)
+    assert post['status'] == 'retrying'
+    assert post['attempt_count'] == 0
+    assert [post['id'] for post in scheduler.claim_due_posts(10)] == [post_id]
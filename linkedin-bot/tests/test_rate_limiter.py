@@ -0,0 +1,61 @@
+"""
+Tests for the database-backed publish rate limiter.
+"""
+
+import threading
+
+import pytest
+
+from linkedin_bot.core.database import db
+from linkedin_bot.core.rate_limiter import PublishRateLimiter, RateLimitedError
+
+
+@pytest.fixture(autouse=True)
+def empty_buckets():
+    db.execute("DELETE FROM rate_limit_buckets")
+    db.commit()
+
+
+def test_limiters_share_one_member_budget():
+    # Two instances stand in for two worker processes using the same database
+    first = PublishRateLimiter(member_burst=3)
+    second = PublishRateLimiter(member_burst=3)
+    
+    first.acquire("urn:li:person:1")
+    second.acquire("urn:li:person:1")
+    first.acquire("urn:li:person:1")
+    
+    with pytest.raises(RateLimitedError) as error:
+        second.acquire("urn:li:person:1")
+    
+    assert error.value.reason == "Member post limit reached"
+    second.acquire("urn:li:person:2")
+
+
+def test_concurrent_threads_never_overspend():
+    limiter = PublishRateLimiter(app_burst=5)
+    granted = []
+    
+    def publish(member):
+        try:
+            limiter.acquire(member)
+            granted.append(member)
+        except RateLimitedError:
+            pass
+    
+    threads = [threading.Thread(target=publish, args=(f"urn:li:person:{i}",)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(granted) == 5
+
+
+def test_throttled_blocks_member_for_every_limiter():
+    PublishRateLimiter().throttled("urn:li:person:1", 120)
+    
+    with pytest.raises(RateLimitedError) as error:
+        PublishRateLimiter().acquire("urn:li:person:1")
+    
+    assert error.value.retry_after > 100
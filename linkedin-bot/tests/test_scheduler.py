@@ -0,0 +1,157 @@
+"""
+Tests for publishing leases in the scheduler.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from linkedin_bot.core.database import db
+from linkedin_bot.core.scheduler import Scheduler
+
+
+def _timestamp(seconds_from_now: float) -> str:
+    return (datetime.utcnow() + timedelta(seconds=seconds_from_now)).isoformat(timespec='seconds')
+
+
+def _add_post(status: str, lease_owner=None, lease_expires=None) -> int:
+    return db.insert('scheduled_posts', {
+        'post_text': 'Lease test post',
+        'schedule_time': _timestamp(-60),
+        'status': status,
+        'lease_owner': lease_owner,
+        'lease_expires': lease_expires
+    })
+
+
+def _status(post_id: int) -> str:
+    return db.select('scheduled_posts', where='id = ?', where_params=(post_id,))[0]['status']
+
+
+@pytest.fixture(autouse=True)
+def empty_schedule():
+    db.execute("DELETE FROM scheduled_posts")
+    db.commit()
+
+
+def test_expired_lease_of_crashed_worker_wakes_scheduler():
+    post_id = _add_post('publishing', 'crashed-worker', _timestamp(-1))
+    scheduler = Scheduler()
+    
+    scheduler._load_due_times()
+    assert scheduler._pop_due_posts() == [post_id]
+    
+    assert scheduler.reclaim_expired_leases() == 1
+    assert _status(post_id) == 'retrying'
+
+
+def test_live_lease_is_tracked_until_it_expires():
+    _add_post('publishing', 'other-worker', _timestamp(300))
+    scheduler = Scheduler()
+    
+    scheduler._load_due_times()
+    
+    assert scheduler._pop_due_posts() == []
+    assert 0 < scheduler._seconds_until_next_due() <= 300
+
+
+def test_results_need_this_workers_lease():
+    scheduler = Scheduler()
+    unleased_id = _add_post('pending')
+    other_id = _add_post('publishing', 'other-worker', _timestamp(300))
+    own_id = _add_post('publishing', scheduler.worker_id, _timestamp(300))
+    
+    scheduler.mark_as_published(unleased_id)
+    scheduler.mark_as_failed(other_id, "boom")
+    scheduler.mark_as_published(own_id)
+    
+    assert _status(unleased_id) == 'pending'
+    assert _status(other_id) == 'publishing'
+    assert _status(own_id) == 'published'
+
+
+def test_change_count_ignores_heartbeats():
+    scheduler = Scheduler()
+    before = db.change_count('scheduled_posts')
+    
+    scheduler._write_heartbeat('running')
+    assert db.change_count('scheduled_posts') == before
+    
+    post_id = _add_post('pending')
+    db.update('scheduled_posts', {'schedule_time': _timestamp(60)}, 'id = ?', (post_id,))
+    assert db.change_count('scheduled_posts') == before + 2
+
+
+def test_due_index_is_only_kept_while_the_scheduler_runs():
+    scheduler = Scheduler()
+    
+    post_id = scheduler.add_post("Heap test post", _timestamp(60))
+    scheduler.delete_post(post_id)
+    scheduler.add_post("Heap test post", _timestamp(60))
+    
+    assert scheduler._due_heap == []
+    assert scheduler._due_times == {}
+    
+    scheduler.start_scheduler()
+    try:
+        running_id = scheduler.add_post("Heap test post", _timestamp(60))
+        assert running_id in scheduler._due_times
+    finally:
+        scheduler.stop_scheduler(drain_timeout=5)
+
+
+def test_refresh_schedule_skips_reload_without_a_running_scheduler():
+    _add_post('pending')
+    scheduler = Scheduler()
+    
+    scheduler.refresh_schedule()
+    
+    assert scheduler._due_times == {}
+
+
+def test_claimed_post_is_not_claimed_by_another_worker():
+    post_id = _add_post('pending')
+    first = Scheduler()
+    second = Scheduler()
+    
+    claimed = first.claim_due_posts(10)
+    
+    assert [post['id'] for post in claimed] == [post_id]
+    assert claimed[0]['lease_owner'] == first.worker_id
+    assert second.claim_due_posts(10) == []
+    assert second.reclaim_expired_leases() == 0
+
+
+def test_expired_lease_is_reclaimed_as_a_failed_attempt():
+    crashed = Scheduler(lease_duration=-1)
+    post_id = _add_post('pending')
+    crashed.claim_due_posts(10)
+    
+    survivor = Scheduler()
+    assert survivor.reclaim_expired_leases() == 1
+    
+    post = db.select('scheduled_posts', where='id = ?', where_params=(post_id,))[0]
+    assert post['status'] == 'retrying'
+    assert post['attempt_count'] == 1
+    assert post['lease_owner'] is None
+    assert crashed.worker_id in post['last_error']
+    
+    # Retried right away, by the surviving worker
+    assert [post['id'] for post in survivor.claim_due_posts(10)] == [post_id]
+    
+    # The crashed worker's late result no longer applies
+    crashed.mark_as_published(post_id)
+    assert _status(post_id) == 'publishing'
+
+
+def test_expired_lease_on_last_attempt_is_dead_lettered():
+    scheduler = Scheduler(max_attempts=3)
+    post_id = _add_post('publishing', 'crashed-worker', _timestamp(-1))
+    db.update('scheduled_posts', {'attempt_count': 2}, 'id = ?', (post_id,))
+    
+    assert scheduler.reclaim_expired_leases() == 1
+    
+    post = db.select('scheduled_posts', where='id = ?', where_params=(post_id,))[0]
+    assert post['status'] == 'dead'
+    assert post['attempt_count'] == 3
+    assert post['next_attempt_at'] is None
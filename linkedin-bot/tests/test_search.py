@@ -0,0 +1,143 @@
+"""
+Tests for full-text search over the repository and scheduled posts.
+"""
+
+import io
+import threading
+import time
+
+import pytest
+
+from linkedin_bot.core.database import db
+from linkedin_bot.core.search import MAX_RANKED_MATCHES
+from linkedin_bot.services.content_service import ContentService
+from linkedin_bot.services.post_service import PostService
+
+UNUSED_COUNT = 100
+
+
+@pytest.fixture(scope='module')
+def crowded_repository():
+    """More than MAX_RANKED_MATCHES posts matching 'alpha'; only the oldest are unused."""
+    db.execute("DELETE FROM content_repository")
+    total = MAX_RANKED_MATCHES + 1000
+    
+    with db.transaction():
+        db.execute_many(
+            "INSERT INTO content_repository (post_text, category, is_used) VALUES (?, ?, ?)",
+            [(f"alpha post number {number}", "Crowded", int(number >= UNUSED_COUNT)) for number in range(total)]
+        )
+        # The best match for 'alpha' is also the oldest row of another category
+        db.execute("UPDATE content_repository SET post_text = 'alpha alpha alpha', category = 'Best' "
+                   "WHERE id = (SELECT MIN(id) FROM content_repository)")
+    
+    yield
+    
+    db.execute("DELETE FROM content_repository")
+    db.commit()
+
+
+def test_filter_applies_before_ranked_matches_are_cut(crowded_repository):
+    results = ContentService.search_content("alpha", is_used=False, limit=500)
+    
+    assert len(results) == UNUSED_COUNT
+    assert not any(result['is_used'] for result in results)
+
+
+def test_category_and_usage_filters_combine(crowded_repository):
+    results = ContentService.search_content("alpha", category="Crowded", is_used=False, limit=500)
+    
+    assert len(results) == UNUSED_COUNT - 1
+    assert {result['category'] for result in results} == {"Crowded"}
+
+
+def test_pages_past_the_cut_are_not_empty(crowded_repository):
+    page = ContentService.search_content("alpha", limit=50, offset=MAX_RANKED_MATCHES + 100)
+    
+    assert len(page) == 50
+
+
+def test_ranking_every_match_finds_old_best_match(crowded_repository):
+    assert ContentService.search_content("alpha", limit=1)[0]['category'] != "Best"
+    assert ContentService.search_content("alpha", limit=1, max_ranked=None)[0]['category'] == "Best"
+
+
+def test_post_search_filters_by_status():
+    pending_id = PostService.add_post("Quarterly roadmap review", "2030-01-01", "09:00")
+    published_id = PostService.add_post("Quarterly roadmap recap", "2030-01-02", "09:00")
+    db.execute("UPDATE scheduled_posts SET status = 'published' WHERE id = ?", (published_id,))
+    db.commit()
+    
+    assert {post['id'] for post in PostService.search_posts("quarterly road")} == {pending_id, published_id}
+    assert [post['id'] for post in PostService.search_posts("quarterly", status="published")] == [published_id]
+    assert [post['id'] for post in PostService.search_posts("", status="published")] == [published_id]
+    assert PostService.search_posts("") == []
+
+
+def check_content_index():
+    """Raise if content_repository_fts differs from content_repository."""
+    db.execute("INSERT INTO content_repository_fts (content_repository_fts, rank) VALUES ('integrity-check', 1)")
+
+
+def test_imported_posts_are_indexed_in_batches(monkeypatch):
+    monkeypatch.setattr(db, 'FULL_TEXT_CATCH_UP_ROWS', 3)
+    csv_text = "PostContent,Category\n" + "".join(f"zephyr import {number},Imported\n" for number in range(10))
+    
+    report = ContentService.import_csv_stream(io.StringIO(csv_text + "zephyr import 0,Imported\n"), chunk_size=4)
+    
+    assert (report['imported'], report['duplicates']) == (10, 1)
+    assert len(ContentService.search_content("zephyr", limit=50)) == 10
+    assert db.execute("SELECT * FROM full_text_deferred_ranges").fetchall() == []
+    check_content_index()
+    
+    db.execute("DELETE FROM content_repository WHERE category = 'Imported'")
+    db.commit()
+
+
+def test_rows_written_during_a_deferral_are_indexed_when_it_ends():
+    other_ids = []
+    
+    with db.deferred_full_text_index('content_repository_fts'):
+        with db.transaction():
+            kept_id = db.insert('content_repository', {'post_text': "quokka draft", 'category': "Deferred"})
+            dropped_id = db.insert('content_repository', {'post_text': "quokka dropped", 'category': "Deferred"})
+        with db.transaction():
+            db.update('content_repository', {'post_text': "quokka final"}, 'id = ?', (kept_id,))
+            db.delete('content_repository', 'id = ?', (dropped_id,))
+        
+        # Other connections' writes are indexed right away
+        writer = threading.Thread(target=lambda: other_ids.append(
+            db.insert('content_repository', {'post_text': "quokka elsewhere", 'category': "Other"})
+        ))
+        writer.start()
+        writer.join()
+        
+        assert [result['id'] for result in ContentService.search_content("quokka")] == other_ids
+    
+    assert {result['id'] for result in ContentService.search_content("quokka")} == {kept_id, *other_ids}
+    assert ContentService.search_content("draft", category="Deferred") == []
+    check_content_index()
+    
+    db.execute("DELETE FROM content_repository WHERE post_text LIKE 'quokka%'")
+    db.commit()
+
+
+def test_only_deferrals_whose_owner_is_gone_are_finished():
+    with db.transaction():
+        db.execute("INSERT INTO full_text_deferred_ranges (index_name, from_id, owner, lease_expires) "
+                   "SELECT 'content_repository_fts', COALESCE(MAX(id), 0) + 1, 'crashed', ? FROM content_repository",
+                   (time.time() + 60,))
+        post_id = db.insert('content_repository', {'post_text': "wombat leftover", 'category': "Deferred"})
+        db.execute("UPDATE full_text_deferred_ranges SET to_id = ? WHERE owner = 'crashed'", (post_id,))
+    
+    # The lease is still live, so the owner may still be importing
+    assert db.finish_deferred_full_text_indexes() == 0
+    assert ContentService.search_content("wombat") == []
+    
+    db.execute("UPDATE full_text_deferred_ranges SET lease_expires = 0 WHERE owner = 'crashed'")
+    db.commit()
+    assert db.finish_deferred_full_text_indexes() == 1
+    assert [result['id'] for result in ContentService.search_content("wombat")] == [post_id]
+    check_content_index()
+    
+    db.delete('content_repository', 'id = ?', (post_id,))
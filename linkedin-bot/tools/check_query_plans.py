@@ -0,0 +1,206 @@
+"""
+Check that service queries are served by indexes.
+
+Runs the read and write paths of the services against a throwaway database,
+records every statement they execute, and runs EXPLAIN QUERY PLAN on each one.
+Exits with status 1 if any statement does a full table scan that isn't listed
+in ALLOWED_FULL_SCANS.
+
+Usage (from the linkedin-bot directory):
+    python tools/check_query_plans.py [--verbose]
+"""
+
+import io
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Point the global Database at a throwaway home directory before it is created
+_home = tempfile.mkdtemp(prefix="linkedin_bot_plans_")
+os.environ["HOME"] = _home
+os.environ["USERPROFILE"] = _home
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from linkedin_bot.core.database import db
+from linkedin_bot.core.scheduler import scheduler
+from linkedin_bot.core.near_duplicates import near_duplicate_index
+from linkedin_bot.services.post_service import PostService
+from linkedin_bot.services.content_service import ContentService
+from linkedin_bot.services.campaign_service import CampaignService
+
+# Statements that are meant to read or touch the whole table, as regexes over
+# whitespace-normalized SQL, with the reason they are allowed
+ALLOWED_FULL_SCANS = {
+    r"^SELECT \* FROM scheduled_posts ORDER BY schedule_time$": "lists every scheduled post",
+    r"^SELECT \* FROM content_repository ORDER BY id DESC$": "lists the whole repository",
+    r"^SELECT \* FROM campaigns ORDER BY created_at DESC$": "lists every campaign",
+    r"^UPDATE content_repository SET is_used = 0 WHERE 1=1$": "resets all content",
+    r"^SELECT \* FROM scheduler_workers WHERE ": "one row per scheduler worker",
+    r"^DELETE FROM scheduler_workers WHERE ": "one row per scheduler worker",
+    r"^SELECT \w\.\*, matches\.rank AS rank FROM \( SELECT (\w+_fts)\.rowid AS rowid, \1\.rank AS rank "
+    r"FROM \1 .* ORDER BY \1\.rowid DESC LIMIT -?\d+ \) AS matches ":
+        "ranks the newest full-text matches that pass the filters",
+}
+
+# Plan steps that read a table without an index, e.g. 'SCAN scheduled_posts'
+# ('SCAN TABLE scheduled_posts' on SQLite < 3.36)
+FULL_SCAN_PATTERN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+
+PLANNED_STATEMENTS = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+
+def normalize(statement: str) -> str:
+    """Collapse whitespace so statements can be compared and matched."""
+    return " ".join(statement.split())
+
+
+def lease(post_id: int) -> None:
+    """Lease a post to the scheduler the way claim_due_posts does, whatever its due time."""
+    lease_expires = (datetime.utcnow() + timedelta(seconds=scheduler.lease_duration)).isoformat(timespec="seconds")
+    db.execute(
+        "UPDATE scheduled_posts SET status = 'publishing', lease_owner = ?, lease_expires = ? WHERE id = ?",
+        (scheduler.worker_id, lease_expires, post_id)
+    )
+    db.commit()
+
+
+def exercise_services() -> None:
+    """Run the service paths whose queries should be checked."""
+    future = datetime.utcnow() + timedelta(days=2)
+
+    # Posts
+    post_id = PostService.add_post("Plan check post", future.strftime("%Y-%m-%d"), "12:00")
+    PostService.get_all_posts()
+    PostService.get_post(post_id)
+    PostService.get_posts_for_review()
+    PostService.search_posts("plan che")
+    PostService.search_posts("plan", status="pending")
+    PostService.search_posts("", status="pending")
+    PostService.approve_post(post_id)
+    PostService.update_post(post_id, "Plan check post, edited")
+    scheduler.get_pending_posts()
+    scheduler._load_due_times()
+    scheduler.claim_due_posts(10)
+    scheduler.reclaim_expired_leases()
+    lease(post_id)
+    scheduler._load_due_times()
+    scheduler.mark_as_published(post_id)
+    PostService.delete_post(post_id)
+
+    retry_id = PostService.add_post("Plan check retry", future.strftime("%Y-%m-%d"), "12:00")
+    scheduler.requeue_post(retry_id, 60, "plan check")
+    lease(retry_id)
+    scheduler.mark_as_failed(retry_id, "plan check")
+    scheduler.get_pending_posts()
+    scheduler._load_due_times()
+    for _ in range(scheduler.max_attempts):
+        lease(retry_id)
+        scheduler.mark_as_failed(retry_id, "plan check")
+    scheduler.retry_dead_post(retry_id)
+    PostService.delete_post(retry_id)
+
+    # Content repository
+    content_id = ContentService.add_content("Plan check content", "Plan check")
+    ContentService.get_all_content()
+    ContentService.get_content(content_id)
+    ContentService.get_categories()
+    ContentService.search_content("plan che")
+    ContentService.search_content("content", category="Plan check", is_used=False)
+    ContentService.search_content("", category="Plan check")
+    ContentService.search_content("plan", is_used=True, max_ranked=None)
+    near_duplicate_index.find_most_similar("Plan check content, reworded")
+    scheduler.get_unused_content(category="Plan check", limit=2)
+    scheduler.get_unused_content(limit=2)
+    scheduler.mark_content_as_used(content_id)
+    ContentService.reset_content(content_id)
+    ContentService.reset_content()
+    PostService.auto_schedule(num_posts=1, days_ahead=1)
+    ContentService.import_csv_stream(io.StringIO("PostContent,Category\nPlan check import,Plan check\n"))
+    db.finish_deferred_full_text_indexes()
+
+    # Campaigns
+    campaign_id = CampaignService.create_campaign("Plan check", "Testing", 1, 7)
+    topic_id = db.insert('campaign_topics', {'campaign_id': campaign_id, 'topic': "Plan topic"})
+    db.insert('content_repository', {
+        'post_text': "Plan campaign content",
+        'category': f"Campaign: {campaign_id} - Plan topic",
+        'campaign_id': campaign_id,
+        'topic_id': topic_id
+    })
+    CampaignService.get_all_campaigns()
+    CampaignService.get_campaign(campaign_id)
+    CampaignService.get_campaign_topics(campaign_id)
+    CampaignService.get_campaign_content(campaign_id)
+    CampaignService.update_topic(topic_id, "Plan topic, edited")
+    CampaignService.schedule_campaign_posts(campaign_id)
+    CampaignService.delete_topic(topic_id)
+    CampaignService.delete_all_topics(campaign_id)
+    CampaignService.delete_campaign(campaign_id)
+
+    # Scheduler workers
+    scheduler._write_heartbeat('running')
+    scheduler.get_live_workers()
+    scheduler.prune_workers()
+
+    # Settings and credentials
+    db.set_setting("plan_check", "1")
+    db.get_setting("plan_check")
+    db.set_credential("plan_check", "key", "value")
+    db.get_credential("plan_check", "key")
+
+
+def main() -> int:
+    verbose = "--verbose" in sys.argv
+
+    statements = []
+    conn = db._get_connection()
+    conn.set_trace_callback(statements.append)
+    try:
+        exercise_services()
+    finally:
+        conn.set_trace_callback(None)
+
+    seen = set()
+    failures = []
+
+    for statement in statements:
+        sql = normalize(statement)
+        if not sql.upper().startswith(PLANNED_STATEMENTS) or sql in seen:
+            continue
+        seen.add(sql)
+
+        plan = db.explain_query_plan(sql)
+        scans = [m.group(1) for m in map(FULL_SCAN_PATTERN.match, plan) if m]
+        allowed = next((reason for pattern, reason in ALLOWED_FULL_SCANS.items()
+                        if re.search(pattern, sql)), None)
+
+        if scans and not allowed:
+            failures.append((sql, plan))
+
+        if verbose:
+            status = "FULL SCAN" if scans and not allowed else ("allowed" if scans else "ok")
+            print(f"[{status}] {sql}")
+            for step in plan:
+                print(f"    {step}")
+            if scans and allowed:
+                print(f"    allowed: {allowed}")
+
+    print(f"Checked {len(seen)} distinct statements")
+
+    if failures:
+        print(f"{len(failures)} statement(s) do a full table scan:")
+        for sql, plan in failures:
+            print(f"  {sql}")
+            for step in plan:
+                print(f"    {step}")
+        return 1
+
+    print("No unexpected full table scans")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,72 @@
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import requests
 from linkedin_token import ACCESS_TOKEN  # Changed from "token" to "linkedin_token"
 
+# Seconds to wait after a 429 that has no usable Retry-After header
+DEFAULT_RETRY_AFTER = 60
+
+# time.monotonic() at which LinkedIn accepts posts again, per access token
+_blocked_until = {}
+
+class RateLimitedError(Exception):
+    """Raised when LinkedIn asked us to wait before posting again"""
+    
+    def __init__(self, retry_after, reason):
+        super().__init__(f"{reason}; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+        self.reason = reason
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+# Author URN per access token, so /me is only called once per token
+_user_urn_cache = {}
+
+def get_user_urn(headers):
+    """Get the author URN for ACCESS_TOKEN, calling /me only on a cache miss"""
+    if ACCESS_TOKEN in _user_urn_cache:
+        return _user_urn_cache[ACCESS_TOKEN]
+    
+    user_info_url = "https://api.linkedin.com/v2/me"
+    user_response = requests.get(user_info_url, headers=headers)
+    
+    if user_response.status_code != 200:
+        print(f"Error getting user info: {user_response.status_code}")
+        print(user_response.text)
+        return None
+    
+    user_data = user_response.json()
+    user_urn = f"urn:li:person:{user_data['id']}"
+    print(f"Found user URN: {user_urn}")
+    
+    _user_urn_cache[ACCESS_TOKEN] = user_urn
+    return user_urn
+
 def create_linkedin_post(post_text):
-    """Create a simple text post on LinkedIn"""
+    """
+    Create a simple text post on LinkedIn
+    
+    Raises RateLimitedError if LinkedIn answered 429, and on later calls
+    until its Retry-After period has passed
+    """
     
     print(f"Attempting to post: {post_text}")
     
@@ -16,18 +80,15 @@ def create_linkedin_post(post_text):
         "X-Restli-Protocol-Version": "2.0.0"
     }
     
-    # Get user URN (required for posting)
-    user_info_url = "https://api.linkedin.com/v2/me"
-    user_response = requests.get(user_info_url, headers=headers)
-    
-    if user_response.status_code != 200:
-        print(f"Error getting user info: {user_response.status_code}")
-        print(user_response.text)
+    # Get user URN (required for posting), cached per access token
+    user_urn = get_user_urn(headers)
+    if not user_urn:
         return False
     
-    user_data = user_response.json()
-    user_urn = f"urn:li:person:{user_data['id']}"
-    print(f"Found user URN: {user_urn}")
+    # Don't send anything while LinkedIn has asked us to wait
+    wait = _blocked_until.get(ACCESS_TOKEN, 0) - time.monotonic()
+    if wait > 0:
+        raise RateLimitedError(wait, "LinkedIn asked to wait after 429 Too Many Requests")
     
     # Create the post payload
     post_data = {
@@ -52,7 +113,17 @@ def create_linkedin_post(post_text):
     if response.status_code == 201:
         print("Post created successfully!")
         return True
+    elif response.status_code == 429:
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        if retry_after is None:
+            retry_after = DEFAULT_RETRY_AFTER
+        _blocked_until[ACCESS_TOKEN] = time.monotonic() + retry_after
+        raise RateLimitedError(retry_after, "LinkedIn returned 429 Too Many Requests")
     else:
+        if response.status_code == 401:
+            # Token revoked or expired; resolve the URN again next time
+            _user_urn_cache.pop(ACCESS_TOKEN, None)
+        
         print(f"Error creating post: {response.status_code}")
         print(response.text)
         return False
@@ -4,11 +4,22 @@ from datetime import datetime, timedelta
 import post
 import random
 import os
+import socket
+import uuid
 
 class LinkedInScheduler:
-    def __init__(self, db_path="linkedin_posts.db"):
-        """Initialize the scheduler with the database path"""
+    def __init__(self, db_path="linkedin_posts.db", lease_duration=300):
+        """
+        Initialize the scheduler with the database path
+        
+        Args:
+            db_path: Path to the SQLite database
+            lease_duration: Seconds a claimed post stays reserved for this worker
+        """
         self.db_path = db_path
+        self.lease_duration = lease_duration
+        # Identifies this process's claims, so ui.py and main.py can share a database
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
         self.init_db()
         
     def init_db(self):
@@ -77,7 +88,9 @@ class LinkedInScheduler:
         # Add missing columns to scheduled_posts
         required_columns = {
             'needs_review': 'INTEGER DEFAULT 0',
-            'reviewed': 'INTEGER DEFAULT 0'
+            'reviewed': 'INTEGER DEFAULT 0',
+            'lease_owner': 'TEXT',
+            'lease_expires': 'TEXT'
         }
         
         for col_name, col_type in required_columns.items():
@@ -253,7 +266,7 @@ class LinkedInScheduler:
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         cursor.execute(
-            "UPDATE scheduled_posts SET status = 'published' WHERE id = ?",
+            "UPDATE scheduled_posts SET status = 'published', lease_owner = NULL, lease_expires = NULL WHERE id = ?",
             (post_id,)
         )
         conn.commit()
@@ -265,13 +278,26 @@ class LinkedInScheduler:
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         cursor.execute(
-            "UPDATE scheduled_posts SET status = 'failed', post_text = post_text || ' [ERROR: ' || ? || ']' WHERE id = ?",
+            "UPDATE scheduled_posts SET status = 'failed', post_text = post_text || ' [ERROR: ' || ? || ']', "
+            "lease_owner = NULL, lease_expires = NULL WHERE id = ?",
             (error_message or "Unknown error", post_id)
         )
         conn.commit()
         conn.close()
         print(f"Post {post_id} marked as failed: {error_message}")
     
+    def release_post(self, post_id):
+        """Return a leased post to 'pending' so it is published on a later check"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE scheduled_posts SET status = 'pending', lease_owner = NULL, lease_expires = NULL "
+            "WHERE id = ? AND status = 'publishing' AND lease_owner = ?",
+            (post_id, self.worker_id)
+        )
+        conn.commit()
+        conn.close()
+    
     def delete_post(self, post_id):
         """Delete a scheduled post"""
         conn = sqlite3.connect(self.db_path)
@@ -281,16 +307,53 @@ class LinkedInScheduler:
         conn.close()
         print(f"Post {post_id} deleted")
     
+    def claim_pending_posts(self):
+        """
+        Atomically lease the posts that are due to this worker
+        
+        Claimed posts move to the 'publishing' status so another scheduler
+        sharing the database can't pick them up. Posts whose lease expired
+        (their worker stopped mid-publish) are returned to 'pending' first.
+        
+        Returns:
+            List of tuples containing (post_id, post_text) for claimed posts
+        """
+        now = datetime.utcnow()
+        lease_expires = (now + timedelta(seconds=self.lease_duration)).isoformat()
+        now = now.isoformat()
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            UPDATE scheduled_posts SET status = 'pending', lease_owner = NULL, lease_expires = NULL
+            WHERE status = 'publishing' AND lease_expires <= ?
+            """,
+            (now,)
+        )
+        cursor.execute(
+            """
+            UPDATE scheduled_posts SET status = 'publishing', lease_owner = ?, lease_expires = ?
+            WHERE status = 'pending' AND schedule_time <= ?
+            RETURNING id, post_text
+            """,
+            (self.worker_id, lease_expires, now)
+        )
+        posts = cursor.fetchall()
+        conn.commit()
+        conn.close()
+        return posts
+    
     def check_and_publish(self):
-        """Check for pending posts and publish them"""
-        pending_posts = self.get_pending_posts()
+        """Claim due posts and publish them"""
+        pending_posts = self.claim_pending_posts()
         if not pending_posts:
             print("No pending posts to publish")
             return
         
         print(f"Found {len(pending_posts)} posts to publish")
         
-        for post_id, post_text in pending_posts:
+        for index, (post_id, post_text) in enumerate(pending_posts):
             print(f"Publishing post {post_id}: {post_text[:50]}...")
             try:
                 success = post.create_linkedin_post(post_text)
@@ -298,6 +361,12 @@ class LinkedInScheduler:
                     self.mark_as_published(post_id)
                 else:
                     self.mark_as_failed(post_id, "API returned failure")
+            except post.RateLimitedError as e:
+                # Not a failure: leave the post (and the rest of this batch) for a later check
+                print(f"Post {post_id} delayed: {str(e)}")
+                for delayed_id, _ in pending_posts[index:]:
+                    self.release_post(delayed_id)
+                break
             except Exception as e:
                 print(f"Error publishing post {post_id}: {str(e)}")
                 self.mark_as_failed(post_id, str(e))
@@ -877,9 +946,6 @@ Keep the entire post under 1300 characters (LinkedIn's limit).
                 
                 generated_count += 1
                 print(f"Generated post for topic: {topic}")
-                
-                # Add a small delay between generations to reduce database contention
-                time.sleep(0.5)
                     
             except Exception as e:
                 print(f"Error generating content for topic '{topic}': {str(e)}")